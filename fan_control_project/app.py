@@ -1,13 +1,21 @@
 """Entry point for the fan control application."""
 
+import os
+from dataclasses import replace
+
 # Use the real sensor reader for the MCP9600 sensors
 from controller.sensor_reader import SensorReader
 from controller.pid_controller import PIDController
-from controller.ds3502_output import FanDS3502Controller, DS3502Config
+from controller.ds3502_output import DS3502Bus, FanDS3502Controller, DS3502Config
 from controller.control_loop import ControlLoop
+from controller.async_control_loop import AsyncControlLoop
+from controller.zone_engine import ZoneConfig, ZoneEngine
+from controller.calibration import lut_from_config
+from history import HistoryBuffer, RollupEngine, SampleArchive, build_tiers
 from web import server
 from config import load_config
-from config.logging_config import logger, setup_logging
+from config.logging_config import flush_logs, logger, set_log_store, setup_logging
+from config.log_store import LogStore
 from models.sensor_info import SensorInfo
 
 setup_logging()
@@ -42,6 +50,69 @@ def _system_checks() -> None:
         logger.debug("/boot/config.txt nicht lesbar")
 
 
+def _build_zone_engine(
+    zone_cfgs: list[dict],
+    base_actuator: DS3502Config,
+    actuator_bus: DS3502Bus,
+    sensor_reader: SensorReader,
+    mcp_params: dict,
+    interval: float,
+    skip_missed: bool,
+) -> ZoneEngine:
+    """Create a :class:`ZoneEngine` for the additional zones in the config."""
+    zones: list[ZoneConfig] = []
+    actuators: list[FanDS3502Controller] = []
+    addresses: list[str] = []
+    for idx, zc in enumerate(zone_cfgs):
+        sensors = [str(a) for a in zc.get("sensors", [])]
+        if len(sensors) != 2:
+            raise ValueError(f"Zone {idx} benoetigt genau zwei Sensoren")
+        addresses.extend(a for a in sensors if a not in addresses)
+        zones.append(
+            ZoneConfig(
+                name=str(zc.get("name", f"zone{idx + 1}")),
+                control_sensor=sensors[0],
+                alarm_sensor=sensors[1],
+                setpoint=float(zc.get("setpoint", 0.0)),
+                alarm_threshold=float(zc.get("alarm_threshold", 0.0)),
+                alarm_percent=float(zc.get("alarm_percent", 100.0)),
+                manual_percent=float(zc.get("manual_percent", 0.0)),
+                manual=str(zc.get("mode", "auto")) == "manual",
+                kp=float(zc.get("kp", 1.0)),
+                ki=float(zc.get("ki", 0.1)),
+                kd=float(zc.get("kd", 0.0)),
+                postrun_seconds=float(zc.get("postrun_seconds", 30.0)),
+                smoothing_alpha=float(zc.get("smoothing_alpha", 1.0)),
+            )
+        )
+        actuators.append(
+            FanDS3502Controller(
+                replace(base_actuator, address=zc.get("actuator", base_actuator.address)), actuator_bus
+            )
+        )
+    # One reader for all zones so that every tick performs a single batched read
+    reader = SensorReader(
+        addresses, i2c=sensor_reader.i2c, mcp_params=mcp_params, arbiter=sensor_reader.arbiter
+    )
+    reader.start_recovery()
+    return ZoneEngine(zones, reader, actuators, interval=interval, skip_missed=skip_missed)
+
+
+def _split_buses(sensor_ids: list[str], cfg: dict, mcp_params: dict) -> dict[int, list[str]]:
+    """Group the sensor addresses by I2C bus, the main bus first."""
+    main_bus = int(mcp_params.get("bus", 1))
+    buses: dict[int, list[str]] = {main_bus: []}
+    sensor_buses = {str(k): int(v) for k, v in cfg.get("sensor_buses", {}).items()}
+    if sensor_buses and not (
+        cfg.get("async_loop", False) and str(mcp_params.get("backend", "adafruit")).lower() == "smbus2"
+    ):
+        logger.warning("sensor_buses benoetigt async_loop und das smbus2-Backend, wird ignoriert")
+        sensor_buses = {}
+    for sid in sensor_ids:
+        buses.setdefault(sensor_buses.get(sid, main_bus), []).append(sid)
+    return buses
+
+
 def main() -> None:
     """Initialize all components and start the web server."""
     logger.info("Starte Anwendung")
@@ -53,6 +124,19 @@ def main() -> None:
     # Load persisted configuration values
     cfg = load_config()
     logger.debug("Konfiguration geladen: %s", cfg)
+    store_cfg = cfg.get("log_store", {})
+    store_path = str(store_cfg.get("path", "") or "")
+    log_store = None
+    if store_path:
+        if not os.path.isabs(store_path):
+            store_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), store_path)
+        log_store = LogStore(
+            store_path,
+            int(store_cfg.get("segment_bytes", 1048576)),
+            int(store_cfg.get("max_segments", 50)),
+        )
+        set_log_store(log_store)
+        server.log_store = log_store
     state.setpoint = float(cfg.get("setpoint", 0.0))
     state.alarm_threshold = float(cfg.get("alarm_threshold", 0.0))
     state.manual_percent = float(cfg.get("manual_percent", 0.0))
@@ -63,6 +147,7 @@ def main() -> None:
     state.postrun_seconds = float(cfg.get("postrun_seconds", 30.0))
     state.smoothing_enabled = bool(cfg.get("smoothing_enabled", True))
     state.smoothing_alpha = float(cfg.get("smoothing_alpha", 0.3))
+    loop_interval = float(cfg.get("loop_interval", 0.5))
 
     ds_cfg = cfg.get("ds3502", {})
     state.wiper_min = int(ds_cfg.get("wiper_min", 2))
@@ -76,7 +161,17 @@ def main() -> None:
     tc_type = str(mcp_params.get("type", "K")).upper()
     mcp_params["type"] = tc_type
     state.thermocouple_type = tc_type
-    sensor_reader = SensorReader(sensor_ids, mcp_params=mcp_params)
+    buses = _split_buses(sensor_ids, cfg, mcp_params)
+    main_bus = next(iter(buses))
+    sensor_reader = SensorReader(buses.pop(main_bus), mcp_params=mcp_params)
+    # one reader per additional bus, read concurrently by the async loop
+    extra_readers = [
+        SensorReader(addrs, mcp_params={**mcp_params, "bus": bus}) for bus, addrs in buses.items()
+    ]
+
+    sensor_reader.start_recovery()
+    for reader in extra_readers:
+        reader.start_recovery()
 
     found = sensor_reader.scan_bus()
     logger.info("I2C-Scan gefunden=%s konfiguriert=%s", found, sensor_ids)
@@ -88,15 +183,18 @@ def main() -> None:
         state.temp1_pin = sensors[0].pin
         state.temp2_pin = sensors[1].pin
 
-    # Basic PID controller using parameters from the configuration.
+    # Basic PID controller using parameters from the configuration. The
+    # fixed-rate scheduler sets the sample rate; with a sample_time the PID
+    # would return its previous output on every tick that arrives early.
     pid = PIDController(
         setpoint=state.setpoint,
         kp=state.kp,
         ki=state.ki,
         kd=state.kd,
-        sample_time=0.5,
+        sample_time=None,
     )
 
+    lut, lut_inverse = lut_from_config(ds_cfg.get("calibration"))
     config = DS3502Config(
         address=ds_cfg.get("address", "0x28"),
         invert=bool(ds_cfg.get("invert", False)),
@@ -105,30 +203,101 @@ def main() -> None:
         slew_rate_pct_per_s=float(ds_cfg.get("slew_rate_pct_per_s", 0.0)),
         startup_percent=float(ds_cfg.get("startup_percent", 0.0)),
         safe_low_on_fault=bool(ds_cfg.get("safe_low_on_fault", True)),
+        timeout_ms=float(ds_cfg.get("timeout_ms", 100.0)),
+        write_behind=bool(ds_cfg.get("write_behind", True)),
+        ramp_hz=float(ds_cfg.get("ramp_hz", 0.0)),
+        lut=lut,
+        lut_inverse=lut_inverse,
+        dither=bool(ds_cfg.get("dither", False)),
+        dither_max_writes_per_s=float(ds_cfg.get("dither_max_writes_per_s", 10.0)),
     )
-    actuator = FanDS3502Controller(config)
+    # all actuators share one bus handle, deadline worker and writer thread
+    actuator_bus = DS3502Bus(timeout_ms=config.timeout_ms)
+    actuator = FanDS3502Controller(config, actuator_bus)
     server.actuator = actuator
     if not actuator.available:
         logger.error("DS3502 nicht erreichbar, Fail-Safe aktiv", extra={"actuator": "ds3502", "addr": hex(config.address)})
 
-    control_loop = ControlLoop(
+    hist_cfg = cfg.get("history", {})
+    hist_path = str(hist_cfg.get("path", "") or "")
+    if hist_path and not os.path.isabs(hist_path):
+        hist_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), hist_path)
+    history = HistoryBuffer(int(hist_cfg.get("capacity", 172800)), hist_path or None)
+    server.history = history
+    server.history_initial_points = int(hist_cfg.get("initial_points", 600))
+    rollup = None
+    tier_specs = hist_cfg.get("rollup_tiers", [])
+    if tier_specs:
+        rollup = RollupEngine(history, build_tiers(tier_specs, hist_path or None))
+        rollup.start()
+        server.rollup = rollup
+    archive = None
+    archive_path = str(hist_cfg.get("archive_path", "") or "")
+    if archive_path:
+        if not os.path.isabs(archive_path):
+            archive_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), archive_path)
+        archive = SampleArchive(archive_path, int(hist_cfg.get("archive_block_size", 4096)))
+        archive.start(history)
+
+    loop_kwargs = {}
+    loop_cls = ControlLoop
+    if cfg.get("async_loop", False):
+        loop_cls = AsyncControlLoop
+        loop_kwargs["extra_readers"] = extra_readers
+    control_loop = loop_cls(
         state,
         sensor_reader,
         pid,
         actuator,
         sensors=sensors,
         alarm_percent=state.alarm_percent,
+        interval=loop_interval,
+        skip_missed=bool(cfg.get("skip_missed_ticks", True)),
+        history=history,
+        **loop_kwargs,
     )
     control_loop.start()
     logger.info("Steuerung gestartet")
 
+    zone_engine = None
+    zone_cfgs = cfg.get("zones", [])
+    if zone_cfgs:
+        zone_engine = _build_zone_engine(
+            zone_cfgs,
+            config,
+            actuator_bus,
+            sensor_reader,
+            mcp_params,
+            loop_interval,
+            bool(cfg.get("skip_missed_ticks", True)),
+        )
+        zone_engine.start()
+        server.zone_engine = zone_engine
+
     server.sensor_reader = sensor_reader
+    server.control_loop = control_loop
+    server.push_max_hz = float(cfg.get("state_push_max_hz", 5.0))
 
     # Expose PID controller to the web server for runtime updates
     server.pid_controller = pid
 
-    server.main()
-    logger.info("Anwendung beendet")
+    try:
+        server.main()
+    finally:
+        for reader in extra_readers:
+            reader.stop_recovery()
+        if zone_engine is not None:
+            zone_engine.stop()
+            zone_engine.sensor_reader.stop_recovery()
+        if rollup is not None:
+            rollup.stop()
+        if archive is not None:
+            archive.close()
+        logger.info("Anwendung beendet")
+        if log_store is not None:
+            flush_logs()
+            set_log_store(None)
+            log_store.close()
 
 
 if __name__ == "__main__":
@@ -1,3 +1,3 @@
-from .config_manager import load_config, save_config
+from .config_manager import load_config, save_calibration, save_config
 
-__all__ = ["load_config", "save_config"]
+__all__ = ["load_config", "save_calibration", "save_config"]
@@ -21,6 +21,19 @@ DEFAULT_CONFIG: Dict[str, Any] = {
         "slew_rate_pct_per_s": 30,
         "startup_percent": 0,
         "safe_low_on_fault": True,
+        "timeout_ms": 100,
+        # Perform wiper writes on a background thread (latest value wins)
+        "write_behind": True,
+        # Interpolate between control targets at this rate (0 = off); the
+        # ramp thread is shared by all actuators on the bus, zones included
+        "ramp_hz": 0,
+        # Measured (wiper, response) points and the derived lookup tables,
+        # written by tools/calibrate_ds3502.py; empty = linear mapping
+        "calibration": {},
+        # Sigma-delta dithering between adjacent wiper codes; the dither
+        # thread is the only writer and limits bus writes to this rate
+        "dither": False,
+        "dither_max_writes_per_s": 10,
     },
     "kp": 1.0,
     "ki": 0.1,
@@ -29,8 +42,48 @@ DEFAULT_CONFIG: Dict[str, Any] = {
     "swap_sensors": False,
     "smoothing_enabled": True,
     "smoothing_alpha": 0.3,
+    # Control loop period in seconds and whether overrun ticks are skipped
+    "loop_interval": 0.5,
+    "skip_missed_ticks": True,
+    # Run the control loop on asyncio with overlapped sensor reads
+    "async_loop": False,
+    # Max rate of routine state pushes to the web clients (alarm and
+    # postrun transitions are pushed immediately)
+    "state_push_max_hz": 5.0,
     # I2C sensor addresses as hex strings
     "sensor_addresses": ["0x66", "0x67"],
+    # I2C bus number per sensor address for sensors that are not on
+    # mcp9600.bus; each bus is read concurrently (smbus2 and async_loop only)
+    "sensor_buses": {},
+    # Additional purge-air zones driven by the zone engine, e.g.
+    # {"name": "B", "sensors": ["0x60", "0x61"], "actuator": "0x29", "setpoint": 30}
+    "zones": [],
+    # Persistent structured log (rotating JSON-lines segments, relative to the
+    # project directory, empty = disabled)
+    "log_store": {
+        "path": "data/logs",
+        "segment_bytes": 1048576,
+        "max_segments": 50,
+    },
+    # Server-side trend history (ring buffer in a memory-mapped file; the
+    # path is relative to the project directory, empty = memory only)
+    "history": {
+        "path": "data/history.bin",
+        "capacity": 172800,
+        # Samples sent to a client on connect
+        "initial_points": 600,
+        # Aggregate tiers (bucket width in s, retention in buckets); each
+        # width must be a multiple of the previous one
+        "rollup_tiers": [
+            {"name": "1s", "width": 1, "retention": 21600},
+            {"name": "1min", "width": 60, "retention": 43200},
+            {"name": "1h", "width": 3600, "retention": 43800},
+        ],
+        # Compressed long-term archive of all samples (empty = disabled)
+        "archive_path": "data/archive.fca",
+        # Bytes per archive block; a block is written once it is full
+        "archive_block_size": 4096,
+    },
     # Default configuration for the MCP9600 sensors
     "mcp9600": {
         "type": "K",
@@ -40,6 +93,25 @@ DEFAULT_CONFIG: Dict[str, Any] = {
         "retries": 2,
         "backoff_ms": 50,
         "stale_threshold_count": 5,
+        # Only fetch temperatures after the status register reports a new
+        # conversion; sensors without new data for stale_timeout_s are stale
+        # and sensors without a first conversion report "pending"
+        "data_ready_polling": False,
+        "stale_timeout_s": 5.0,
+        # "adafruit" (Blinka/busio) or "smbus2" (native register access)
+        "backend": "adafruit",
+        "bus": 1,
+        # Diagnostic reads share control-loop results younger than this
+        "coalesce_ms": 250,
+        # Skip a sensor after this many failed reads and re-probe it in the
+        # background, first after breaker_reset_s (doubling up to 5 min)
+        "breaker_failures": 3,
+        "breaker_reset_s": 5.0,
+        "probe_interval_s": 1.0,
+        # Abandon sensor transactions after timeout_ms; reopen the bus once
+        # the abandoned transaction has returned
+        "timeout_ms": 250,
+        "bus_recovery": True,
     },
 }
 
@@ -87,6 +159,17 @@ def load_config() -> Dict[str, Any]:
     return data
 
 
+def save_calibration(calibration: Dict[str, Any]) -> None:
+    """Store a DS3502 calibration in the config file."""
+    data = load_config()
+    ds_cfg = data.get("ds3502", {})
+    ds_cfg["calibration"] = calibration
+    data["ds3502"] = ds_cfg
+    with open(CONFIG_PATH, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    logger.info("DS3502-Kalibrierung gespeichert (%d Punkte)", len(calibration.get("points", [])))
+
+
 def save_config(state: SystemState) -> None:
     """Persist selected values from the given state to the config file."""
     data = load_config()
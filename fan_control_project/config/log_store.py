@@ -0,0 +1,331 @@
+"""Rotating on-disk store for structured log entries with in-memory indexes."""
+
+from __future__ import annotations
+
+import bisect
+import heapq
+import json
+import logging
+import os
+import re
+import threading
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from .logging_config import LogEntry
+
+# structured keys that get an inverted index
+INDEXED_KEYS = ("sensor_addr", "actuator", "status")
+MAX_PAGE_SIZE = 500
+# sequence number and id of the first entry; older files lack the id
+_SEGMENT_RE = re.compile(r"^log-(\d{6})(?:-(\d+))?\.jsonl$")
+
+
+def _level_no(name: str) -> int:
+    value = logging.getLevelName(str(name).upper())
+    return value if isinstance(value, int) else 0
+
+
+class _Segment:
+    """One log file and the index of the entries it holds.
+
+    ``times``, ``offsets`` and ``levels`` are parallel arrays per line;
+    ``by_level`` and ``postings`` map a level number or ``(key, value)`` to
+    the ascending line numbers that carry it. ``ordered`` stays true while
+    the timestamps never decrease, so ``times`` can be bisected; entries
+    from several threads or a wall-clock step can arrive out of order.
+    """
+
+    __slots__ = (
+        "seq", "path", "first_id", "size", "times", "offsets", "levels", "by_level", "postings", "ordered"
+    )
+
+    def __init__(self, seq: int, path: str, first_id: int) -> None:
+        self.seq = seq
+        self.path = path
+        self.first_id = first_id
+        self.size = 0
+        self.times = array("d")
+        self.offsets = array("L")
+        self.levels = bytearray()
+        self.by_level: Dict[int, array] = {}
+        self.postings: Dict[tuple[str, str], array] = {}
+        self.ordered = True
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def index(self, data: Dict[str, Any], offset: int, length: int) -> None:
+        line = len(self.times)
+        ts = float(data.get("ts", 0.0))
+        if line and ts < self.times[-1]:
+            self.ordered = False
+        self.times.append(ts)
+        self.offsets.append(offset)
+        level = min(_level_no(str(data.get("level", ""))), 255)
+        self.levels.append(level)
+        self.by_level.setdefault(level, array("L")).append(line)
+        for key in INDEXED_KEYS:
+            if key in data:
+                self.postings.setdefault((key, str(data[key])), array("L")).append(line)
+        self.size = offset + length
+
+    def load(self) -> None:
+        offset = 0
+        with open(self.path, "rb") as fh:
+            for raw in fh:
+                if not raw.endswith(b"\n"):
+                    # line cut off by a crash; the next write starts after it
+                    break
+                try:
+                    self.index(json.loads(raw), offset, len(raw))
+                except ValueError:
+                    pass
+                offset += len(raw)
+        self.size = offset
+
+
+class LogStore:
+    """Append-only structured log files with rotation and indexed queries.
+
+    Entries are written as JSON lines to ``log-NNNNNN-ID.jsonl`` segments in
+    ``directory``, where ``ID`` is the id of the segment's first entry, so
+    ids and query cursors stay valid across restarts and deleted segments.
+    A segment is closed once it exceeds ``segment_bytes`` and the oldest
+    segments beyond ``max_segments`` are deleted. Time, level and
+    the :data:`INDEXED_KEYS` are indexed in memory, so a query only reads
+    the lines it returns from disk.
+    """
+
+    def __init__(self, directory: str, segment_bytes: int = 1 << 20, max_segments: int = 50) -> None:
+        if segment_bytes <= 0 or max_segments <= 0:
+            raise ValueError("segment_bytes und max_segments muessen positiv sein")
+        self.directory = directory
+        self.segment_bytes = int(segment_bytes)
+        self.max_segments = int(max_segments)
+        self._lock = threading.Lock()
+        self._segments: List[_Segment] = []
+        self._next_id = 0
+        os.makedirs(directory, exist_ok=True)
+        for name in sorted(os.listdir(directory)):
+            match = _SEGMENT_RE.match(name)
+            if match:
+                first_id = self._next_id if match.group(2) is None else int(match.group(2))
+                segment = _Segment(int(match.group(1)), os.path.join(directory, name), first_id)
+                segment.load()
+                self._segments.append(segment)
+                self._next_id = max(self._next_id, first_id + len(segment))
+        self._file = None
+        if self._segments:
+            self._open_segment(self._segments[-1])
+        self._trim()
+
+    # ------------------------------------------------------------------
+    def _open_segment(self, segment: _Segment) -> None:
+        if self._file is not None:
+            self._file.close()
+        self._file = open(segment.path, "ab")
+        # drop a partial last line left by a crash
+        self._file.truncate(segment.size)
+
+    def _rotate(self) -> _Segment:
+        seq = self._segments[-1].seq + 1 if self._segments else 1
+        path = os.path.join(self.directory, f"log-{seq:06d}-{self._next_id}.jsonl")
+        segment = _Segment(seq, path, self._next_id)
+        self._segments.append(segment)
+        self._open_segment(segment)
+        self._trim()
+        return segment
+
+    def _trim(self) -> None:
+        while len(self._segments) > self.max_segments:
+            old = self._segments.pop(0)
+            try:
+                os.remove(old.path)
+            except OSError:
+                pass
+
+    def append(self, entries: Iterable[LogEntry]) -> int:
+        """Write ``entries`` and index them; return how many were stored."""
+        count = 0
+        with self._lock:
+            segment = self._segments[-1] if self._segments else None
+            chunks: List[bytes] = []
+            for entry in entries:
+                if segment is None or segment.size >= self.segment_bytes:
+                    if chunks:
+                        self._file.write(b"".join(chunks))
+                        chunks = []
+                    segment = self._rotate()
+                data = entry.as_dict()
+                data["ts"] = entry.created
+                raw = (json.dumps(data) + "\n").encode()
+                segment.index(data, segment.size, len(raw))
+                chunks.append(raw)
+                self._next_id += 1
+                count += 1
+            if chunks:
+                self._file.write(b"".join(chunks))
+            if count:
+                self._file.flush()
+        return count
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(s) for s in self._segments)
+
+    # ------------------------------------------------------------------
+    def query(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        level: Optional[str] = None,
+        before: Optional[int] = None,
+        limit: int = 100,
+        filters: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Any]:
+        """Return matching entries, newest first.
+
+        ``before`` is the ``next`` cursor of the previous page. ``level`` is
+        the minimum level; ``filters`` match the :data:`INDEXED_KEYS` exactly.
+        """
+        min_level = _level_no(level) if level else 0
+        terms = [(key, str(value)) for key, value in (filters or {}).items()]
+        hits: List[tuple[_Segment, int]] = []
+        next_id: Optional[int] = None
+        with self._lock:
+            for segment in reversed(self._segments):
+                if before is not None and segment.first_id >= before:
+                    continue
+                for line in self._candidates(segment, start, end, before, min_level, terms):
+                    if segment.levels[line] < min_level:
+                        continue
+                    if len(hits) == limit:
+                        next_id = segment.first_id + line + 1
+                        break
+                    hits.append((segment, line))
+                if next_id is not None:
+                    break
+            rows = list(self._read(hits))
+        return {"entries": rows, "next": next_id}
+
+    @staticmethod
+    def _candidates(
+        segment: _Segment,
+        start: Optional[float],
+        end: Optional[float],
+        before: Optional[int],
+        min_level: int,
+        terms: Sequence[tuple[str, str]],
+    ) -> Iterator[int]:
+        """Line numbers of ``segment`` matching time, cursor and terms, newest first.
+
+        The time range is bisected while the segment is ordered and checked
+        per line otherwise. The level is rechecked by the caller.
+        """
+        if segment.ordered:
+            lo = 0 if start is None else bisect.bisect_left(segment.times, start)
+            hi = len(segment) if end is None else bisect.bisect_right(segment.times, end)
+        else:
+            lo, hi = 0, len(segment)
+        if before is not None:
+            hi = min(hi, before - segment.first_id)
+        if lo >= hi:
+            return
+        lines = LogStore._lines(segment, lo, hi, min_level, terms)
+        if segment.ordered or (start is None and end is None):
+            yield from lines
+            return
+        times = segment.times
+        for line in lines:
+            t = times[line]
+            if (start is None or t >= start) and (end is None or t <= end):
+                yield line
+
+    @staticmethod
+    def _lines(
+        segment: _Segment, lo: int, hi: int, min_level: int, terms: Sequence[tuple[str, str]]
+    ) -> Iterator[int]:
+        """Line numbers ``lo <= line < hi`` carrying all ``terms``, newest first.
+
+        With ``terms`` the shortest posting list drives the scan; otherwise a
+        level filter merges the lists of the accepted levels.
+        """
+        if not terms:
+            levels = [lines for level, lines in segment.by_level.items() if level >= min_level]
+            if len(levels) == len(segment.by_level):
+                yield from range(hi - 1, lo - 1, -1)
+                return
+            ranges = []
+            for lines in levels:
+                first, last = bisect.bisect_left(lines, lo), bisect.bisect_left(lines, hi)
+                ranges.append(reversed(lines[first:last]))
+            yield from heapq.merge(*ranges, reverse=True)
+            return
+        lists = []
+        for term in terms:
+            lines = segment.postings.get(term)
+            if lines is None:
+                return
+            lists.append(lines)
+        lists.sort(key=len)
+        shortest, rest = lists[0], lists[1:]
+        i = bisect.bisect_left(shortest, hi) - 1
+        while i >= 0 and shortest[i] >= lo:
+            line = shortest[i]
+            if all(_contains(other, line) for other in rest):
+                yield line
+            i -= 1
+
+    @staticmethod
+    def _read(hits: List[tuple[_Segment, int]]) -> Iterator[Dict[str, Any]]:
+        fh = None
+        current = None
+        try:
+            for segment, line in hits:
+                if segment is not current:
+                    if fh is not None:
+                        fh.close()
+                    fh = open(segment.path, "rb")
+                    current = segment
+                fh.seek(segment.offsets[line])
+                data = json.loads(fh.readline())
+                data["id"] = segment.first_id + line
+                yield data
+        finally:
+            if fh is not None:
+                fh.close()
+
+
+def _contains(lines: array, line: int) -> bool:
+    i = bisect.bisect_left(lines, line)
+    return i < len(lines) and lines[i] == line
+
+
+def parse_log_query(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate log query parameters from HTTP or Socket.IO."""
+    query: Dict[str, Any] = {}
+    for key in ("start", "end"):
+        if params.get(key) not in (None, ""):
+            query[key] = float(params[key])
+    if params.get("before") not in (None, ""):
+        query["before"] = int(params["before"])
+    limit = int(params.get("limit", 100))
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit muss zwischen 1 und {MAX_PAGE_SIZE} liegen")
+    query["limit"] = limit
+    level = params.get("level")
+    if level:
+        if not _level_no(level):
+            raise ValueError(f"Unbekannter Level: {level}")
+        query["level"] = str(level)
+    filters = {key: str(params[key]) for key in INDEXED_KEYS if params.get(key) not in (None, "")}
+    if filters:
+        query["filters"] = filters
+    return query
@@ -1,69 +1,265 @@
 import json
 import logging
 import os
+import threading
+import time
 from collections import deque
-from typing import Callable
+from typing import TYPE_CHECKING, Callable
 
-__all__ = ["logger", "log_buffer", "set_log_callback", "setup_logging"]
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from .log_store import LogStore
+
+__all__ = [
+    "logger",
+    "log_buffer",
+    "LogEntry",
+    "flush_logs",
+    "log_stats",
+    "set_log_callback",
+    "set_log_store",
+    "setup_logging",
+]
+
+# Records waiting for the listener; further records are dropped and counted
+LOG_QUEUE_SIZE = 1000
+# Interval of the listener thread, i.e. at most one batch per interval
+LOG_BATCH_INTERVAL_S = 0.25
+# Entries forwarded per batch; older surplus entries only reach the buffer
+LOG_BATCH_MAX = 50
+
+
+# ``extra`` attributes that are carried into structured entries
+EXTRA_KEYS = (
+    "sensor_addr",
+    "attempt",
+    "dt_ms",
+    "status",
+    "temp_hot",
+    "temp_cold",
+    "delta",
+    "actuator",
+    "addr",
+    "output_pct",
+    "wiper",
+    "slew_applied",
+)
+
+
+class LogEntry:
+    """Structured log entry built once per record.
+
+    Holds only what the dashboard shows; the timestamp text and the dict or
+    JSON form are produced on demand by the sinks that need them.
+    """
+
+    __slots__ = ("created", "level", "name", "message", "extra")
+
+    def __init__(
+        self,
+        created: float,
+        level: str,
+        name: str,
+        message: str,
+        extra: tuple[tuple[str, object], ...] = (),
+    ) -> None:
+        self.created = created
+        self.level = level
+        self.name = name
+        self.message = message
+        self.extra = extra
+
+    @classmethod
+    def from_record(cls, record: logging.LogRecord) -> "LogEntry":
+        attrs = record.__dict__
+        return cls(
+            record.created,
+            record.levelname.lower(),
+            record.name,
+            record.getMessage(),
+            tuple((key, attrs[key]) for key in EXTRA_KEYS if key in attrs),
+        )
+
+    def time_text(self) -> str:
+        """Timestamp in the default :mod:`logging` format."""
+        msecs = int((self.created - int(self.created)) * 1000)
+        return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.created)) + f",{msecs:03d}"
+
+    def as_dict(self) -> dict[str, object]:
+        data: dict[str, object] = {
+            "time": self.time_text(),
+            "level": self.level,
+            "name": self.name,
+            "message": self.message,
+        }
+        data.update(self.extra)
+        return data
+
+    def to_json(self) -> str:
+        return json.dumps(self.as_dict())
 
 
 class JsonFormatter(logging.Formatter):
     """Format log records as JSON strings."""
 
     def format(self, record: logging.LogRecord) -> str:  # noqa: D401 - simple override
-        data: dict[str, object] = {
-            "time": self.formatTime(record, self.datefmt),
-            "level": record.levelname.lower(),
-            "name": record.name,
-            "message": record.getMessage(),
-        }
-        for key in (
-            "sensor_addr",
-            "attempt",
-            "dt_ms",
-            "status",
-            "temp_hot",
-            "temp_cold",
-            "delta",
-            "actuator",
-            "addr",
-            "output_pct",
-            "wiper",
-            "slew_applied",
-        ):
-            if hasattr(record, key):
-                data[key] = getattr(record, key)
-        return json.dumps(data)
+        return LogEntry.from_record(record).to_json()
 
 
 logger = logging.getLogger("fan_control")
 
-log_buffer: deque[dict[str, object]] = deque(maxlen=200)
+log_buffer: deque[LogEntry] = deque(maxlen=200)
+
+_log_callback: "Callable[[list[dict[str, object]], int], None] | None" = None
 
-_log_callback: "Callable[[dict[str, object]], None] | None" = None
 
+def set_log_callback(cb: "Callable[[list[dict[str, object]], int], None] | None") -> None:
+    """Register a callback that receives each batch of new log entries.
 
-def set_log_callback(cb: "Callable[[dict[str, object]], None] | None") -> None:
-    """Register a callback that is invoked for each new log entry."""
+    The callback is invoked from the listener thread with the entries and the
+    number of entries dropped since the previous batch.
+    """
     global _log_callback
     _log_callback = cb
 
 
+_log_store: "LogStore | None" = None
+
+
+def set_log_store(store: "LogStore | None") -> None:
+    """Persist every log entry to ``store`` (see :mod:`config.log_store`)."""
+    global _log_store
+    _log_store = store
+
+
 class WebLogHandler(logging.Handler):
-    """Handler that stores logs in a deque for web display."""
+    """Hand log records to the web listener without blocking the caller.
+
+    ``emit`` formats the message on the calling thread, like
+    :meth:`logging.handlers.QueueHandler.prepare`, so mutable arguments are
+    captured as they were when logged, and appends the entry to a bounded
+    queue. The log buffer, the store and the fan-out to web clients are
+    handled on :class:`LogListener`'s thread. When the queue is full the
+    record is dropped and counted.
+    """
+
+    def __init__(self, maxsize: int = LOG_QUEUE_SIZE) -> None:
+        super().__init__()
+        self.maxsize = maxsize
+        self.queue: deque[LogEntry] = deque()
+        self.dropped = 0
+        self._drop_lock = threading.Lock()
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        # the handler lock is not needed for a single deque append
+        rv = self.filter(record)
+        if rv:
+            self.emit(record)
+        return bool(rv)
 
     def emit(self, record: logging.LogRecord) -> None:
-        msg = self.format(record)
+        if len(self.queue) >= self.maxsize:
+            with self._drop_lock:
+                self.dropped += 1
+            return
         try:
-            entry = json.loads(msg)
-        except json.JSONDecodeError:
-            entry = {"level": record.levelname.lower(), "message": msg}
-        log_buffer.append(entry)
-        if _log_callback:
-            _log_callback(entry)
+            self.queue.append(LogEntry.from_record(record))
+        except Exception:
+            self.handleError(record)
+
+
+class LogListener:
+    """Drain a :class:`WebLogHandler` and forward entries in batches."""
+
+    def __init__(
+        self,
+        handler: WebLogHandler,
+        interval: float = LOG_BATCH_INTERVAL_S,
+        batch_max: int = LOG_BATCH_MAX,
+    ) -> None:
+        self.handler = handler
+        self.interval = interval
+        self.batch_max = batch_max
+        self.batches = 0
+        self.dropped = 0
+        self.store_errors = 0
+        self._reported_drops = 0
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def flush(self) -> int:
+        """Process all queued records and send one batch; return its size."""
+        with self._lock:
+            queue = self.handler.queue
+            entries = []
+            for _ in range(len(queue)):
+                try:
+                    entries.append(queue.popleft())
+                except IndexError:
+                    break
+            log_buffer.extend(entries)
+            store = _log_store
+            if store is not None and entries:
+                try:
+                    store.append(entries)
+                except OSError:
+                    self.store_errors += 1
+            # under overload the newest entries are forwarded, the rest only
+            # reach the buffer that clients load on request
+            skipped = max(len(entries) - self.batch_max, 0)
+            if skipped:
+                entries = entries[skipped:]
+            queue_drops = self.handler.dropped
+            dropped = queue_drops - self._reported_drops + skipped
+            self._reported_drops = queue_drops
+            self.dropped += dropped
+            callback = _log_callback
+            if callback is None or not (entries or dropped):
+                return 0
+            self.batches += 1
+        callback([entry.as_dict() for entry in entries], dropped)
+        return len(entries)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="log-listener", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.flush()
+            except Exception as exc:  # pragma: no cover - defensive
+                logger.error("Log-Weiterleitung fehlgeschlagen: %s", exc)
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        self.flush()
 
 
 _json_formatter = JsonFormatter()
+_web_handler = WebLogHandler()
+_listener = LogListener(_web_handler)
+
+
+def flush_logs() -> int:
+    """Forward queued log records immediately (e.g. in tests)."""
+    return _listener.flush()
+
+
+def log_stats() -> dict[str, int]:
+    """Return counters of the web log fan-out."""
+    return {
+        "queued": len(_web_handler.queue),
+        "dropped": _listener.dropped + _web_handler.dropped - _listener._reported_drops,
+        "batches": _listener.batches,
+        "store_errors": _listener.store_errors,
+    }
 
 
 def setup_logging() -> None:
@@ -75,7 +271,6 @@ def setup_logging() -> None:
         handler.setFormatter(_json_formatter)
     logger.setLevel(level)
 
-    if not any(isinstance(h, WebLogHandler) for h in logger.handlers):
-        web_handler = WebLogHandler()
-        web_handler.setFormatter(_json_formatter)
-        logger.addHandler(web_handler)
+    if _web_handler not in logger.handlers:
+        logger.addHandler(_web_handler)
+    _listener.start()
@@ -0,0 +1,101 @@
+"""asyncio-based control loop with overlapped sensor reads."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+from .control_loop import ControlLoop
+from .pid_controller import PIDController
+from .ds3502_output import FanDS3502Controller
+from history import HistoryBuffer
+from models import SystemState
+from models.sensor_info import SensorInfo
+from config.logging_config import logger
+
+
+class AsyncControlLoop(ControlLoop):
+    """Variant of :class:`ControlLoop` that runs on an asyncio event loop.
+
+    Every reader represents one I2C bus. Readers are awaited concurrently and
+    their blocking transactions run in a thread pool, so a cycle takes as long
+    as the slowest bus rather than the sum of all sensors, and retry backoff
+    is awaited instead of blocking the iteration. The control step, which
+    writes the actuator, runs in the same pool so that a slow wiper write
+    does not block the event loop either.
+    """
+
+    def __init__(
+        self,
+        state: SystemState,
+        sensor_reader: Any,
+        pid_controller: PIDController,
+        actuator: FanDS3502Controller,
+        sensors: List[SensorInfo],
+        alarm_percent: float = 100.0,
+        interval: float = 0.5,
+        skip_missed: bool = True,
+        extra_readers: Sequence[Any] = (),
+        history: Optional[HistoryBuffer] = None,
+    ) -> None:
+        super().__init__(
+            state,
+            sensor_reader,
+            pid_controller,
+            actuator,
+            sensors,
+            alarm_percent=alarm_percent,
+            interval=interval,
+            skip_missed=skip_missed,
+            history=history,
+        )
+        self.readers = [sensor_reader, *extra_readers]
+        workers = sum(len(getattr(r, "sensors", ())) or 1 for r in self.readers)
+        self._executor: Optional[ThreadPoolExecutor] = ThreadPoolExecutor(
+            max_workers=max(1, workers), thread_name_prefix="i2c"
+        )
+
+    async def _read_all_buses(self) -> Dict[str, Dict[str, Any]]:
+        loop = asyncio.get_running_loop()
+        tasks = []
+        for reader in self.readers:
+            if hasattr(reader, "read_all_async"):
+                tasks.append(reader.read_all_async(self._executor))
+            else:
+                tasks.append(loop.run_in_executor(self._executor, reader.read_all))
+        merged: Dict[str, Dict[str, Any]] = {}
+        for data in await asyncio.gather(*tasks):
+            merged.update(data)
+        return merged
+
+    async def update_once_async(self) -> None:
+        """Perform a single control-loop iteration with awaited I/O."""
+        start = time.perf_counter()
+        self.state.apply_commands()
+        sensor_data = await self._read_all_buses()
+        self.timings.observe("read", time.perf_counter() - start)
+        temp1, temp2 = self._apply_sensor_data(sensor_data)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._control, temp1, temp2, start)
+
+    async def _run_async(self) -> None:
+        self.scheduler.start()
+        while self._running:
+            self.scheduler.begin_tick()
+            await self.update_once_async()
+            delay = self.scheduler.end_tick()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+    def _run_loop(self) -> None:
+        asyncio.run(self._run_async())
+
+    def stop(self) -> None:
+        """Stop the loop and release the I/O thread pool."""
+        super().stop()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        logger.debug("Async control loop Executor beendet")
@@ -0,0 +1,119 @@
+"""Serialize, prioritize and coalesce transactions on a shared I2C bus."""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+PRIORITY_CONTROL = 0
+PRIORITY_DIAGNOSTIC = 1
+_PRIORITIES = (PRIORITY_CONTROL, PRIORITY_DIAGNOSTIC)
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class BusArbiter:
+    """Grant exclusive bus access, control-loop traffic first.
+
+    Operations identified by the same ``key`` are coalesced: a caller arriving
+    while an identical operation is running waits for and shares its result,
+    and a result younger than ``max_age_ms`` is returned without touching the
+    bus at all. Pending control-priority requests always win over waiting
+    diagnostic requests.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._busy = False
+        self._waiting = {p: 0 for p in _PRIORITIES}
+        self._inflight: Dict[Hashable, _Call] = {}
+        self._results: Dict[Hashable, Tuple[float, Any]] = {}
+        self.coalesced = 0
+
+    # ------------------------------------------------------------------
+    def _acquire(self, priority: int) -> None:
+        with self._cond:
+            self._waiting[priority] += 1
+            try:
+                while self._busy or any(self._waiting[p] for p in _PRIORITIES if p < priority):
+                    self._cond.wait()
+            finally:
+                self._waiting[priority] -= 1
+            self._busy = True
+
+    def _release(self) -> None:
+        with self._cond:
+            self._busy = False
+            self._cond.notify_all()
+
+    # ------------------------------------------------------------------
+    def publish(self, key: Hashable, result: Any) -> None:
+        """Store ``result`` under ``key`` as if :meth:`run` had produced it.
+
+        Lets callers that drive the bus on their own (e.g. the asyncio path)
+        share their result with coalesced :meth:`run` calls.
+        """
+        with self._cond:
+            self._results[key] = (self._clock(), result)
+
+    def run(
+        self,
+        func: Callable[[], Any],
+        *,
+        key: Hashable | None = None,
+        priority: int = PRIORITY_CONTROL,
+        max_age_ms: float = 0.0,
+    ) -> Any:
+        """Execute ``func`` with exclusive bus access and return its result."""
+        if key is None:
+            self._acquire(priority)
+            try:
+                return func()
+            finally:
+                self._release()
+
+        with self._cond:
+            cached = self._results.get(key)
+            if cached is not None and max_age_ms > 0:
+                if (self._clock() - cached[0]) * 1000.0 <= max_age_ms:
+                    self.coalesced += 1
+                    return cached[1]
+            call = self._inflight.get(key)
+            owner = call is None
+            if owner:
+                call = self._inflight[key] = _Call()
+            else:
+                self.coalesced += 1
+
+        assert call is not None
+        if not owner:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            self._acquire(priority)
+            try:
+                call.result = func()
+            finally:
+                self._release()
+            with self._cond:
+                self._results[key] = (self._clock(), call.result)
+            return call.result
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._cond:
+                self._inflight.pop(key, None)
+            call.done.set()
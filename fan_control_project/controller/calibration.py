@@ -0,0 +1,130 @@
+"""Calibration of the DS3502 output against the measured fan response."""
+
+from __future__ import annotations
+
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from config.logging_config import logger
+
+# Forward table resolution: one entry per 0.1 %
+LUT_STEPS = 1000
+WIPER_CODES = 128
+
+
+def sweep(
+    write_wiper: Callable[[int], None],
+    measure: Callable[[int], float],
+    wipers: Sequence[int],
+    *,
+    settle_s: float = 3.0,
+    sleep: Callable[[float], None] = time.sleep,
+) -> List[Tuple[int, float]]:
+    """Step through ``wipers`` and return ``(wiper, response)`` pairs.
+
+    ``measure`` is called once the fan had ``settle_s`` seconds to follow the
+    new wiper position; it may read a sensor or ask the operator for a value.
+    """
+    points: List[Tuple[int, float]] = []
+    for wiper in wipers:
+        write_wiper(int(wiper))
+        sleep(settle_s)
+        response = float(measure(int(wiper)))
+        logger.info("Kalibrierung: Wiper %d -> %.3f", wiper, response)
+        points.append((int(wiper), response))
+    return points
+
+
+def sweep_positions(wiper_min: int, wiper_max: int, count: int) -> List[int]:
+    """Return ``count`` evenly spaced wiper codes from ``wiper_min`` to ``wiper_max``."""
+    count = max(2, int(count))
+    span = wiper_max - wiper_min
+    codes = [wiper_min + round(span * i / (count - 1)) for i in range(count)]
+    return sorted(set(codes))
+
+
+def _normalize(points: Sequence[Tuple[int, float]]) -> List[Tuple[int, float]]:
+    """Sort by wiper and scale the response to 0..100 %, forcing monotonicity."""
+    pts = sorted((int(w), float(r)) for w, r in points)
+    if len(pts) < 2:
+        raise ValueError("Mindestens zwei Kalibrierpunkte erforderlich")
+    if len({w for w, _ in pts}) != len(pts):
+        raise ValueError("Wiper-Positionen der Kalibrierung sind nicht eindeutig")
+    rising = pts[-1][1] >= pts[0][1]
+    lo = min(r for _, r in pts)
+    hi = max(r for _, r in pts)
+    if hi <= lo:
+        raise ValueError("Kalibrierung ohne messbare Aenderung")
+    ordered = pts if rising else pts[::-1]
+    result: List[Tuple[int, float]] = []
+    peak = lo
+    for wiper, response in ordered:
+        # measurement noise must not make the curve fold back on itself
+        peak = max(peak, response)
+        result.append((wiper, (peak - lo) / (hi - lo) * 100.0))
+    return result
+
+
+def build_lut(
+    points: Sequence[Tuple[int, float]], steps: int = LUT_STEPS
+) -> Tuple[List[int], List[float]]:
+    """Return the forward and inverse tables for the measured ``points``.
+
+    The forward table maps ``percent * steps / 100`` (rounded) to the wiper
+    code that produces that fraction of the measured response range; the
+    inverse table maps every wiper code 0..127 to its percent. Both tables are
+    piecewise linear between the measured points. The direction of the
+    response (rising or falling with the wiper) is taken from the sweep, so
+    ``invert`` does not apply to a calibrated output.
+    """
+    curve = _normalize(points)
+    forward: List[int] = []
+    seg = 0
+    for i in range(steps + 1):
+        pct = 100.0 * i / steps
+        while seg < len(curve) - 2 and curve[seg + 1][1] < pct:
+            seg += 1
+        (w0, p0), (w1, p1) = curve[seg], curve[seg + 1]
+        if p1 <= p0:
+            wiper = float(w1 if pct >= p1 else w0)
+        else:
+            frac = min(1.0, max(0.0, (pct - p0) / (p1 - p0)))
+            wiper = w0 + (w1 - w0) * frac
+        forward.append(max(0, min(WIPER_CODES - 1, int(round(wiper)))))
+
+    by_wiper = sorted(curve)
+    inverse: List[float] = []
+    for code in range(WIPER_CODES):
+        if code <= by_wiper[0][0]:
+            inverse.append(by_wiper[0][1])
+            continue
+        if code >= by_wiper[-1][0]:
+            inverse.append(by_wiper[-1][1])
+            continue
+        for (w0, p0), (w1, p1) in zip(by_wiper, by_wiper[1:]):
+            if w0 <= code <= w1:
+                inverse.append(p0 + (p1 - p0) * (code - w0) / (w1 - w0))
+                break
+    return forward, inverse
+
+
+def calibration_entry(points: Sequence[Tuple[int, float]]) -> Dict[str, list]:
+    """Return the config representation of a calibration."""
+    forward, inverse = build_lut(points)
+    return {
+        "points": [[w, r] for w, r in sorted(points)],
+        "lut": forward,
+        "lut_inverse": [round(p, 3) for p in inverse],
+    }
+
+
+def lut_from_config(calibration: Optional[Dict[str, list]]) -> Tuple[Optional[List[int]], Optional[List[float]]]:
+    """Return the stored tables, rebuilding them from ``points`` if needed."""
+    if not calibration:
+        return None, None
+    lut = calibration.get("lut") or None
+    inverse = calibration.get("lut_inverse") or None
+    points = calibration.get("points") or []
+    if (lut is None or inverse is None) and len(points) >= 2:
+        lut, inverse = build_lut([(int(w), float(r)) for w, r in points])
+    return lut, inverse
@@ -0,0 +1,72 @@
+"""Circuit breaker used to keep failing devices off the control path."""
+
+from __future__ import annotations
+
+import time
+from typing import Callable, Dict
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Track consecutive failures of one device.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and the
+    device is no longer accessed by the hot path. Once ``reset_timeout``
+    seconds have passed a probe may be started (half-open); a successful probe
+    closes the breaker, a failed one reopens it with a doubled timeout up to
+    ``max_reset_timeout``.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        reset_timeout: float = 5.0,
+        max_reset_timeout: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.base_timeout = float(reset_timeout)
+        self.max_reset_timeout = float(max_reset_timeout)
+        self._clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self.timeout = self.base_timeout
+        self.opened_at = 0.0
+
+    def allow_request(self) -> bool:
+        """Return True if the hot path may access the device."""
+        return self.state == CLOSED
+
+    def record_success(self) -> None:
+        self.state = CLOSED
+        self.failures = 0
+        self.timeout = self.base_timeout
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == HALF_OPEN:
+            self.timeout = min(self.timeout * 2, self.max_reset_timeout)
+            self._open()
+        elif self.failures >= self.failure_threshold:
+            self._open()
+
+    def trip(self) -> None:
+        """Open the breaker immediately, e.g. for a device missing at startup."""
+        self.failures = max(self.failures, self.failure_threshold)
+        self._open()
+
+    def probe_due(self) -> bool:
+        return self.state == OPEN and self._clock() - self.opened_at >= self.timeout
+
+    def begin_probe(self) -> None:
+        self.state = HALF_OPEN
+
+    def _open(self) -> None:
+        self.state = OPEN
+        self.opened_at = self._clock()
+
+    def as_dict(self) -> Dict[str, object]:
+        return {"state": self.state, "failures": self.failures, "retry_s": self.timeout}
@@ -10,10 +10,17 @@ from typing import Optional, List
 from .sensor_reader import SensorReader
 from .pid_controller import PIDController
 from .ds3502_output import FanDS3502Controller
+from .scheduler import FixedRateScheduler
+from .latency import PhaseTimings
+from history import HistoryBuffer
 from models import SystemState, Mode
 from models.sensor_info import SensorInfo
 from config.logging_config import logger
 
+_NAN = float("nan")
+# a stale sensor still reports its last (steady) temperature
+_VALID_STATUS = frozenset({"ok", "stale"})
+
 
 class ControlLoop:
     """Continuously update :class:`SystemState` and control the fan."""
@@ -27,6 +34,8 @@ class ControlLoop:
         sensors: List[SensorInfo],
         alarm_percent: float = 100.0,
         interval: float = 0.5,
+        skip_missed: bool = True,
+        history: Optional[HistoryBuffer] = None,
     ) -> None:
         self.state = state
         self.sensor_reader = sensor_reader
@@ -35,6 +44,10 @@ class ControlLoop:
         self.state.alarm_percent = alarm_percent
         self.interval = interval
         self.sensors = sensors
+        self.scheduler = FixedRateScheduler(interval, skip_missed=skip_missed)
+        self.timings = PhaseTimings()
+        self.history = history
+        self.alarm_transitions = 0
 
         self._thread: Optional[threading.Thread] = None
         self._running = False
@@ -73,6 +86,8 @@ class ControlLoop:
         if self._running:
             return
         self._running = True
+        self.state.commit()
+        self.state.set_tick_driven(True)
         self._thread = threading.Thread(target=self._run_loop, daemon=True)
         self._thread.start()
         logger.info("Control loop gestartet")
@@ -83,18 +98,45 @@ class ControlLoop:
         if self._thread is not None:
             self._thread.join()
             self._thread = None
+        self.state.set_tick_driven(False)
         self.actuator.stop()
+        if self.history is not None:
+            self.history.flush()
         logger.info("Control loop gestoppt")
 
     def _run_loop(self) -> None:
+        self.scheduler.start()
         while self._running:
+            self.scheduler.begin_tick()
             self.update_once()
-            time.sleep(self.interval)
+            delay = self.scheduler.end_tick()
+            if delay > 0:
+                time.sleep(delay)
+
+    def timing_stats(self) -> dict[str, object]:
+        """Return scheduler statistics and per-phase latency percentiles."""
+        stats: dict[str, object] = dict(self.scheduler.stats())
+        phases = self.timings.summary()
+        actuator_timings = getattr(self.actuator, "timings", None)
+        if isinstance(actuator_timings, PhaseTimings):
+            phases.update(actuator_timings.summary())
+        stats["phases"] = phases
+        actuator_status = getattr(self.actuator, "status", None)
+        if callable(actuator_status):
+            stats["actuator"] = actuator_status()
+        return stats
 
     def _read_temperatures(self) -> tuple[Optional[float], Optional[float]]:
         """Read both sensors and update state values."""
+        start = time.perf_counter()
         sensor_data = self.sensor_reader.read_all()
+        self.timings.observe("read", time.perf_counter() - start)
+        return self._apply_sensor_data(sensor_data)
 
+    def _apply_sensor_data(
+        self, sensor_data: dict[str, dict]
+    ) -> tuple[Optional[float], Optional[float]]:
+        """Map raw sensor readings onto the state and return control temps."""
         if self.state.swap_sensors:
             sensor1_info = self.sensors[1]
             sensor2_info = self.sensors[0]
@@ -122,7 +164,9 @@ class ControlLoop:
         self.state.status1 = status1
         self.state.status2 = status2
 
+        start = time.perf_counter()
         smooth_temp1, smooth_temp2 = self._apply_smoothing(temp1, temp2)
+        self.timings.observe("smoothing", time.perf_counter() - start)
 
         if smooth_temp1 is not None:
             self.state.temperature1 = smooth_temp1
@@ -178,7 +222,9 @@ class ControlLoop:
                 value = self.state.alarm_percent
             elif temp1 is not None:
                 self.pid.update_setpoint(self.state.setpoint)
+                start = time.perf_counter()
                 value = self.pid.compute(temp1)
+                self.timings.observe("pid", time.perf_counter() - start)
                 value = 100.0 - value
                 value = max(0.0, min(100.0, value))
             else:
@@ -186,16 +232,58 @@ class ControlLoop:
         else:
             value = self.state.output_pct
 
+        start = time.perf_counter()
         self.actuator.set_output(value)
+        self.timings.observe("set_output", time.perf_counter() - start)
         self.state.output_pct = value
         return value
 
+    def _record_history(self, postrun_active: bool) -> None:
+        s = self.state
+        # the state keeps the last value of a lost sensor; record a gap instead
+        ok1 = s.status1 in _VALID_STATUS
+        ok2 = s.status2 in _VALID_STATUS
+        self.history.append(
+            time.time(),
+            (
+                s.temperature1 if ok1 else _NAN,
+                s.temperature2 if ok2 else _NAN,
+                s.ambient1 if ok1 else _NAN,
+                s.ambient2 if ok2 else _NAN,
+                s.delta1 if ok1 else _NAN,
+                s.delta2 if ok2 else _NAN,
+                s.output_pct,
+                s.setpoint,
+            ),
+            alarm=s.alarm_active,
+            postrun=postrun_active,
+        )
+
     def update_once(self) -> None:
         """Perform a single control-loop iteration."""
+        start = time.perf_counter()
+        self.state.apply_commands()
         temp1, temp2 = self._read_temperatures()
+        self._control(temp1, temp2, start)
+
+    def _control(
+        self, temp1: Optional[float], temp2: Optional[float], start: float
+    ) -> None:
+        """Evaluate alarm state and drive the actuator for one iteration."""
         now = datetime.now()
+        before = (self.state.alarm_active, self.state.postrun_until is not None)
+        alarm_start = time.perf_counter()
         alarm, postrun_active = self._handle_alarm_state(temp2, now)
+        self.timings.observe("alarm", time.perf_counter() - alarm_start)
         final_value = self._compute_output(temp1, alarm, postrun_active)
+        self.timings.observe("total", time.perf_counter() - start)
+        transition = before != (self.state.alarm_active, self.state.postrun_until is not None)
+        if before[0] != self.state.alarm_active:
+            self.alarm_transitions += 1
+        self.state.commit()
+        if self.history is not None:
+            self._record_history(postrun_active)
+        self.state.changes.publish(urgent=transition)
         logger.debug(
             "Output berechnet: temp1=%s temp2=%s alarm=%s pct=%.2f",
             temp1,
@@ -2,9 +2,12 @@
 from __future__ import annotations
 
 import errno
+import math
 import threading
 import time
+from collections import deque
 from dataclasses import dataclass
+from typing import Callable, List, Optional, Sequence, Tuple
 
 try:  # pragma: no cover - hardware only
     import smbus2
@@ -14,6 +17,8 @@ except Exception:  # pragma: no cover
     _HAS_I2C = False
 
 from config.logging_config import logger
+from .latency import ErrorCounts, PhaseTimings
+from .i2c_deadline import DeadlineRunner
 
 
 @dataclass
@@ -25,12 +30,237 @@ class DS3502Config:
     slew_rate_pct_per_s: float = 0.0
     startup_percent: float = 0.0
     safe_low_on_fault: bool = True
+    timeout_ms: float = 100.0
+    write_behind: bool = True
+    ramp_hz: float = 0.0
+    # calibrated percent -> wiper table (see controller.calibration)
+    lut: Optional[Sequence[int]] = None
+    lut_inverse: Optional[Sequence[float]] = None
+    # alternate adjacent wiper codes for fractional resolution
+    dither: bool = False
+    dither_max_writes_per_s: float = 10.0
+
+
+def build_ramp_schedule(
+    start_pct: float,
+    target_pct: float,
+    rate_pct_per_s: float,
+    step_s: float,
+    to_wiper: Callable[[float], int],
+) -> List[Tuple[float, float]]:
+    """Return ``(offset_s, percent)`` ramp steps from ``start_pct`` to ``target_pct``.
+
+    Steps are spaced ``step_s`` apart and limited to ``rate_pct_per_s``. Only
+    steps that change the wiper code are kept; the final step always lands
+    exactly on the target. Without a rate limit the target is reached at once.
+    """
+    delta = target_pct - start_pct
+    if rate_pct_per_s <= 0 or delta == 0:
+        return [(0.0, target_pct)]
+    count = max(1, math.ceil(abs(delta) / (rate_pct_per_s * step_s)))
+    schedule: List[Tuple[float, float]] = []
+    last_wiper = to_wiper(start_pct)
+    for k in range(1, count + 1):
+        pct = target_pct if k == count else start_pct + delta * k / count
+        wiper = to_wiper(pct)
+        if wiper != last_wiper or k == count:
+            schedule.append((k * step_s, pct))
+            last_wiper = wiper
+    return schedule
+
+
+class SigmaDelta:
+    """First-order sigma-delta modulator for fractional wiper codes.
+
+    The rounding error of every step is carried into the next one, so the
+    average of the emitted codes converges to the requested fractional code.
+    """
+
+    __slots__ = ("error",)
+
+    def __init__(self) -> None:
+        self.error = 0.0
+
+    def step(self, exact: float) -> int:
+        desired = exact + self.error
+        code = int(math.floor(desired + 0.5))
+        self.error = desired - code
+        return code
+
+    def reset(self) -> None:
+        self.error = 0.0
+
+
+class _Periodic:
+    """Steps that run at one rate on a shared thread."""
+
+    __slots__ = ("hz", "steps", "lock", "stop", "thread")
+
+    def __init__(self, hz: float) -> None:
+        self.hz = hz
+        self.steps: List[Callable[[float], None]] = []
+        # reentrant: a step may start another step of the same rate
+        self.lock = threading.RLock()
+        self.stop = threading.Event()
+        self.thread: threading.Thread | None = None
+
+
+class DS3502Bus:
+    """I2C bus shared by all DS3502 actuators on it.
+
+    Owns the bus handle, one :class:`DeadlineRunner`, one write-behind
+    thread and one thread per periodic rate (ramp, dither), so adding an
+    actuator adds no threads. The write-behind mailbox keeps only the most
+    recent target per actuator; actuators with a pending target are served
+    in the order they posted. The deadline uses ``timeout_ms`` for every
+    actuator on the bus.
+    """
+
+    def __init__(self, bus_number: int = 1, timeout_ms: float = 100.0, bus: object | None = None) -> None:
+        self.bus_number = bus_number
+        self.bus = bus
+        if bus is None and _HAS_I2C:
+            try:
+                self.bus = smbus2.SMBus(bus_number)
+            except Exception:  # pragma: no cover - hardware error
+                logger.error("I2C-Bus %d fuer DS3502 nicht verfuegbar", bus_number, extra={"actuator": "ds3502"})
+        self.deadline = DeadlineRunner(timeout_ms / 1000.0, name="ds3502")
+        self._lock = threading.Lock()
+        # write-behind mailbox: latest target per actuator
+        self._cond = threading.Condition()
+        self._pending: dict[FanDS3502Controller, tuple[float, bool, int, float]] = {}
+        self._busy: FanDS3502Controller | None = None
+        self._writers: set[FanDS3502Controller] = set()
+        self._writer: threading.Thread | None = None
+        self._periodic: dict[float, _Periodic] = {}
+
+    # ----------------------------- write-behind ----------------------
+    def add_writer(self, ctrl: "FanDS3502Controller") -> None:
+        with self._cond:
+            self._writers.add(ctrl)
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._writer_loop, name="ds3502-writer", daemon=True)
+                self._writer.start()
+
+    def remove_writer(self, ctrl: "FanDS3502Controller") -> None:
+        """Stop serving ``ctrl``; the thread ends with the last actuator."""
+        with self._cond:
+            self._writers.discard(ctrl)
+            self._pending.pop(ctrl, None)
+            thread = self._writer if not self._writers else None
+            if thread is not None:
+                self._writer = None
+            self._cond.notify_all()
+        if thread is not None:
+            thread.join(timeout=1.0)
+
+    def post(self, ctrl: "FanDS3502Controller", item: tuple[float, bool, int, float]) -> None:
+        with self._cond:
+            self._pending[ctrl] = item
+            self._cond.notify_all()
+
+    def is_pending(self, ctrl: "FanDS3502Controller") -> bool:
+        return ctrl in self._pending
+
+    def flush(self, ctrl: "FanDS3502Controller", timeout: float = 1.0) -> bool:
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: ctrl not in self._pending and self._busy is not ctrl, timeout=timeout
+            )
+
+    def _writer_loop(self) -> None:
+        me = threading.current_thread()
+        while True:
+            with self._cond:
+                while not self._pending and self._writer is me:
+                    self._cond.wait()
+                if self._writer is not me:
+                    return
+                ctrl = next(iter(self._pending))
+                percent, slew_applied, dt_ms, posted = self._pending.pop(ctrl)
+                self._busy = ctrl
+            try:
+                ctrl._apply(percent, slew_applied, dt_ms, posted)
+            except Exception as exc:  # pragma: no cover - defensive
+                ctrl.write_failures += 1
+                logger.error("DS3502 Schreibthread-Fehler: %s", exc, extra={"actuator": "ds3502"})
+            finally:
+                with self._cond:
+                    self._busy = None
+                    self._cond.notify_all()
+
+    # ----------------------------- periodic steps --------------------
+    def add_periodic(self, hz: float, step_fn: Callable[[float], None]) -> None:
+        """Call ``step_fn(now)`` ``hz`` times per second on the rate's thread."""
+        while True:
+            with self._lock:
+                group = self._periodic.get(hz)
+                if group is None:
+                    group = self._periodic[hz] = _Periodic(hz)
+                    group.thread = threading.Thread(
+                        target=self._run_periodic, args=(group,), name=f"ds3502-{hz:g}hz", daemon=True
+                    )
+                    group.thread.start()
+            # lock order: group.lock before self._lock, never the reverse
+            with group.lock:
+                if not group.stop.is_set():
+                    group.steps.append(step_fn)
+                    return
+
+    def remove_periodic(self, hz: float, step_fn: Callable[[float], None]) -> None:
+        """Unregister ``step_fn``; once this returns it is not running."""
+        group = self._periodic.get(hz)
+        if group is None:
+            return
+        with group.lock:
+            if step_fn in group.steps:
+                group.steps.remove(step_fn)
+            if group.steps:
+                return
+            group.stop.set()
+            with self._lock:
+                if self._periodic.get(hz) is group:
+                    del self._periodic[hz]
+        if group.thread is not threading.current_thread():
+            group.thread.join(timeout=1.0)
+
+    def tick(self, hz: float, now: float) -> None:
+        """Run the steps registered for ``hz`` once."""
+        group = self._periodic.get(hz)
+        if group is None:
+            return
+        self._tick(group, now)
+
+    @staticmethod
+    def _tick(group: _Periodic, now: float) -> None:
+        with group.lock:
+            for step_fn in list(group.steps):
+                try:
+                    step_fn(now)
+                except Exception as exc:  # pragma: no cover - defensive
+                    logger.error("DS3502 Taktfehler: %s", exc, extra={"actuator": "ds3502"})
+
+    def _run_periodic(self, group: _Periodic) -> None:
+        step = 1.0 / group.hz
+        next_tick = time.monotonic()
+        while not group.stop.is_set():
+            self._tick(group, time.monotonic())
+            next_tick += step
+            delay = next_tick - time.monotonic()
+            if delay < 0:
+                next_tick = time.monotonic()
+                delay = 0.0
+            group.stop.wait(delay)
 
 
 class FanDS3502Controller:
-    """Control the fan via an Adafruit DS3502 digipot."""
+    """Control the fan via an Adafruit DS3502 digipot.
+
+    Actuators on the same I2C bus should share one :class:`DS3502Bus`
+    (``shared``); without one, the controller creates its own.
+    """
 
-    def __init__(self, config: DS3502Config | None = None) -> None:
+    def __init__(self, config: DS3502Config | None = None, shared: DS3502Bus | None = None) -> None:
         self.cfg = config or DS3502Config()
         # allow hex strings or ints
         if isinstance(self.cfg.address, str):
@@ -41,16 +271,42 @@ class FanDS3502Controller:
         self.last_percent = self.cfg.startup_percent
         self.last_update = time.monotonic()
         self.available = False
-        self.bus = None
+        self.shared = shared or DS3502Bus(timeout_ms=self.cfg.timeout_ms)
+        self.bus = self.shared.bus
         self._lock = threading.Lock()
         self._last_wiper: int | None = None
-        if _HAS_I2C:
+        self._lut: tuple[int, ...] | None = None
+        self._lut_scale = 0.0
+        self._lut_inverse: tuple[float, ...] | None = None
+        self._lut_dir = 1
+        self.load_calibration(self.cfg.lut, self.cfg.lut_inverse)
+        self.timings = PhaseTimings()
+        self.deadline = self.shared.deadline
+        # write-behind, ramp and dither run on the shared bus threads;
+        # None = not started, True = active, False = stopped for good
+        self._writer_state: bool | None = None
+        self.applied_wiper: int | None = None
+        self.last_write_latency_ms = 0.0
+        self.write_failures = 0
+        # writes skipped because the wiper already had the target value
+        self.skipped_writes = 0
+        # wiper driven low after a failed write (safe_low_on_fault)
+        self.failsafe_writes = 0
+        # transient write errors that were retried, by errno
+        self.write_retries = ErrorCounts()
+        # output ramp between control targets
+        self._ramp_lock = threading.Lock()
+        self._ramp: deque[tuple[float, float]] = deque()
+        self._ramp_state: bool | None = None
+        # sigma-delta dithering
+        self._dither = SigmaDelta()
+        self._dither_state: bool | None = None
+        if self.bus is not None:
             try:
-                self.bus = smbus2.SMBus(1)
                 # light presence check via register read
-                self.bus.read_byte_data(self.cfg.address, 0x00)
+                self.deadline.call(self.bus.read_byte_data, self.cfg.address, 0x00)
                 # set MODE=WR-only to avoid EEPROM writes
-                self.bus.write_byte_data(self.cfg.address, 0x02, 0x80)
+                self.deadline.call(self.bus.write_byte_data, self.cfg.address, 0x02, 0x80)
                 self.available = True
             except Exception:  # pragma: no cover - hardware error
                 logger.error(
@@ -68,11 +324,14 @@ class FanDS3502Controller:
             },
         )
         if self.available:
-            self._write_wiper(self.last_percent, False, 0)
+            self._apply(self.last_percent, False, 0, time.monotonic())
 
     # ----------------------------- internal helpers -----------------
     def _percent_to_wiper(self, percent: float) -> int:
         pct = max(0.0, min(100.0, percent))
+        if self._lut is not None:
+            wiper = self._lut[int(pct * self._lut_scale + 0.5)]
+            return max(self.cfg.wiper_min, min(self.cfg.wiper_max, wiper))
         if self.cfg.invert:
             pct = 100.0 - pct
         span = self.cfg.wiper_max - self.cfg.wiper_min
@@ -80,21 +339,68 @@ class FanDS3502Controller:
         wiper = max(self.cfg.wiper_min, min(self.cfg.wiper_max, wiper))
         return max(0, min(127, wiper))
 
-    def _write_wiper(self, percent: float, slew_applied: bool, dt_ms: int) -> None:
-        wiper = self._percent_to_wiper(percent)
+    def _percent_to_wiper_exact(self, percent: float) -> float:
+        """Return the fractional wiper position for ``percent``."""
+        pct = max(0.0, min(100.0, percent))
+        lo, hi = self.cfg.wiper_min, self.cfg.wiper_max
+        if self._lut is not None:
+            code = self._lut[int(pct * self._lut_scale + 0.5)]
+            exact = float(code)
+            inverse = self._lut_inverse
+            nxt = code + self._lut_dir
+            if inverse is not None and 0 <= nxt <= 127 and inverse[nxt] != inverse[code]:
+                frac = (pct - inverse[code]) / (inverse[nxt] - inverse[code])
+                exact += self._lut_dir * max(-1.0, min(1.0, frac))
+            return max(lo, min(hi, exact))
+        if self.cfg.invert:
+            pct = 100.0 - pct
+        return max(lo, min(hi, lo + pct / 100.0 * (hi - lo)))
+
+    def wiper_to_percent(self, wiper: int) -> float:
+        """Return the output percent that corresponds to ``wiper``."""
+        code = max(0, min(127, int(wiper)))
+        if self._lut_inverse is not None:
+            return self._lut_inverse[code]
+        span = self.cfg.wiper_max - self.cfg.wiper_min
+        pct = (code - self.cfg.wiper_min) / span * 100.0 if span else 0.0
+        pct = max(0.0, min(100.0, pct))
+        return 100.0 - pct if self.cfg.invert else pct
+
+    def load_calibration(
+        self, lut: Optional[Sequence[int]], lut_inverse: Optional[Sequence[float]] = None
+    ) -> None:
+        """Use ``lut`` for the percent to wiper mapping (``None`` = linear)."""
+        if lut is not None and len(lut) < 2:
+            raise ValueError("Kalibriertabelle zu kurz")
+        if lut_inverse is not None and len(lut_inverse) != 128:
+            raise ValueError("Inverse Kalibriertabelle muss 128 Eintraege haben")
+        self._lut = tuple(int(w) for w in lut) if lut is not None else None
+        self._lut_scale = (len(self._lut) - 1) / 100.0 if self._lut is not None else 0.0
+        self._lut_inverse = tuple(float(p) for p in lut_inverse) if lut_inverse is not None else None
+        self._lut_dir = -1 if self._lut_inverse and self._lut_inverse[-1] < self._lut_inverse[0] else 1
+        self.cfg.lut = lut
+        self.cfg.lut_inverse = lut_inverse
+
+    def _write_wiper(self, percent: float, slew_applied: bool, dt_ms: int, wiper: int | None = None) -> bool:
+        """Write the wiper for ``percent``; return False if the write failed."""
+        if wiper is None:
+            wiper = self._percent_to_wiper(percent)
         if not (self.available and self.bus):
-            return
+            return True
         if self._last_wiper == wiper:
-            return
+            self.skipped_writes += 1
+            return True
         attempt = 0
         start = time.monotonic()
         with self._lock:
             while True:
                 attempt += 1
                 try:
-                    self.bus.write_byte_data(self.cfg.address, 0x00, wiper)
+                    self.deadline.call(self.bus.write_byte_data, self.cfg.address, 0x00, wiper)
                     self._last_wiper = wiper
-                    elapsed = int((time.monotonic() - start) * 1000)
+                    duration = time.monotonic() - start
+                    self.timings.observe("write_wiper", duration)
+                    elapsed = int(duration * 1000)
                     logger.debug(
                         "DS3502 Wiper gesetzt",
                         extra={
@@ -110,7 +416,7 @@ class FanDS3502Controller:
                             "duration_ms": elapsed,
                         },
                     )
-                    return
+                    return True
                 except OSError as exc:  # pragma: no cover - hardware error
                     err = exc.errno or 0
                     elapsed = int((time.monotonic() - start) * 1000)
@@ -130,13 +436,18 @@ class FanDS3502Controller:
                         },
                     )
                     if err not in (errno.EREMOTEIO, errno.EIO) or attempt >= 3:
+                        self.timings.observe("write_wiper", time.monotonic() - start)
                         if self.cfg.safe_low_on_fault:
+                            self.failsafe_writes += 1
                             time.sleep(0.01)
                             try:
-                                self.bus.write_byte_data(self.cfg.address, 0x00, self._percent_to_wiper(0.0))
+                                self.deadline.call(
+                                    self.bus.write_byte_data, self.cfg.address, 0x00, self._percent_to_wiper(0.0)
+                                )
                             except Exception:
                                 pass
-                        return
+                        return False
+                    self.write_retries.add(err)
                     time.sleep(0.002 * (2 ** (attempt - 1)))
 
     # ----------------------------- public API -----------------------
@@ -144,6 +455,9 @@ class FanDS3502Controller:
         now = time.monotonic()
         dt = now - self.last_update
         target = max(0.0, min(100.0, percent))
+        if self.available and self.cfg.ramp_hz > 0 and self._ensure_ramp():
+            self._schedule_ramp(target, now)
+            return
         slew_applied = False
         if self.cfg.slew_rate_pct_per_s > 0:
             max_delta = self.cfg.slew_rate_pct_per_s * dt
@@ -156,7 +470,7 @@ class FanDS3502Controller:
         wiper = self._percent_to_wiper(target)
         dt_ms = int(dt * 1000)
         if self.available:
-            self._write_wiper(target, slew_applied, dt_ms)
+            self._dispatch(target, slew_applied, dt_ms, now)
         else:
             logger.debug(
                 "DS3502 Dummy-Ausgabe",
@@ -173,8 +487,139 @@ class FanDS3502Controller:
                 },
             )
 
+    def set_wiper(self, wiper: int) -> None:
+        """Write a raw wiper code, bypassing the output mapping (calibration)."""
+        code = max(0, min(127, int(wiper)))
+        if not (self.available and self.bus):
+            logger.debug("DS3502 Dummy-Wiper %d", code, extra={"actuator": "ds3502", "wiper": code})
+            return
+        with self._lock:
+            self.deadline.call(self.bus.write_byte_data, self.cfg.address, 0x00, code)
+            self._last_wiper = code
+            self.applied_wiper = code
+
     def stop(self) -> None:
+        self._stop_ramp()
+        self._stop_dither()
         self.set_output(0.0)
+        self.flush()
+        self._stop_worker()
+
+    def _dispatch(self, percent: float, slew_applied: bool, dt_ms: int, now: float) -> None:
+        if self.cfg.dither and self._ensure_dither():
+            # the dither thread picks up last_percent on its next tick
+            return
+        if self.cfg.write_behind and self._ensure_worker():
+            self._post(percent, slew_applied, dt_ms)
+        else:
+            self._apply(percent, slew_applied, dt_ms, now)
+
+    # ----------------------------- output ramp -----------------------
+    def _ensure_ramp(self) -> bool:
+        if self._ramp_state is None:
+            self._ramp_state = True
+            self.shared.add_periodic(self.cfg.ramp_hz, self._ramp_step)
+        return self._ramp_state
+
+    def _schedule_ramp(self, target: float, now: float) -> None:
+        steps = build_ramp_schedule(
+            self.last_percent,
+            target,
+            self.cfg.slew_rate_pct_per_s,
+            1.0 / self.cfg.ramp_hz,
+            self._percent_to_wiper,
+        )
+        with self._ramp_lock:
+            self._ramp = deque((now + offset, pct) for offset, pct in steps)
+
+    def _ramp_step(self, now: float) -> None:
+        """Apply the most recent ramp step that is due at ``now``."""
+        with self._ramp_lock:
+            due: tuple[float, float] | None = None
+            while self._ramp and self._ramp[0][0] <= now:
+                due = self._ramp.popleft()
+            remaining = bool(self._ramp)
+        if due is None:
+            return
+        dt_ms = int((now - self.last_update) * 1000)
+        self.last_percent = due[1]
+        self.last_update = now
+        self._dispatch(due[1], remaining, dt_ms, now)
+
+    def _stop_ramp(self) -> None:
+        if self._ramp_state:
+            self.shared.remove_periodic(self.cfg.ramp_hz, self._ramp_step)
+        self._ramp_state = False
+        with self._ramp_lock:
+            self._ramp.clear()
+
+    # ----------------------------- dithering -----------------------
+    def _ensure_dither(self) -> bool:
+        if self._dither_state is None:
+            if self.cfg.dither_max_writes_per_s <= 0:
+                return False
+            self._dither_state = True
+            self._dither.reset()
+            self.shared.add_periodic(self.cfg.dither_max_writes_per_s, self._dither_step)
+        return self._dither_state
+
+    def _dither_step(self, now: float) -> None:
+        """Write the next code of the modulated output (at most one write)."""
+        percent = self.last_percent
+        code = self._dither.step(self._percent_to_wiper_exact(percent))
+        self._apply(percent, False, int(1000.0 / self.cfg.dither_max_writes_per_s), now, wiper=code)
+
+    def _stop_dither(self) -> None:
+        if self._dither_state:
+            self.shared.remove_periodic(self.cfg.dither_max_writes_per_s, self._dither_step)
+        self._dither_state = False
+
+    # ----------------------------- write-behind worker ---------------
+    def _apply(
+        self, percent: float, slew_applied: bool, dt_ms: int, posted: float, wiper: int | None = None
+    ) -> None:
+        ok = self._write_wiper(percent, slew_applied, dt_ms, wiper)
+        self.last_write_latency_ms = (time.monotonic() - posted) * 1000.0
+        if ok:
+            self.applied_wiper = self._last_wiper
+        else:
+            self.write_failures += 1
+
+    def _ensure_worker(self) -> bool:
+        if self._writer_state is None:
+            self._writer_state = True
+            self.shared.add_writer(self)
+        return self._writer_state
+
+    def _post(self, percent: float, slew_applied: bool, dt_ms: int) -> None:
+        self.shared.post(self, (percent, slew_applied, dt_ms, time.monotonic()))
+
+    def _stop_worker(self) -> None:
+        if self._writer_state:
+            self.shared.remove_writer(self)
+        self._writer_state = False
+
+    def flush(self, timeout: float = 1.0) -> bool:
+        """Wait until the queued target has been written."""
+        return self.shared.flush(self, timeout)
+
+    def status(self) -> dict[str, object]:
+        """Return the state of the actuator output path."""
+        return {
+            "target_pct": self.last_percent,
+            "target_wiper": self._percent_to_wiper(self.last_percent),
+            "applied_wiper": self.applied_wiper,
+            "applied_pct": None if self.applied_wiper is None else self.wiper_to_percent(self.applied_wiper),
+            "calibrated": self._lut is not None,
+            "target_wiper_exact": self._percent_to_wiper_exact(self.last_percent),
+            "dither": bool(self.cfg.dither),
+            "last_write_latency_ms": self.last_write_latency_ms,
+            "write_failures": self.write_failures,
+            "skipped_writes": self.skipped_writes,
+            "failsafe_writes": self.failsafe_writes,
+            "pending": self.shared.is_pending(self),
+            "ramp_steps": len(self._ramp),
+        }
 
     def save_as_default(self) -> None:  # pragma: no cover - hardware only
         if self.available and self.bus:
@@ -0,0 +1,135 @@
+"""Run blocking I2C transactions under a deadline."""
+
+from __future__ import annotations
+
+import errno
+import queue
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from config.logging_config import logger
+
+
+class I2CTimeoutError(OSError):
+    """Raised when an I2C transaction did not finish within its deadline."""
+
+    def __init__(self, message: str) -> None:
+        super().__init__(errno.ETIMEDOUT, message)
+
+
+class _Job:
+    __slots__ = ("func", "args", "kwargs", "done", "result", "error", "started", "abandoned")
+
+    def __init__(self, func: Callable[..., Any], args: tuple, kwargs: dict) -> None:
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.started = False
+        self.abandoned = False
+
+
+class DeadlineRunner:
+    """Execute callables on one daemon worker thread and give up after ``timeout``.
+
+    All transactions of a runner run one after another on the same worker,
+    so the bus stays serialized. A transaction that overruns is abandoned:
+    the caller gets :class:`I2CTimeoutError` while the worker stays blocked
+    in it. Until that transaction returns the bus is considered wedged and
+    every call fails immediately. Once it returns, the optional ``recovery``
+    callable runs on the worker before the next transaction. The worker is a
+    daemon thread, so a transaction that never returns does not keep the
+    process from exiting. A ``timeout`` of 0 disables the worker and calls
+    ``func`` directly.
+    """
+
+    def __init__(
+        self,
+        timeout: float,
+        *,
+        name: str = "i2c",
+        recovery: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self.timeout = float(timeout)
+        self.name = name
+        self.recovery = recovery
+        self._lock = threading.Lock()
+        self._jobs: "queue.SimpleQueue[_Job]" = queue.SimpleQueue()
+        self._worker: Optional[threading.Thread] = None
+        self._hung = False
+        self.timeouts = 0
+        self.recoveries = 0
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, name=f"{self.name}-deadline", daemon=True)
+            self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            job = self._jobs.get()
+            with self._lock:
+                if job.abandoned:
+                    # timed out while still queued; never touched the bus
+                    continue
+                job.started = True
+            try:
+                job.result = job.func(*job.args, **job.kwargs)
+            except BaseException as exc:
+                job.error = exc
+            with self._lock:
+                job.done.set()
+                abandoned = job.abandoned
+            if abandoned:
+                logger.warning("%s: Haengende Transaktion beendet", self.name)
+                self._recover()
+                with self._lock:
+                    self._hung = False
+
+    def call(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run ``func`` and return its result or raise :class:`I2CTimeoutError`."""
+        if self.timeout <= 0:
+            return func(*args, **kwargs)
+        job = _Job(func, args, kwargs)
+        with self._lock:
+            if self._hung:
+                raise I2CTimeoutError(f"{self.name}: Bus blockiert (haengende Transaktion)")
+            self._ensure_worker()
+            self._jobs.put(job)
+        if not job.done.wait(self.timeout):
+            with self._lock:
+                if not job.done.is_set():
+                    job.abandoned = True
+                    self.timeouts += 1
+                    if job.started:
+                        self._hung = True
+            if job.abandoned:
+                logger.error(
+                    "%s: Transaktion nach %.0f ms abgebrochen",
+                    self.name,
+                    self.timeout * 1000,
+                    extra={"status": "timeout"},
+                )
+                raise I2CTimeoutError(f"{self.name}: Zeitlimit ueberschritten")
+        if job.error is not None:
+            raise job.error
+        return job.result
+
+    def _recover(self) -> None:
+        if self.recovery is None:
+            return
+        try:
+            self.recovery()
+            self.recoveries += 1
+            logger.warning("%s: Bus-Recovery ausgefuehrt", self.name)
+        except Exception as exc:  # pragma: no cover - hardware dependent
+            logger.error("%s: Bus-Recovery fehlgeschlagen: %s", self.name, exc)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "timeouts": self.timeouts,
+            "pending_hung": int(self._hung),
+            "recoveries": self.recoveries,
+        }
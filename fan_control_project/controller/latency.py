@@ -0,0 +1,157 @@
+"""Fixed-bucket latency histograms and error counters for the metrics."""
+
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, List, Sequence, Tuple
+
+# Upper bucket bounds in seconds (50 us .. 2 s); the last bucket is open-ended.
+DEFAULT_BOUNDS: Tuple[float, ...] = (
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.0,
+)
+
+
+class LatencyHistogram:
+    """Count durations into fixed buckets without storing samples.
+
+    ``observe`` is a bisect plus two additions under an uncontended lock,
+    cheap enough for the control thread. :meth:`snapshot` copies buckets,
+    count and sum under the same lock so they always agree. Percentiles are
+    estimated from the bucket upper bounds and capped at the observed
+    maximum.
+    """
+
+    __slots__ = ("bounds", "counts", "count", "total", "max", "_lock")
+
+    def __init__(self, bounds: Sequence[float] = DEFAULT_BOUNDS) -> None:
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        """Add one duration in seconds."""
+        idx = bisect_left(self.bounds, seconds)
+        with self._lock:
+            self.counts[idx] += 1
+            self.count += 1
+            self.total += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def snapshot(self) -> Tuple[List[int], float, float]:
+        """Return consistent copies of ``(counts, total, max)``."""
+        with self._lock:
+            return list(self.counts), self.total, self.max
+
+    def percentile(self, q: float) -> float:
+        """Return the estimated ``q``-th percentile (0-100) in seconds."""
+        counts, _total, peak = self.snapshot()
+        return self._percentile(counts, peak, q)
+
+    def _percentile(self, counts: List[int], peak: float, q: float) -> float:
+        count = sum(counts)
+        if count == 0:
+            return 0.0
+        rank = q / 100.0 * count
+        seen = 0
+        for idx, n in enumerate(counts):
+            seen += n
+            if seen >= rank and n:
+                bound = self.bounds[idx] if idx < len(self.bounds) else peak
+                return min(bound, peak)
+        return peak
+
+    def summary(self) -> Dict[str, float | int]:
+        """Return count, mean, p50/p95/p99 and max in milliseconds."""
+        counts, total, peak = self.snapshot()
+        count = sum(counts)
+        return {
+            "count": count,
+            "mean_ms": (total / count * 1000.0) if count else 0.0,
+            "p50_ms": self._percentile(counts, peak, 50) * 1000.0,
+            "p95_ms": self._percentile(counts, peak, 95) * 1000.0,
+            "p99_ms": self._percentile(counts, peak, 99) * 1000.0,
+            "max_ms": peak * 1000.0,
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counts = [0] * (len(self.bounds) + 1)
+            self.count = 0
+            self.total = 0.0
+            self.max = 0.0
+
+
+class ErrorCounts(Counter):
+    """Counter of error codes that a scrape can copy while threads count.
+
+    Count with :meth:`add` and read with :meth:`snapshot`; both take a lock
+    that is only held for the update or the copy.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._lock = threading.Lock()
+
+    def add(self, code: int, n: int = 1) -> None:
+        with self._lock:
+            self[code] += n
+
+    def snapshot(self) -> Dict[int, int]:
+        with self._lock:
+            return dict(self)
+
+
+class PhaseTimings:
+    """Named collection of :class:`LatencyHistogram` objects.
+
+    New phases are added under a lock, and readers copy the phase dict under
+    it, so a scrape can iterate while the control thread adds a phase.
+    """
+
+    def __init__(self) -> None:
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, phase: str) -> LatencyHistogram:
+        hist = self._histograms.get(phase)
+        if hist is None:
+            with self._lock:
+                hist = self._histograms.setdefault(phase, LatencyHistogram())
+        return hist
+
+    def observe(self, phase: str, seconds: float) -> None:
+        """Record a duration for ``phase``."""
+        self.histogram(phase).observe(seconds)
+
+    def items(self) -> List[Tuple[str, LatencyHistogram]]:
+        """Return ``(phase, histogram)`` pairs."""
+        with self._lock:
+            return list(self._histograms.items())
+
+    def summary(self) -> Dict[str, Dict[str, float | int]]:
+        """Return :meth:`LatencyHistogram.summary` for every phase."""
+        return {name: hist.summary() for name, hist in self.items()}
+
+    def reset(self) -> None:
+        for _name, hist in self.items():
+            hist.reset()
@@ -0,0 +1,197 @@
+"""Register-level MCP9600 driver on top of :mod:`smbus2`.
+
+Every register is read with one ``i2c_rdwr`` ioctl holding a pointer write
+and a single read joined by a repeated start. The Raspberry Pi's
+i2c-bcm2835 driver rejects transfers with more than one read message (or
+a read that is not last) with ``EOPNOTSUPP``, so registers are never
+combined into one transfer. The message objects and their buffers are
+allocated once per sensor and reused on every read.
+"""
+
+from __future__ import annotations
+
+import errno
+from ctypes import POINTER, c_char, c_uint8, cast
+from typing import Any, List, Optional, Tuple
+
+try:  # pragma: no cover - exercised whenever smbus2 is installed
+    from smbus2 import i2c_msg
+    from smbus2.smbus2 import I2C_M_RD
+    _HAS_SMBUS2 = True
+except Exception:  # pragma: no cover
+    i2c_msg = None  # type: ignore
+    I2C_M_RD = 0x0001
+    _HAS_SMBUS2 = False
+
+from config.logging_config import logger
+
+REG_HOT_JUNCTION = 0x00
+REG_JUNCTION_DELTA = 0x01
+REG_COLD_JUNCTION = 0x02
+REG_STATUS = 0x04
+REG_SENSOR_CONFIG = 0x05
+REG_DEVICE_CONFIG = 0x06
+REG_DEVICE_ID = 0x20
+
+DEVICE_ID = 0x40
+LSB_CELSIUS = 0.0625
+
+STATUS_BURST_COMPLETE = 0x80
+STATUS_TH_UPDATE = 0x40
+
+THERMOCOUPLE_TYPES = {"K": 0, "J": 1, "T": 2, "N": 3, "S": 4, "E": 5, "B": 6, "R": 7}
+SHUTDOWN_MODES = {"continuous": 0b00, "shutdown": 0b01, "burst": 0b10}
+
+
+def _to_celsius(msb: int, lsb: int) -> float:
+    raw = (msb << 8) | lsb
+    if raw & 0x8000:
+        raw -= 0x10000
+    return raw * LSB_CELSIUS
+
+
+class _Transfer:
+    """Pre-built pointer-write/read message pair for one register."""
+
+    __slots__ = ("write", "read", "data")
+
+    def __init__(self, address: int, register: int, length: int) -> None:
+        self.data = (c_uint8 * length)()
+        self.write = i2c_msg.write(address, [register])
+        self.read = i2c_msg(
+            addr=address, flags=I2C_M_RD, len=length, buf=cast(self.data, POINTER(c_char))
+        )
+
+
+class MCP9600:
+    """Minimal MCP9600 driver compatible with ``adafruit_mcp9600.MCP9600``.
+
+    ``bus`` is an :class:`smbus2.SMBus` (or any object providing
+    ``i2c_rdwr``, ``read_byte_data`` and ``write_byte_data``).
+    """
+
+    def __init__(
+        self,
+        bus: Any,
+        *,
+        address: int = 0x67,
+        tctype: str = "K",
+        tcfilter: int = 0,
+        conversion: str = "continuous",
+    ) -> None:
+        if not _HAS_SMBUS2:
+            raise RuntimeError("smbus2 nicht installiert")
+        self.bus = bus
+        self.address = address
+        tc = str(tctype).upper()
+        if tc not in THERMOCOUPLE_TYPES:
+            raise ValueError(f"Unbekannter Thermoelement-Typ: {tctype}")
+        if not 0 <= int(tcfilter) <= 7:
+            raise ValueError("tcfilter muss zwischen 0 und 7 liegen")
+
+        device_id = bus.read_byte_data(address, REG_DEVICE_ID)
+        if device_id != DEVICE_ID:
+            raise OSError(errno.ENODEV, f"Unerwartete Device-ID 0x{device_id:02x}")
+        bus.write_byte_data(address, REG_SENSOR_CONFIG, (THERMOCOUPLE_TYPES[tc] << 4) | int(tcfilter))
+        self.conversion_mode = conversion
+
+        self._status = _Transfer(address, REG_STATUS, 1)
+        self._hot = _Transfer(address, REG_HOT_JUNCTION, 2)
+        self._delta = _Transfer(address, REG_JUNCTION_DELTA, 2)
+        self._cold = _Transfer(address, REG_COLD_JUNCTION, 2)
+        self._all_transfers = (self._status, self._hot, self._delta, self._cold)
+        # write-only transfer that clears the update/burst flags
+        self._clear_data = (c_uint8 * 2)(REG_STATUS, 0)
+        self._clear_msg = i2c_msg(addr=address, flags=0, len=2, buf=cast(self._clear_data, POINTER(c_char)))
+        logger.debug("MCP9600 (smbus2) initialisiert an %s", hex(address))
+
+    # ------------------------------------------------------------------
+    @property
+    def conversion_mode(self) -> str:
+        return self._conversion
+
+    @conversion_mode.setter
+    def conversion_mode(self, mode: str) -> None:
+        if mode not in SHUTDOWN_MODES:
+            raise ValueError(f"Unbekannter Modus: {mode}")
+        cfg = self.bus.read_byte_data(self.address, REG_DEVICE_CONFIG)
+        cfg = (cfg & ~0b11) | SHUTDOWN_MODES[mode]
+        self.bus.write_byte_data(self.address, REG_DEVICE_CONFIG, cfg)
+        self._conversion = mode
+
+    # ------------------------------------------------------------------
+    def read_registers(self) -> Tuple[float, float, float, int]:
+        """Return ``(hot, delta, cold, status)`` with one transfer per register."""
+        for transfer in self._all_transfers:
+            self.bus.i2c_rdwr(transfer.write, transfer.read)
+        hot = self._hot.data
+        delta = self._delta.data
+        cold = self._cold.data
+        return (
+            _to_celsius(hot[0], hot[1]),
+            _to_celsius(delta[0], delta[1]),
+            _to_celsius(cold[0], cold[1]),
+            self._status.data[0],
+        )
+
+    def read_if_ready(self) -> Optional[Tuple[float, float, float, int]]:
+        """Return ``(hot, delta, cold, status)`` only for a new conversion.
+
+        Only the status register is read while no conversion has completed.
+        Otherwise the update/burst flags are cleared and the three
+        temperature registers are read, one transfer each.
+        """
+        self.bus.i2c_rdwr(self._status.write, self._status.read)
+        status = self._status.data[0]
+        if not status & (STATUS_TH_UPDATE | STATUS_BURST_COMPLETE):
+            return None
+        self._clear_data[1] = status & ~(STATUS_TH_UPDATE | STATUS_BURST_COMPLETE) & 0xFF
+        self.bus.i2c_rdwr(self._clear_msg)
+        for transfer in self._all_transfers[1:]:
+            self.bus.i2c_rdwr(transfer.write, transfer.read)
+        hot = self._hot.data
+        delta = self._delta.data
+        cold = self._cold.data
+        return (
+            _to_celsius(hot[0], hot[1]),
+            _to_celsius(delta[0], delta[1]),
+            _to_celsius(cold[0], cold[1]),
+            status,
+        )
+
+    def _read_register(self, transfer: _Transfer) -> float:
+        self.bus.i2c_rdwr(transfer.write, transfer.read)
+        return _to_celsius(transfer.data[0], transfer.data[1])
+
+    @property
+    def temperature(self) -> float:
+        """Hot-junction temperature in degrees Celsius."""
+        return self._read_register(self._hot)
+
+    @property
+    def delta_temperature(self) -> float:
+        """Difference between hot and cold junction in degrees Celsius."""
+        return self._read_register(self._delta)
+
+    @property
+    def ambient_temperature(self) -> float:
+        """Cold-junction temperature in degrees Celsius."""
+        return self._read_register(self._cold)
+
+    @property
+    def status(self) -> int:
+        """Raw value of the status register."""
+        self.bus.i2c_rdwr(self._status.write, self._status.read)
+        return self._status.data[0]
+
+
+def scan(bus: Any) -> List[int]:
+    """Probe the 7-bit address range and return responding addresses."""
+    found: List[int] = []
+    for address in range(0x08, 0x78):
+        try:
+            bus.read_byte(address)
+        except OSError:
+            continue
+        found.append(address)
+    return found
@@ -22,7 +22,8 @@ class PIDController:
         output_limits : tuple, optional
             Minimum and maximum control output. Defaults to (0, 100).
         sample_time : float, optional
-            Minimum time between two calculations. Defaults to 1 second.
+            Minimum time between two calculations. Defaults to 1 second;
+            ``None`` computes a new output on every call.
         """
         self.pid = PID(kp, ki, kd, setpoint=setpoint, output_limits=output_limits)
         self.pid.sample_time = sample_time
@@ -0,0 +1,98 @@
+"""Fixed-rate scheduling for periodic control tasks."""
+
+from __future__ import annotations
+
+import time
+from collections import deque
+from typing import Callable, Dict, Iterable
+
+
+def _percentile(values: Iterable[float], q: float) -> float:
+    """Return the ``q``-th percentile (0-100) using nearest-rank."""
+    data = sorted(values)
+    if not data:
+        return 0.0
+    rank = int(round(q / 100.0 * (len(data) - 1)))
+    return data[max(0, min(len(data) - 1, rank))]
+
+
+class FixedRateScheduler:
+    """Compute sleep times for a drift-free, absolute-deadline cadence.
+
+    The scheduler does not sleep itself; the caller brackets every iteration
+    with :meth:`begin_tick` and :meth:`end_tick` and sleeps for the returned
+    delay. Deadlines advance by exactly ``interval`` on the monotonic clock, so
+    the work duration does not accumulate into the period. When an iteration
+    overruns its deadline the missed ticks are either skipped (the next
+    deadline snaps onto the grid in the future) or caught up immediately.
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        *,
+        skip_missed: bool = True,
+        clock: Callable[[], float] = time.monotonic,
+        window: int = 512,
+    ) -> None:
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        self.interval = float(interval)
+        self.skip_missed = skip_missed
+        self._clock = clock
+        self._periods: deque[float] = deque(maxlen=window)
+        self._lateness: deque[float] = deque(maxlen=window)
+        self._deadline: float | None = None
+        self._last_start: float | None = None
+        self.ticks = 0
+        self.overruns = 0
+        self.skipped = 0
+
+    def start(self) -> None:
+        """Reset the deadline so that the first tick is due immediately."""
+        self._deadline = self._clock()
+        self._last_start = None
+
+    def begin_tick(self) -> None:
+        """Record the start of an iteration."""
+        now = self._clock()
+        if self._deadline is None:
+            self._deadline = now
+        self._lateness.append(max(0.0, now - self._deadline))
+        if self._last_start is not None:
+            self._periods.append(now - self._last_start)
+        self._last_start = now
+        self.ticks += 1
+
+    def end_tick(self) -> float:
+        """Advance the deadline and return the time to sleep in seconds."""
+        now = self._clock()
+        if self._deadline is None:
+            self._deadline = now
+        self._deadline += self.interval
+        if now > self._deadline:
+            self.overruns += 1
+            if not self.skip_missed:
+                return 0.0
+            missed = int((now - self._deadline) // self.interval) + 1
+            self.skipped += missed
+            self._deadline += missed * self.interval
+        return self._deadline - now
+
+    def stats(self) -> Dict[str, float | int]:
+        """Return tick counters and period/jitter percentiles in milliseconds."""
+        periods = list(self._periods)
+        lateness = list(self._lateness)
+        return {
+            "interval_ms": self.interval * 1000.0,
+            "ticks": self.ticks,
+            "overruns": self.overruns,
+            "skipped": self.skipped,
+            "period_p50_ms": _percentile(periods, 50) * 1000.0,
+            "period_p95_ms": _percentile(periods, 95) * 1000.0,
+            "period_p99_ms": _percentile(periods, 99) * 1000.0,
+            "jitter_p50_ms": _percentile(lateness, 50) * 1000.0,
+            "jitter_p95_ms": _percentile(lateness, 95) * 1000.0,
+            "jitter_p99_ms": _percentile(lateness, 99) * 1000.0,
+            "jitter_max_ms": max(lateness, default=0.0) * 1000.0,
+        }
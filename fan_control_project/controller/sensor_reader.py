@@ -2,12 +2,20 @@
 
 from __future__ import annotations
 
+from concurrent.futures import Executor
 from dataclasses import dataclass
 from typing import Any, Dict, List, Optional
+import asyncio
+import threading
 import time
 
 import adafruit_mcp9600
 
+from . import mcp9600_smbus
+from .bus_arbiter import BusArbiter, PRIORITY_CONTROL, PRIORITY_DIAGNOSTIC
+from .circuit_breaker import CircuitBreaker, OPEN
+from .i2c_deadline import DeadlineRunner
+from .latency import ErrorCounts
 from config.logging_config import logger
 
 
@@ -18,6 +26,7 @@ class _SensorState:
     delta: Optional[float] = None
     status: str = "not_found"
     stale_count: int = 0
+    sample_time: Optional[float] = None
 
 
 class SensorReader:
@@ -30,17 +39,10 @@ class SensorReader:
         i2c: object | None = None,
         mcp_cls: type | None = None,
         mcp_params: Dict[str, Any] | None = None,
+        arbiter: BusArbiter | None = None,
     ) -> None:
         """Initialisiere den Reader mit I2C-Adressen der Sensoren."""
 
-        if i2c is None:
-            import board
-            import busio
-
-            i2c = busio.I2C(board.SCL, board.SDA)
-
-        self.i2c = i2c
-        self.mcp_cls = mcp_cls or adafruit_mcp9600.MCP9600
         self.config: Dict[str, Any] = {
             "type": "K",
             "filter": 0,
@@ -49,18 +51,70 @@ class SensorReader:
             "retries": 2,
             "backoff_ms": 50,
             "stale_threshold_count": 5,
+            "backend": "adafruit",
+            "bus": 1,
+            "data_ready_polling": False,
+            "stale_timeout_s": 5.0,
+            "coalesce_ms": 250,
+            "breaker_failures": 3,
+            "breaker_reset_s": 5.0,
+            "probe_interval_s": 1.0,
+            "timeout_ms": 250,
+            "bus_recovery": True,
         }
         if mcp_params:
             self.config.update(mcp_params)
         self.config["type"] = str(self.config.get("type", "K")).upper()
         logger.info("MCP9600 Konfiguration: %s", self.config)
 
+        self.backend = str(self.config.get("backend", "adafruit")).lower()
+        if self.backend == "smbus2" and self.config.get("data_rate") not in (None, ""):
+            # the conversion rate follows from the ADC resolution; there is
+            # no rate register the native driver could set
+            logger.warning(
+                "data_rate=%s wird vom smbus2-Backend nicht unterstuetzt und ignoriert",
+                self.config["data_rate"],
+            )
+        if self.backend == "smbus2":
+            if i2c is None:
+                import smbus2
+
+                i2c = smbus2.SMBus(int(self.config.get("bus", 1)))
+            default_cls: type = mcp9600_smbus.MCP9600
+        else:
+            if i2c is None:
+                import board
+                import busio
+
+                i2c = busio.I2C(board.SCL, board.SDA)
+            default_cls = adafruit_mcp9600.MCP9600
+
+        self.i2c = i2c
+        self.mcp_cls = mcp_cls or default_cls
+
         self.retries = int(self.config.get("retries", 0))
         self.backoff_ms = int(self.config.get("backoff_ms", 0))
         self.stale_threshold = int(self.config.get("stale_threshold_count", 5))
+        self.data_ready_polling = bool(self.config.get("data_ready_polling", False))
+        self.stale_timeout = float(self.config.get("stale_timeout_s", 5.0))
+        self.coalesce_ms = float(self.config.get("coalesce_ms", 250))
+        self.arbiter = arbiter or BusArbiter()
+        self.probe_interval = float(self.config.get("probe_interval_s", 1.0))
+        self.deadline = DeadlineRunner(
+            float(self.config.get("timeout_ms", 250)) / 1000.0,
+            name="mcp9600",
+            recovery=self._recover_bus if self.config.get("bus_recovery", True) else None,
+        )
 
         self.sensors: List[tuple[str, int, object | None]] = []
         self._states: Dict[str, _SensorState] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        # bus transactions, retried and final errors by errno (0 = unknown)
+        self.i2c_reads = 0
+        self.read_retries = ErrorCounts()
+        self.read_errors = ErrorCounts()
+        self._recovery_thread: Optional[threading.Thread] = None
+        self._recovery_stop = threading.Event()
 
         for addr in sensor_addresses:
             if isinstance(addr, str):
@@ -72,6 +126,12 @@ class SensorReader:
             sensor = self._create_sensor(addr_int)
             self.sensors.append((addr_str, addr_int, sensor))
             self._states[addr_str] = _SensorState(status="not_found" if sensor is None else "ok")
+            breaker = self._breakers[addr_str] = CircuitBreaker(
+                failure_threshold=int(self.config.get("breaker_failures", 3)),
+                reset_timeout=float(self.config.get("breaker_reset_s", 5.0)),
+            )
+            if sensor is None:
+                breaker.trip()
         logger.debug("Sensoradressen initialisiert: %s", [(s[0], hex(s[1])) for s in self.sensors])
 
     def set_thermocouple_type(self, tc_type: str) -> None:
@@ -84,18 +144,23 @@ class SensorReader:
 
         logger.info("Thermoelement-Typ wechselt von %s auf %s", self.config.get("type"), tc)
         self.config["type"] = tc
+        self.arbiter.run(self._recreate_sensors)
 
+    def _recreate_sensors(self) -> None:
         for idx, (addr_str, addr_int, _sensor) in enumerate(self.sensors):
             sensor = self._create_sensor(addr_int)
             self.sensors[idx] = (addr_str, addr_int, sensor)
             state = self._states.setdefault(addr_str, _SensorState())
+            breaker = self._breakers.setdefault(addr_str, CircuitBreaker())
             if sensor is None:
+                breaker.trip()
                 state.status = "not_found"
                 state.temperature = None
                 state.ambient = None
                 state.delta = None
                 state.stale_count = 0
             else:
+                breaker.record_success()
                 state.status = "ok"
                 state.stale_count = 0
 
@@ -113,93 +178,268 @@ class SensorReader:
         except Exception as exc:  # pragma: no cover - defensive
             logger.error("Fehler beim Anwenden der MCP9600-Konfiguration: %s", exc)
 
-    def _create_sensor(self, address: int) -> object | None:
+    def _construct_sensor(self, address: int) -> object:
+        sensor = self.mcp_cls(
+            self.i2c,
+            address=address,
+            tctype=self.config.get("type", "K"),
+            tcfilter=int(self.config.get("filter", 0)),
+        )
+        self._apply_config(sensor)
+        return sensor
+
+    def _create_sensor(self, address: int, log_errors: bool = True) -> object | None:
         """Erzeuge ein MCP9600-Objekt für die Adresse."""
         try:
-            sensor = self.mcp_cls(
-                self.i2c,
-                address=address,
-                tctype=self.config.get("type", "K"),
-                tcfilter=int(self.config.get("filter", 0)),
-            )
-            self._apply_config(sensor)
-            return sensor
+            return self.deadline.call(self._construct_sensor, address)
         except OSError as exc:
-            logger.error("Sensor %s nicht erreichbar: %s", hex(address), exc)
+            if log_errors:
+                logger.error("Sensor %s nicht erreichbar: %s", hex(address), exc)
             return None
         except Exception as exc:  # pragma: no cover - unerwartete Fehler
             logger.error("Fehler beim Initialisieren des Sensors %s: %s", hex(address), exc)
             return None
 
     # ------------------------------------------------------------------
-    def _read_sensor(self, addr_str: str, address: int, sensor: object | None) -> _SensorState:
-        """Lese eine Temperatur vom angegebenen I2C-Sensor."""
+    def _uses_data_ready(self, sensor: object) -> bool:
+        """Return True if ``sensor`` exposes the status register update flags."""
+        if not self.data_ready_polling:
+            return False
+        cls = type(sensor)
+        return hasattr(cls, "read_if_ready") or hasattr(cls, "temperature_update")
+
+    def _read_once(self, sensor: object) -> Optional[tuple[float, float, float]]:
+        """Fuehre einen einzelnen Leseversuch aus (hot, cold, delta).
+
+        Mit Data-Ready-Polling wird ``None`` geliefert, solange der Sensor
+        keine neue Wandlung abgeschlossen hat.
+        """
+        if self._uses_data_ready(sensor):
+            read_if_ready = getattr(sensor, "read_if_ready", None)
+            if read_if_ready is not None:
+                sample = read_if_ready()
+                if sample is None:
+                    return None
+                hot, delta, cold, _status = sample
+                return hot, cold, delta
+            if not getattr(sensor, "temperature_update"):
+                return None
+            setattr(sensor, "temperature_update", False)
+        read_registers = getattr(sensor, "read_registers", None)
+        if read_registers is not None:
+            hot, delta, cold, _status = read_registers()
+            return hot, cold, delta
+        hot = float(getattr(sensor, "temperature"))
+        cold = float(getattr(sensor, "ambient_temperature", 0.0))
+        return hot, cold, hot - cold
+
+    def _record_reading(
+        self,
+        addr_str: str,
+        hot: float,
+        cold: float,
+        delta: float,
+        attempt: int,
+        dt_ms: int,
+        confirmed: bool = False,
+    ) -> _SensorState:
+        """Uebernimm einen erfolgreichen Messwert in den Sensorzustand.
+
+        ``confirmed`` bedeutet, dass das Statusregister eine neue Wandlung
+        gemeldet hat; die Heuristik fuer gleichbleibende Werte entfaellt dann.
+        """
         state = self._states[addr_str]
-        if sensor is None:
-            state.status = "not_found"
-            state.temperature = state.ambient = state.delta = None
-            state.stale_count = 0
+        prev_status = state.status
+        if confirmed or state.temperature != hot:
+            state.stale_count = 1
+        else:
+            state.stale_count += 1
+        state.temperature = hot
+        state.ambient = cold
+        state.delta = delta
+        state.sample_time = time.monotonic()
+        state.status = "ok"
+        if state.stale_count >= self.stale_threshold:
+            state.status = "stale"
+        extra = {
+            "sensor_addr": addr_str,
+            "attempt": attempt,
+            "dt_ms": dt_ms,
+            "status": state.status,
+            "temp_hot": hot,
+            "temp_cold": cold,
+            "delta": delta,
+        }
+        if state.status != prev_status:
+            logger.info("Sensor gelesen", extra=extra)
+        else:
+            logger.debug("Sensor gelesen", extra=extra)
+        return state
+
+    def _record_no_update(self, addr_str: str) -> _SensorState:
+        """Behalte den letzten Messwert, solange keine neue Wandlung vorliegt.
+
+        Vor der ersten Wandlung gibt es noch keinen Messwert; der Sensor
+        meldet dann ``pending``.
+        """
+        state = self._states[addr_str]
+        if state.sample_time is None:
+            if state.status != "pending":
+                state.status = "pending"
+                logger.info(
+                    "Sensor wartet auf erste Wandlung",
+                    extra={"sensor_addr": addr_str, "status": state.status},
+                )
             return state
+        if state.status == "ok" and time.monotonic() - state.sample_time > self.stale_timeout:
+            state.status = "stale"
+            logger.info(
+                "Sensor liefert keine neuen Werte",
+                extra={"sensor_addr": addr_str, "status": state.status},
+            )
+        return state
+
+    def _store_sample(
+        self,
+        addr_str: str,
+        sensor: object,
+        sample: Optional[tuple[float, float, float]],
+        attempt: int,
+        dt_ms: int,
+    ) -> _SensorState:
+        self._breakers[addr_str].record_success()
+        if sample is None:
+            return self._record_no_update(addr_str)
+        hot, cold, delta = sample
+        return self._record_reading(
+            addr_str, hot, cold, delta, attempt, dt_ms, confirmed=self._uses_data_ready(sensor)
+        )
+
+    def _record_failure(self, addr_str: str, status: str) -> _SensorState:
+        """Setze den Sensorzustand nach einem endgueltigen Fehler zurueck."""
+        breaker = self._breakers[addr_str]
+        was_open = breaker.state == OPEN
+        breaker.record_failure()
+        if breaker.state == OPEN and not was_open:
+            logger.warning(
+                "Sensor %s wird nach %d Fehlern uebersprungen",
+                addr_str,
+                breaker.failures,
+                extra={"sensor_addr": addr_str, "status": status},
+            )
+        return self._mark_unavailable(addr_str, status)
+
+    def _mark_unavailable(self, addr_str: str, status: str = "not_found") -> _SensorState:
+        """Setze den Sensorzustand ohne Buszugriff auf ``status``."""
+        state = self._states[addr_str]
+        state.status = status
+        state.temperature = state.ambient = state.delta = None
+        state.stale_count = 0
+        state.sample_time = None
+        return state
+
+    def _retry_backoff(self, exc: OSError, attempt: int, addr_str: str) -> Optional[float]:
+        """Return the backoff in seconds if ``exc`` is retryable, else ``None``."""
+        err = getattr(exc, "errno", exc.args[0] if exc.args else None)
+        code = err if isinstance(err, int) else 0
+        if err in {5, 121} and attempt <= self.retries:
+            self.read_retries.add(code)
+            backoff = self.backoff_ms * (2 ** (attempt - 1))
+            logger.debug(
+                "I2C Fehler %s an %s, retry in %sms", err, addr_str, backoff
+            )
+            return backoff / 1000.0
+        self.read_errors.add(code)
+        logger.error(
+            "Sensor %s nicht erreichbar: %s", addr_str, exc, extra={"sensor_addr": addr_str, "attempt": attempt}
+        )
+        return None
+
+    def _read_sensor(self, addr_str: str, address: int, sensor: object | None) -> _SensorState:
+        """Lese eine Temperatur vom angegebenen I2C-Sensor."""
+        if sensor is None or not self._breakers[addr_str].allow_request():
+            return self._mark_unavailable(addr_str)
 
         attempt = 0
         start = time.perf_counter()
         while True:
             attempt += 1
+            self.i2c_reads += 1
             try:
-                hot = float(getattr(sensor, "temperature"))
-                cold = float(getattr(sensor, "ambient_temperature", 0.0))
-                delta = hot - cold
+                sample = self.deadline.call(self._read_once, sensor)
                 dt_ms = int((time.perf_counter() - start) * 1000)
-
-                prev_status = state.status
-                if state.temperature == hot:
-                    state.stale_count += 1
-                else:
-                    state.stale_count = 1
-                state.temperature = hot
-                state.ambient = cold
-                state.delta = delta
-                state.status = "ok"
-                if state.stale_count >= self.stale_threshold:
-                    state.status = "stale"
-                extra = {
-                    "sensor_addr": addr_str,
-                    "attempt": attempt,
-                    "dt_ms": dt_ms,
-                    "status": state.status,
-                    "temp_hot": hot,
-                    "temp_cold": cold,
-                    "delta": delta,
-                }
-                if state.status != prev_status:
-                    logger.info("Sensor gelesen", extra=extra)
-                else:
-                    logger.debug("Sensor gelesen", extra=extra)
-                return state
+                return self._store_sample(addr_str, sensor, sample, attempt, dt_ms)
             except OSError as exc:
-                err = getattr(exc, "errno", exc.args[0] if exc.args else None)
-                if err in {5, 121} and attempt <= self.retries:
-                    backoff = self.backoff_ms * (2 ** (attempt - 1))
-                    logger.debug(
-                        "I2C Fehler %s an %s, retry in %sms", err, addr_str, backoff
-                    )
-                    time.sleep(backoff / 1000.0)
+                backoff = self._retry_backoff(exc, attempt, addr_str)
+                if backoff is not None:
+                    time.sleep(backoff)
                     continue
+                return self._record_failure(addr_str, "not_found")
+            except Exception as exc:  # pragma: no cover - unerwartete Fehler
+                self.read_errors.add(0)
                 logger.error(
-                    "Sensor %s nicht erreichbar: %s", addr_str, exc, extra={"sensor_addr": addr_str, "attempt": attempt}
+                    "Fehler beim Lesen des Sensors %s: %s", addr_str, exc, extra={"sensor_addr": addr_str, "attempt": attempt}
                 )
-                state.status = "not_found"
-                state.temperature = state.ambient = state.delta = None
-                state.stale_count = 0
-                return state
+                return self._record_failure(addr_str, "error")
+
+    async def _read_sensor_async(
+        self,
+        addr_str: str,
+        sensor: object | None,
+        bus_lock: asyncio.Lock,
+        executor: Executor | None,
+    ) -> _SensorState:
+        """Async counterpart of :meth:`_read_sensor`.
+
+        The blocking bus transaction runs in ``executor`` while holding
+        ``bus_lock``; retry backoff is awaited without the lock so other
+        sensors on the same bus keep being served.
+        """
+        if sensor is None or not self._breakers[addr_str].allow_request():
+            return self._mark_unavailable(addr_str)
+
+        loop = asyncio.get_running_loop()
+        attempt = 0
+        start = time.perf_counter()
+        while True:
+            attempt += 1
+            self.i2c_reads += 1
+            try:
+                async with bus_lock:
+                    sample = await loop.run_in_executor(executor, self._read_once_exclusive, sensor)
+                dt_ms = int((time.perf_counter() - start) * 1000)
+                return self._store_sample(addr_str, sensor, sample, attempt, dt_ms)
+            except OSError as exc:
+                backoff = self._retry_backoff(exc, attempt, addr_str)
+                if backoff is not None:
+                    await asyncio.sleep(backoff)
+                    continue
+                return self._record_failure(addr_str, "not_found")
             except Exception as exc:  # pragma: no cover - unerwartete Fehler
+                self.read_errors.add(0)
                 logger.error(
                     "Fehler beim Lesen des Sensors %s: %s", addr_str, exc, extra={"sensor_addr": addr_str, "attempt": attempt}
                 )
-                state.status = "error"
-                state.temperature = state.ambient = state.delta = None
-                state.stale_count = 0
-                return state
+                return self._record_failure(addr_str, "error")
+
+    def _read_once_exclusive(self, sensor: object) -> Optional[tuple[float, float, float]]:
+        return self.arbiter.run(lambda: self.deadline.call(self._read_once, sensor))
+
+    @staticmethod
+    def _sample_age(state: _SensorState) -> Optional[float]:
+        if state.sample_time is None:
+            return None
+        return round(time.monotonic() - state.sample_time, 3)
+
+    @classmethod
+    def _as_entry(cls, state: _SensorState) -> Dict[str, Optional[float] | str]:
+        return {
+            "temperature": state.temperature,
+            "ambient": state.ambient,
+            "delta": state.delta,
+            "status": state.status,
+            "age": cls._sample_age(state),
+        }
 
     # ------------------------------------------------------------------
     def read_temperature(self, sensor_index: int) -> Optional[float]:
@@ -208,32 +448,140 @@ class SensorReader:
             logger.warning("Ungueltiger Sensorindex: %s", sensor_index)
             return None
         addr_str, address, sensor = self.sensors[sensor_index]
-        state = self._read_sensor(addr_str, address, sensor)
+        state = self.arbiter.run(lambda: self._read_sensor(addr_str, address, sensor))
         return state.temperature if state.status in {"ok", "stale"} else None
 
-    def read_all(self) -> Dict[str, Dict[str, Optional[float] | str]]:
-        """Liest alle Sensoren aus und gibt Temperatur und Status zurück."""
+    def read_all(self, *, diagnostic: bool = False) -> Dict[str, Dict[str, Optional[float] | str]]:
+        """Liest alle Sensoren aus und gibt Temperatur und Status zurück.
+
+        Diagnoseanfragen (``diagnostic=True``) laufen mit niedriger Prioritaet
+        und erhalten ein Ergebnis, das hoechstens ``coalesce_ms`` alt ist,
+        ohne erneut auf den Bus zuzugreifen.
+        """
+        return self.arbiter.run(
+            self._read_all_exclusive,
+            key=(id(self), "read_all"),
+            priority=PRIORITY_DIAGNOSTIC if diagnostic else PRIORITY_CONTROL,
+            max_age_ms=self.coalesce_ms if diagnostic else 0.0,
+        )
+
+    def _read_all_exclusive(self) -> Dict[str, Dict[str, Optional[float] | str]]:
         result: Dict[str, Dict[str, Optional[float] | str]] = {}
         for addr_str, address, sensor in self.sensors:
             state = self._read_sensor(addr_str, address, sensor)
-            result[addr_str] = {
-                "temperature": state.temperature,
-                "ambient": state.ambient,
-                "delta": state.delta,
-                "status": state.status,
-            }
+            result[addr_str] = self._as_entry(state)
         logger.debug("Sensorwerte: %s", result)
         return result
 
+    async def read_all_async(
+        self, executor: Executor | None = None
+    ) -> Dict[str, Dict[str, Optional[float] | str]]:
+        """Read all sensors of this bus concurrently from an asyncio loop.
+
+        Transactions on the bus are serialized, but a sensor waiting for its
+        retry backoff does not delay the others. The result is published to
+        the arbiter so diagnostic :meth:`read_all` calls can reuse it.
+        """
+        bus_lock = asyncio.Lock()
+        states = await asyncio.gather(
+            *(self._read_sensor_async(addr, sensor, bus_lock, executor) for addr, _a, sensor in self.sensors)
+        )
+        result = {addr: self._as_entry(state) for (addr, _a, _s), state in zip(self.sensors, states)}
+        logger.debug("Sensorwerte: %s", result)
+        self.arbiter.publish((id(self), "read_all"), result)
+        return result
+
     def scan_bus(self) -> List[str]:
         """Scan the I2C bus and return found addresses as hex strings."""
         try:
-            addrs = getattr(self.i2c, "scan", lambda: [])()
+            addrs = self.arbiter.run(
+                self._scan_exclusive,
+                key=(id(self), "scan"),
+                priority=PRIORITY_DIAGNOSTIC,
+                max_age_ms=self.coalesce_ms,
+            )
             return [f"0x{a:02x}" for a in addrs]
         except Exception as exc:  # pragma: no cover - bus scan is best-effort
             logger.error("I2C-Scan fehlgeschlagen: %s", exc)
             return []
 
+    # ------------------------------------------------------------------
+    def _probe_sensor(self, address: int) -> object | None:
+        sensor = self._create_sensor(address, log_errors=False)
+        if sensor is None:
+            return None
+        try:
+            self.deadline.call(self._read_once, sensor)
+        except Exception:
+            return None
+        return sensor
+
+    def probe_failed_sensors(self) -> List[str]:
+        """Probe sensors with an open breaker and reinstate those that answer.
+
+        Returns the addresses that were recovered.
+        """
+        recovered: List[str] = []
+        for idx, (addr_str, addr_int, _sensor) in enumerate(list(self.sensors)):
+            breaker = self._breakers[addr_str]
+            if not breaker.probe_due():
+                continue
+            breaker.begin_probe()
+            sensor = self.arbiter.run(
+                lambda: self._probe_sensor(addr_int), priority=PRIORITY_DIAGNOSTIC
+            )
+            if sensor is None:
+                breaker.record_failure()
+                logger.debug("Sensor %s antwortet weiterhin nicht", addr_str)
+                continue
+            self.sensors[idx] = (addr_str, addr_int, sensor)
+            breaker.record_success()
+            self._states[addr_str].status = "ok"
+            logger.info("Sensor wieder erreichbar", extra={"sensor_addr": addr_str, "status": "ok"})
+            recovered.append(addr_str)
+        return recovered
+
+    def start_recovery(self) -> None:
+        """Start the background thread that probes failed sensors."""
+        if self._recovery_thread is not None:
+            return
+        self._recovery_stop.clear()
+        self._recovery_thread = threading.Thread(target=self._recovery_loop, daemon=True)
+        self._recovery_thread.start()
+
+    def stop_recovery(self) -> None:
+        """Stop the background probing thread."""
+        self._recovery_stop.set()
+        if self._recovery_thread is not None:
+            self._recovery_thread.join()
+            self._recovery_thread = None
+
+    def _recovery_loop(self) -> None:
+        while not self._recovery_stop.wait(self.probe_interval):
+            try:
+                self.probe_failed_sensors()
+            except Exception as exc:  # pragma: no cover - defensive
+                logger.error("Sensor-Wiederherstellung fehlgeschlagen: %s", exc)
+
+    def _scan_exclusive(self) -> List[int]:
+        if self.backend == "smbus2":
+            return self.deadline.call(mcp9600_smbus.scan, self.i2c)
+        return list(self.deadline.call(getattr(self.i2c, "scan", lambda: [])))
+
+    def _recover_bus(self) -> None:
+        """Reopen the bus once a timed-out transaction has returned (smbus2 only).
+
+        This does not reset the I2C adapter or free a slave holding SDA low;
+        it only gives later transactions a fresh file descriptor without the
+        per-descriptor state of the stuck transfer. The sensor objects keep
+        working with the same ``SMBus`` instance.
+        """
+        if self.backend != "smbus2" or not hasattr(self.i2c, "open"):
+            return
+        bus = int(self.config.get("bus", 1))
+        self.i2c.close()
+        self.i2c.open(bus)
+
     def health(self) -> Dict[str, Dict[str, Optional[float] | str]]:
         """Return the last known sensor states."""
         return {
@@ -243,6 +591,8 @@ class SensorReader:
                 "delta": st.delta,
                 "status": st.status,
                 "stale_count": st.stale_count,
+                "age": self._sample_age(st),
+                "breaker": self._breakers[addr].state,
             }
             for addr, st in self._states.items()
         }
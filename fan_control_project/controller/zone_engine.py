@@ -0,0 +1,213 @@
+"""Control engine that regulates many purge-air zones in a single thread."""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from array import array
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from .scheduler import FixedRateScheduler
+from config.logging_config import logger
+
+_NAN = float("nan")
+# a stale sensor still reports its last (steady) temperature
+_VALID_STATUS = frozenset({"ok", "stale"})
+
+
+@dataclass
+class ZoneConfig:
+    """Static configuration of one zone (sensor pair, PID and actuator)."""
+
+    name: str
+    control_sensor: str
+    alarm_sensor: str
+    setpoint: float = 0.0
+    alarm_threshold: float = 0.0
+    alarm_percent: float = 100.0
+    manual_percent: float = 0.0
+    manual: bool = False
+    kp: float = 1.0
+    ki: float = 0.1
+    kd: float = 0.0
+    postrun_seconds: float = 30.0
+    smoothing_alpha: float = 1.0
+
+
+def _column(values: Sequence[float]) -> array:
+    return array("d", values)
+
+
+def _clamp(value: float, low: float, high: float) -> float:
+    return low if value < low else high if value > high else value
+
+
+class ZoneEngine:
+    """Update all configured zones in one scheduled tick.
+
+    Per-zone state is stored column-wise in flat ``array('d')`` buffers so
+    every stage (EMA, alarm, PID, output) is a single pass over contiguous
+    memory. All sensors are fetched with one ``read_all`` call per tick.
+    """
+
+    def __init__(
+        self,
+        zones: Sequence[ZoneConfig],
+        sensor_reader: Any,
+        actuators: Sequence[Any],
+        *,
+        interval: float = 0.5,
+        skip_missed: bool = True,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if len(actuators) != len(zones):
+            raise ValueError("one actuator per zone required")
+        self.zones: List[ZoneConfig] = list(zones)
+        self.sensor_reader = sensor_reader
+        self.actuators = list(actuators)
+        self.interval = interval
+        self.scheduler = FixedRateScheduler(interval, skip_missed=skip_missed)
+        self._clock = clock
+
+        n = len(self.zones)
+        self.setpoint = _column([z.setpoint for z in self.zones])
+        self.alarm_threshold = _column([z.alarm_threshold for z in self.zones])
+        self.alarm_percent = _column([z.alarm_percent for z in self.zones])
+        self.manual_percent = _column([z.manual_percent for z in self.zones])
+        self.kp = _column([z.kp for z in self.zones])
+        self.ki = _column([z.ki for z in self.zones])
+        self.kd = _column([z.kd for z in self.zones])
+        self.postrun_seconds = _column([z.postrun_seconds for z in self.zones])
+        self.alpha = _column([_clamp(z.smoothing_alpha, 0.01, 1.0) for z in self.zones])
+        self.manual = array("b", [1 if z.manual else 0 for z in self.zones])
+
+        self.temp_control = _column([_NAN] * n)
+        self.temp_alarm = _column([_NAN] * n)
+        self.integral = _column([0.0] * n)
+        self.last_input = _column([_NAN] * n)
+        self.output = _column([0.0] * n)
+        self.alarm_active = array("b", [0] * n)
+        self.postrun_until = _column([0.0] * n)
+        self.status_control: List[str] = ["not_found"] * n
+        self.status_alarm: List[str] = ["not_found"] * n
+
+        self._last_time: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        """Start the engine in a background thread."""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run_loop, daemon=True)
+        self._thread.start()
+        logger.info("Zonen-Engine gestartet mit %d Zonen", len(self.zones))
+
+    def stop(self) -> None:
+        """Stop the engine and switch all outputs off."""
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        for act in self.actuators:
+            act.stop()
+        logger.info("Zonen-Engine gestoppt")
+
+    def _run_loop(self) -> None:
+        self.scheduler.start()
+        while self._running:
+            self.scheduler.begin_tick()
+            self.update_once()
+            delay = self.scheduler.end_tick()
+            if delay > 0:
+                time.sleep(delay)
+
+    # ------------------------------------------------------------------
+    def _gather(self, data: Dict[str, Dict[str, Any]]) -> None:
+        """Copy the batched sensor readings into the temperature columns."""
+        for i, zone in enumerate(self.zones):
+            ctrl = data.get(zone.control_sensor, {})
+            alrm = data.get(zone.alarm_sensor, {})
+            self.status_control[i] = str(ctrl.get("status", "error"))
+            self.status_alarm[i] = str(alrm.get("status", "error"))
+            t1 = ctrl.get("temperature") if self.status_control[i] in _VALID_STATUS else None
+            t2 = alrm.get("temperature") if self.status_alarm[i] in _VALID_STATUS else None
+            self.temp_control[i] = self._smooth(self.temp_control[i], t1, self.alpha[i])
+            self.temp_alarm[i] = self._smooth(self.temp_alarm[i], t2, self.alpha[i])
+
+    @staticmethod
+    def _smooth(previous: float, value: Optional[float], alpha: float) -> float:
+        # a lost sensor clears the column; the PID holds its output on NaN
+        # and the filter restarts from the first new reading
+        if value is None:
+            return _NAN
+        if math.isnan(previous):
+            return float(value)
+        return alpha * float(value) + (1.0 - alpha) * previous
+
+    def _evaluate_alarms(self, now: float) -> None:
+        for i in range(len(self.zones)):
+            if self.temp_alarm[i] > self.alarm_threshold[i]:
+                self.alarm_active[i] = 1
+                self.postrun_until[i] = 0.0
+            elif self.alarm_active[i]:
+                self.alarm_active[i] = 0
+                self.postrun_until[i] = now + self.postrun_seconds[i]
+                logger.info("Zone %s: Alarm beendet, Nachlauf aktiv", self.zones[i].name)
+
+    def _compute_outputs(self, now: float, dt: float) -> None:
+        for i in range(len(self.zones)):
+            if self.manual[i]:
+                self.output[i] = self.manual_percent[i]
+                continue
+            if self.alarm_active[i] or now < self.postrun_until[i]:
+                self.output[i] = self.alarm_percent[i]
+                continue
+            temp = self.temp_control[i]
+            if math.isnan(temp):
+                continue
+            error = self.setpoint[i] - temp
+            self.integral[i] = _clamp(self.integral[i] + self.ki[i] * error * dt, 0.0, 100.0)
+            last = self.last_input[i]
+            derivative = 0.0 if math.isnan(last) or dt <= 0 else -self.kd[i] * (temp - last) / dt
+            self.last_input[i] = temp
+            pid_out = _clamp(self.kp[i] * error + self.integral[i] + derivative, 0.0, 100.0)
+            self.output[i] = 100.0 - pid_out
+
+    def update_once(self) -> None:
+        """Read all sensors once and update every zone."""
+        now = self._clock()
+        dt = self.interval if self._last_time is None else now - self._last_time
+        self._last_time = now
+        self._gather(self.sensor_reader.read_all())
+        self._evaluate_alarms(now)
+        self._compute_outputs(now, dt)
+        for act, value in zip(self.actuators, self.output):
+            act.set_output(value)
+
+    # ------------------------------------------------------------------
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Return a JSON-friendly summary of all zones."""
+        now = self._clock()
+        result: List[Dict[str, Any]] = []
+        for i, zone in enumerate(self.zones):
+            t1 = self.temp_control[i]
+            t2 = self.temp_alarm[i]
+            result.append(
+                {
+                    "name": zone.name,
+                    "temperature1": None if math.isnan(t1) else t1,
+                    "temperature2": None if math.isnan(t2) else t2,
+                    "status1": self.status_control[i],
+                    "status2": self.status_alarm[i],
+                    "setpoint": self.setpoint[i],
+                    "output_pct": self.output[i],
+                    "alarm_active": bool(self.alarm_active[i]),
+                    "postrun_remaining": max(0, int(self.postrun_until[i] - now)),
+                }
+            )
+        return result
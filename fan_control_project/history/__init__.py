@@ -0,0 +1,17 @@
+"""Server-side storage of control-loop trend data."""
+
+from .ring_buffer import FIELDS, HistoryBuffer
+from .archive import SampleArchive
+from .rollup import RollupEngine, RollupTier, build_tiers
+from .query import parse_query, query_history
+
+__all__ = [
+    "FIELDS",
+    "HistoryBuffer",
+    "RollupEngine",
+    "RollupTier",
+    "SampleArchive",
+    "build_tiers",
+    "parse_query",
+    "query_history",
+]
@@ -0,0 +1,393 @@
+"""Append-only compressed sample archive using Gorilla-style encoding.
+
+Timestamps are stored as delta-of-delta milliseconds and values as the XOR
+of consecutive float32 bit patterns, like the Facebook Gorilla TSDB. Samples
+are packed into fixed-size blocks; a block is written once when it is full,
+so the SD card only sees whole-block appends. A small side index holds the
+first and last timestamp of every block for seeking by time.
+"""
+
+from __future__ import annotations
+
+import bisect
+import os
+import struct
+import threading
+from typing import BinaryIO, Iterator, List, Optional, Sequence, Tuple
+
+from config.logging_config import logger
+from .ring_buffer import FIELDS, HistoryBuffer
+
+BLOCK_SIZE = 4096
+ARCHIVE_MAGIC = b"FCARCH01"
+# magic, block size, fields per sample
+FILE_HEADER = struct.Struct("<8sII")
+# first/last timestamp (ms), sample count, payload bytes
+BLOCK_HEADER = struct.Struct("<qqHH")
+INDEX_ENTRY = struct.Struct("<qq")
+
+_N = len(FIELDS)
+_F32 = struct.Struct("<f")
+_U32 = struct.Struct("<I")
+# worst case: 4 bit prefix + 32 bit dod, per value 2+5+5+32 bits, 3 flag bits
+_MAX_SAMPLE_BITS = 36 + _N * 44 + 3
+_DOD_RANGES = ((0b10, 2, 7), (0b110, 3, 9), (0b1110, 4, 12), (0b1111, 4, 32))
+
+Sample = Tuple[float, Tuple[float, ...], int]
+
+
+class _BitWriter:
+    __slots__ = ("buf", "acc", "pending", "bits")
+
+    def __init__(self) -> None:
+        self.buf = bytearray()
+        self.acc = 0
+        self.pending = 0
+        self.bits = 0
+
+    def write(self, value: int, n: int) -> None:
+        self.acc = (self.acc << n) | (value & ((1 << n) - 1))
+        self.pending += n
+        self.bits += n
+        while self.pending >= 8:
+            self.pending -= 8
+            self.buf.append((self.acc >> self.pending) & 0xFF)
+        self.acc &= (1 << self.pending) - 1
+
+    def getvalue(self) -> bytes:
+        if not self.pending:
+            return bytes(self.buf)
+        return bytes(self.buf) + bytes([(self.acc << (8 - self.pending)) & 0xFF])
+
+
+class _BitReader:
+    __slots__ = ("value", "total", "pos")
+
+    def __init__(self, data: bytes) -> None:
+        self.value = int.from_bytes(data, "big")
+        self.total = len(data) * 8
+        self.pos = 0
+
+    def read(self, n: int) -> int:
+        self.pos += n
+        return (self.value >> (self.total - self.pos)) & ((1 << n) - 1)
+
+    def bit(self) -> int:
+        return self.read(1)
+
+
+def _signed(value: int, n: int) -> int:
+    return value - (1 << n) if value >= 1 << (n - 1) else value
+
+
+class _BlockEncoder:
+    """Encoder state of the block that is currently being filled."""
+
+    def __init__(self, t_ms: int, bits: Sequence[int], flags: int) -> None:
+        self.writer = _BitWriter()
+        self.first_ms = self.last_ms = t_ms
+        self.delta = 0
+        self.prev = list(bits)
+        self.windows = [(-1, -1)] * _N
+        self.flags = flags
+        self.count = 1
+        for b in bits:
+            self.writer.write(b, 32)
+        self.writer.write(flags, 2)
+
+    def has_room(self, payload_bits: int) -> bool:
+        return self.writer.bits + _MAX_SAMPLE_BITS <= payload_bits and self.count < 0xFFFF
+
+    def add(self, t_ms: int, bits: Sequence[int], flags: int) -> bool:
+        """Append one sample; ``False`` if its timestamp cannot be encoded."""
+        delta = t_ms - self.last_ms
+        dod = delta - self.delta
+        w = self.writer
+        if dod == 0:
+            w.write(0, 1)
+        else:
+            for prefix, plen, n in _DOD_RANGES:
+                if -(1 << (n - 1)) < dod <= 1 << (n - 1):
+                    break
+            else:
+                return False
+            w.write(prefix, plen)
+            # shift by one so the symmetric range fits into n bits
+            w.write(dod - 1 if dod > 0 else dod, n)
+        self.delta = delta
+        self.last_ms = t_ms
+
+        for i, b in enumerate(bits):
+            x = b ^ self.prev[i]
+            self.prev[i] = b
+            if not x:
+                w.write(0, 1)
+                continue
+            lead = min(32 - x.bit_length(), 31)
+            trail = (x & -x).bit_length() - 1
+            p_lead, p_trail = self.windows[i]
+            if p_lead >= 0 and lead >= p_lead and trail >= p_trail:
+                w.write(0b10, 2)
+                w.write(x >> p_trail, 32 - p_lead - p_trail)
+            else:
+                length = 32 - lead - trail
+                w.write(0b11, 2)
+                w.write(lead, 5)
+                w.write(length - 1, 5)
+                w.write(x >> trail, length)
+                self.windows[i] = (lead, trail)
+
+        if flags == self.flags:
+            w.write(0, 1)
+        else:
+            w.write(0b100 | flags, 3)
+            self.flags = flags
+        self.count += 1
+        return True
+
+    def header(self) -> bytes:
+        payload = self.writer.getvalue()
+        return BLOCK_HEADER.pack(self.first_ms, self.last_ms, self.count, len(payload)) + payload
+
+
+def _decode_block(block: bytes) -> Iterator[Sample]:
+    first_ms, _last_ms, count, size = BLOCK_HEADER.unpack_from(block, 0)
+    r = _BitReader(block[BLOCK_HEADER.size : BLOCK_HEADER.size + size])
+    prev = [r.read(32) for _ in range(_N)]
+    flags = r.read(2)
+    t_ms = first_ms
+    delta = 0
+    windows = [(0, 0)] * _N
+    yield t_ms / 1000.0, tuple(_F32.unpack(_U32.pack(b))[0] for b in prev), flags
+    for _ in range(count - 1):
+        if r.bit():
+            n = _DOD_RANGES[-1][2]
+            for _prefix, _plen, width in _DOD_RANGES[:-1]:
+                if not r.bit():
+                    n = width
+                    break
+            dod = _signed(r.read(n), n)
+            delta += dod + 1 if dod >= 0 else dod
+        t_ms += delta
+        for i in range(_N):
+            if not r.bit():
+                continue
+            if r.bit():
+                lead = r.read(5)
+                length = r.read(5) + 1
+                trail = 32 - lead - length
+                windows[i] = (lead, trail)
+            else:
+                lead, trail = windows[i]
+                length = 32 - lead - trail
+            prev[i] ^= r.read(length) << trail
+        if r.bit():
+            flags = r.read(2)
+        yield t_ms / 1000.0, tuple(_F32.unpack(_U32.pack(b))[0] for b in prev), flags
+
+
+class SampleArchive:
+    """Append-only archive of control-loop samples in fixed-size blocks.
+
+    The block being filled lives in memory and is written when full or on
+    :meth:`close`; after a crash the missing samples are taken again from the
+    raw ring buffer by :meth:`process`. Samples not newer than the last
+    archived one are dropped, counted in ``dropped`` and logged. A
+    ``readonly`` archive can be read while another process is still
+    appending to the file.
+    """
+
+    def __init__(self, path: str, block_size: int = BLOCK_SIZE, readonly: bool = False) -> None:
+        if not BLOCK_HEADER.size + _MAX_SAMPLE_BITS // 8 + 1 <= block_size <= 0xFFFF:
+            raise ValueError("block_size ausserhalb des gueltigen Bereichs")
+        self.path = path
+        self.index_path = path + ".idx"
+        self.readonly = readonly
+        self._lock = threading.Lock()
+        self._encoder: Optional[_BlockEncoder] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._source: Optional[HistoryBuffer] = None
+        self.dropped = 0
+        self._dropping = False
+        if not readonly:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        if readonly or os.path.exists(path) and os.path.getsize(path) >= FILE_HEADER.size:
+            self._file: BinaryIO = open(path, "rb" if readonly else "r+b")
+            magic, stored_size, fields = FILE_HEADER.unpack(self._file.read(FILE_HEADER.size))
+            if magic != ARCHIVE_MAGIC or fields != _N:
+                self._file.close()
+                raise ValueError(f"Archiv {path} hat ein anderes Format")
+            block_size = stored_size
+        else:
+            self._file = open(path, "w+b")
+            self._file.write(FILE_HEADER.pack(ARCHIVE_MAGIC, block_size, _N))
+            self._file.flush()
+        self.block_size = block_size
+        self._payload_bits = (block_size - BLOCK_HEADER.size) * 8
+        blocks = (os.path.getsize(path) - FILE_HEADER.size) // block_size
+        if not readonly:
+            # drop a block that was only partly written
+            self._file.truncate(FILE_HEADER.size + blocks * block_size)
+        self._starts: List[int] = []
+        self._ends: List[int] = []
+        self._load_index(blocks)
+        self.processed_until = self._ends[-1] / 1000.0 if self._ends else float("-inf")
+
+    # ------------------------------------------------------------------
+    def _load_index(self, blocks: int) -> None:
+        expected = blocks * INDEX_ENTRY.size
+        if os.path.exists(self.index_path):
+            size = os.path.getsize(self.index_path)
+            # a writer may already have appended the entry of a newer block
+            if size == expected or self.readonly and size > expected:
+                with open(self.index_path, "rb") as fh:
+                    for first, last in INDEX_ENTRY.iter_unpack(fh.read(expected)):
+                        self._starts.append(first)
+                        self._ends.append(last)
+                return
+        if blocks and not self.readonly:
+            logger.warning("Archivindex %s wird neu aufgebaut", self.index_path)
+        for i in range(blocks):
+            self._file.seek(FILE_HEADER.size + i * self.block_size)
+            first, last, _count, _size = BLOCK_HEADER.unpack(self._file.read(BLOCK_HEADER.size))
+            self._starts.append(first)
+            self._ends.append(last)
+        if not self.readonly:
+            with open(self.index_path, "wb") as idx:
+                for entry in zip(self._starts, self._ends):
+                    idx.write(INDEX_ENTRY.pack(*entry))
+
+    def _seal(self) -> None:
+        """Write the current block to disk (lock held)."""
+        enc = self._encoder
+        self._encoder = None
+        if enc is None:
+            return
+        block = enc.header().ljust(self.block_size, b"\0")
+        self._file.seek(0, os.SEEK_END)
+        self._file.write(block)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        with open(self.index_path, "ab") as idx:
+            idx.write(INDEX_ENTRY.pack(enc.first_ms, enc.last_ms))
+        self._starts.append(enc.first_ms)
+        self._ends.append(enc.last_ms)
+
+    def append(self, t: float, values: Sequence[float], flags: int = 0) -> bool:
+        """Add one sample; ``values`` follows :data:`FIELDS`.
+
+        Returns False if the sample is not newer than the last archived one.
+        """
+        if self.readonly:
+            raise RuntimeError("Archiv ist schreibgeschuetzt geoeffnet")
+        t_ms = int(round(t * 1000))
+        bits = [_U32.unpack(_F32.pack(v))[0] for v in values]
+        with self._lock:
+            last = self._encoder.last_ms if self._encoder else (self._ends[-1] if self._ends else None)
+            was_dropping = self._dropping
+            self._dropping = last is not None and t_ms <= last
+            if self._dropping:
+                self.dropped += 1
+            else:
+                self._add(t_ms, bits, flags)
+        if self._dropping and not was_dropping:
+            logger.warning("Archiv: Sample %.3f nicht neuer als %.3f, verworfen", t, last / 1000.0)
+        elif was_dropping and not self._dropping:
+            logger.info("Archiv: Zeit wieder fortlaufend, bisher %d Samples verworfen", self.dropped)
+        return not self._dropping
+
+    def _add(self, t_ms: int, bits: List[int], flags: int) -> None:
+        """Encode one sample into the open block (lock held)."""
+        enc = self._encoder
+        if enc is not None and (not enc.has_room(self._payload_bits) or not enc.add(t_ms, bits, flags)):
+            self._seal()
+            enc = None
+        if enc is None:
+            self._encoder = _BlockEncoder(t_ms, bits, flags)
+
+    def process(self, source: HistoryBuffer) -> int:
+        """Archive raw samples that arrived since the last call."""
+        records = source.records_since(self.processed_until)
+        for rec in records:
+            self.append(rec[0], rec[1 : 1 + _N], rec[1 + _N])
+        if records:
+            self.processed_until = records[-1][0]
+        return len(records)
+
+    # ------------------------------------------------------------------
+    def iter_samples(self, start: Optional[float] = None, end: Optional[float] = None) -> Iterator[Sample]:
+        """Yield ``(t, values, flags)`` with ``start <= t <= end``.
+
+        Only one block is held in memory at a time; the index is used to skip
+        to the first block that can contain ``start``.
+        """
+        lo_ms = None if start is None else int(round(start * 1000))
+        hi_ms = None if end is None else int(round(end * 1000))
+        with self._lock:
+            ends = list(self._ends)
+            starts = list(self._starts)
+            pending = self._encoder.header() if self._encoder else None
+        first = 0 if lo_ms is None else bisect.bisect_left(ends, lo_ms)
+        with open(self.path, "rb") as fh:
+            for i in range(first, len(ends)):
+                if hi_ms is not None and starts[i] > hi_ms:
+                    return
+                fh.seek(FILE_HEADER.size + i * self.block_size)
+                yield from _filter(_decode_block(fh.read(self.block_size)), start, end)
+        if pending is not None:
+            yield from _filter(_decode_block(pending), start, end)
+
+    def time_range(self) -> Optional[Tuple[float, float]]:
+        with self._lock:
+            first = self._starts[0] if self._starts else (self._encoder.first_ms if self._encoder else None)
+            last = self._encoder.last_ms if self._encoder else (self._ends[-1] if self._ends else None)
+        if first is None or last is None:
+            return None
+        return first / 1000.0, last / 1000.0
+
+    def __len__(self) -> int:
+        """Number of blocks written to disk."""
+        return len(self._ends)
+
+    # ------------------------------------------------------------------
+    def start(self, source: HistoryBuffer, interval: float = 5.0) -> None:
+        if self._thread is not None:
+            return
+        self._source = source
+        self._stop.clear()
+
+        def run() -> None:
+            while not self._stop.wait(interval):
+                try:
+                    self.process(source)
+                except Exception as exc:  # pragma: no cover - defensive
+                    logger.error("Archivierung fehlgeschlagen: %s", exc)
+
+        self._thread = threading.Thread(target=run, name="history-archive", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def close(self) -> None:
+        """Archive what is left in the source, write the partial block and close."""
+        self.stop()
+        if self._source is not None:
+            self.process(self._source)
+            self._source = None
+        with self._lock:
+            self._seal()
+            self._file.close()
+
+
+def _filter(samples: Iterator[Sample], start: Optional[float], end: Optional[float]) -> Iterator[Sample]:
+    for sample in samples:
+        if start is not None and sample[0] < start:
+            continue
+        if end is not None and sample[0] > end:
+            return
+        yield sample
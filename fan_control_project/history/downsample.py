@@ -0,0 +1,113 @@
+"""Downsampling of history columns for display."""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional, Sequence
+
+METHODS = ("lttb", "minmax")
+
+
+def lttb_indices(t: Sequence[float], y: Sequence[float], n: int) -> List[int]:
+    """Return the indices chosen by Largest-Triangle-Three-Buckets.
+
+    The first and last sample are always kept; from each of the ``n - 2``
+    buckets in between the sample forming the largest triangle with the
+    previously chosen sample and the mean of the next bucket is selected.
+    """
+    size = len(t)
+    if n >= size:
+        return list(range(size))
+    if n < 3:
+        return [0, size - 1][: max(n, 0)]
+    every = (size - 2) / (n - 2)
+    chosen = [0]
+    a = 0
+    for i in range(n - 2):
+        avg_start = int((i + 1) * every) + 1
+        avg_end = min(int((i + 2) * every) + 1, size)
+        span = avg_end - avg_start
+        avg_t = sum(t[avg_start:avg_end]) / span
+        avg_y = sum(y[avg_start:avg_end]) / span
+        lo = int(i * every) + 1
+        hi = int((i + 1) * every) + 1
+        ta, ya = t[a], y[a]
+        dt = ta - avg_t
+        dy = avg_y - ya
+        # doubled triangle area; the constant factor does not change the argmax
+        a = max(range(lo, hi), key=lambda j: abs(dt * (y[j] - ya) - (ta - t[j]) * dy))
+        chosen.append(a)
+    chosen.append(size - 1)
+    return chosen
+
+
+def minmax_indices(y: Sequence[float], n: int) -> List[int]:
+    """Return the minimum and maximum sample of each of ``n // 2`` buckets."""
+    size = len(y)
+    if n >= size:
+        return list(range(size))
+    buckets = max(1, n // 2)
+    chosen: List[int] = []
+    for b in range(buckets):
+        lo = b * size // buckets
+        hi = (b + 1) * size // buckets
+        if lo >= hi:
+            continue
+        window = range(lo, hi)
+        i_min = min(window, key=y.__getitem__)
+        i_max = max(window, key=y.__getitem__)
+        chosen.extend(sorted({i_min, i_max}))
+    return chosen
+
+
+def downsample(
+    columns: Dict[str, list],
+    fields: Iterable[str],
+    max_points: int,
+    method: str = "lttb",
+    carry: Iterable[str] = (),
+) -> Dict[str, list]:
+    """Reduce ``columns`` to at most ``max_points`` samples selected for ``fields``.
+
+    Indices are chosen per field and merged, so every returned column shares
+    the ``t`` column and each series keeps its own peaks. The point budget
+    is split across the fields and shrunk until the merged set fits.
+    ``carry`` columns are returned at the same indices without influencing
+    the selection.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unbekannte Methode: {method}")
+    t = columns["t"]
+    fields = [f for f in fields if f in columns and f != "t"]
+    names = ("t", *fields, *(c for c in carry if c in columns and c not in fields))
+    if len(t) <= max_points:
+        return {name: columns[name] for name in names}
+    per_field = max(2, max_points // max(len(fields), 1))
+    while True:
+        keep: set[int] = set()
+        for name in fields:
+            keep.update(_select(t, columns[name], per_field, method))
+        if len(keep) <= max_points or per_field <= 2:
+            break
+        # strictly smaller, since len(keep) > max_points
+        per_field = max(2, per_field * max_points // len(keep))
+    order = sorted(keep)
+    if len(order) > max_points:
+        # gap markers alone exceed the budget: thin evenly
+        order = [order[i * len(order) // max_points] for i in range(max_points)]
+    return {name: [columns[name][i] for i in order] for name in names}
+
+
+def _select(t: Sequence[float], y: Sequence[Optional[float]], n: int, method: str) -> List[int]:
+    """Pick indices for one series; ``None`` values are gaps.
+
+    Selection runs on the present values only, and the first sample of
+    every gap is kept so that the chart breaks the line there.
+    """
+    valid = [i for i, v in enumerate(y) if v is not None]
+    if len(valid) == len(y):
+        return lttb_indices(t, y, n) if method == "lttb" else minmax_indices(y, n)
+    ys = [y[i] for i in valid]
+    picked = lttb_indices([t[i] for i in valid], ys, n) if method == "lttb" else minmax_indices(ys, n)
+    chosen = [valid[i] for i in picked]
+    chosen.extend(i for i, v in enumerate(y) if v is None and (i == 0 or y[i - 1] is not None))
+    return chosen
@@ -0,0 +1,79 @@
+"""Range queries on the history for the dashboard."""
+
+from __future__ import annotations
+
+import math
+import time
+from typing import Any, Dict, Optional, Sequence
+
+from .downsample import METHODS, downsample
+from .ring_buffer import FIELDS, HistoryBuffer
+from .rollup import RollupEngine
+
+DEFAULT_FIELDS = ("temperature1", "temperature2", "output_pct")
+MAX_POINTS_LIMIT = 5000
+
+
+def parse_query(params: Dict[str, Any], now: Optional[float] = None) -> Dict[str, Any]:
+    """Validate query parameters from HTTP or Socket.IO.
+
+    ``start``/``end`` are epoch seconds; a negative ``start`` is relative to
+    ``end`` (e.g. ``-3600`` for the last hour). ``fields`` may be a list or a
+    comma-separated string.
+    """
+    now = time.time() if now is None else now
+    end = float(params.get("end") or now)
+    start = float(params.get("start", -3600))
+    if not (math.isfinite(start) and math.isfinite(end)):
+        raise ValueError("start und end muessen endliche Zahlen sein")
+    if start < 0:
+        start = end + start
+    if start > end:
+        raise ValueError("start liegt nach end")
+    points = int(params.get("points", 500))
+    if not 2 <= points <= MAX_POINTS_LIMIT:
+        raise ValueError(f"points muss zwischen 2 und {MAX_POINTS_LIMIT} liegen")
+    method = str(params.get("method", "lttb"))
+    if method not in METHODS:
+        raise ValueError(f"Unbekannte Methode: {method}")
+    fields = params.get("fields") or DEFAULT_FIELDS
+    if isinstance(fields, str):
+        fields = [f for f in fields.split(",") if f]
+    valid = set(FIELDS) | {"alarm", "postrun", "output_integral"}
+    unknown = [f for f in fields if f not in valid]
+    if unknown:
+        raise ValueError(f"Unbekannte Felder: {', '.join(unknown)}")
+    return {"start": start, "end": end, "points": points, "method": method, "fields": list(fields)}
+
+
+def query_history(
+    history: HistoryBuffer,
+    start: float,
+    end: float,
+    points: int = 500,
+    method: str = "lttb",
+    fields: Sequence[str] = DEFAULT_FIELDS,
+    rollup: Optional[RollupEngine] = None,
+) -> Dict[str, Any]:
+    """Return the downsampled samples between ``start`` and ``end``.
+
+    With a ``rollup`` engine the coarsest tier that still provides ``points``
+    samples is used; its series are bucket means accompanied by ``<field>_min``
+    and ``<field>_max`` envelopes, and ``alarm``/``postrun`` become fractions.
+    """
+    tier = rollup.pick_tier(start, end, points) if rollup is not None else None
+    carry: list[str] = []
+    if tier is None:
+        columns = history.between(start, end, fields)
+    else:
+        columns = tier.between(start, end)
+        carry = [f"{f}_{agg}" for f in fields if f in FIELDS for agg in ("min", "max")]
+    series = downsample(columns, fields, points, method, carry)
+    return {
+        "start": start,
+        "end": end,
+        "method": method,
+        "tier": "raw" if tier is None else tier.name,
+        "source_points": len(columns["t"]),
+        "series": series,
+    }
@@ -0,0 +1,275 @@
+"""Fixed-size time-series ring buffer, optionally backed by a mmap'd file."""
+
+from __future__ import annotations
+
+import math
+import mmap
+import os
+import struct
+import threading
+from functools import lru_cache
+from typing import BinaryIO, Dict, List, Optional, Sequence, Tuple
+
+from config.logging_config import logger
+
+# Columns stored per sample (besides the timestamp)
+FIELDS: Tuple[str, ...] = (
+    "temperature1",
+    "temperature2",
+    "ambient1",
+    "ambient2",
+    "delta1",
+    "delta2",
+    "output_pct",
+    "setpoint",
+)
+FLAG_ALARM = 0x01
+FLAG_POSTRUN = 0x02
+
+# timestamp (epoch seconds), one float32 per field, flag byte, padding
+RECORD = struct.Struct("<d" + "f" * len(FIELDS) + "B3x")
+_TIME = struct.Struct("<d")
+HEADER = struct.Struct("<8sIIQQ")
+MAGIC = b"FCHIST01"
+
+
+class MappedRing:
+    """Ring of fixed-size ``record`` structs ordered by a leading timestamp.
+
+    Records are packed into a preallocated buffer with :mod:`struct`. With a
+    ``path`` the buffer is a shared memory map of that file, so every append
+    lands in the page cache without rewriting the file and the contents
+    survive a restart; :meth:`flush` forces them to disk. A file with a
+    different layout or capacity is reinitialized.
+
+    Timestamps must increase strictly. A record that is not newer than the
+    last one (the wall clock was stepped back) is dropped and counted in
+    ``rejected`` until the clock passes the last stored time again.
+    """
+
+    def __init__(
+        self,
+        record: struct.Struct,
+        capacity: int,
+        path: Optional[str] = None,
+        magic: bytes = MAGIC,
+    ) -> None:
+        if capacity <= 0:
+            raise ValueError("capacity muss positiv sein")
+        self.record = record
+        self.capacity = int(capacity)
+        self.path = path
+        self.magic = magic
+        self._lock = threading.Lock()
+        self._file: Optional[BinaryIO] = None
+        self._map: Optional[mmap.mmap] = None
+        size = HEADER.size + self.capacity * record.size
+        self.head = 0
+        self.count = 0
+        self.rejected = 0
+        self._last_t = -math.inf
+        self._rejecting = False
+        if path is None:
+            self._buf: bytearray | mmap.mmap = bytearray(size)
+            self._write_header()
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        fresh = not os.path.exists(path) or os.path.getsize(path) != size
+        self._file = open(path, "r+b" if not fresh else "w+b")
+        if fresh:
+            self._file.truncate(size)
+        self._map = mmap.mmap(self._file.fileno(), size)
+        self._buf = self._map
+        stored_magic, rec_size, _reserved, head, count = HEADER.unpack_from(self._buf, 0)
+        if (
+            fresh
+            or stored_magic != magic
+            or rec_size != record.size
+            or head >= self.capacity
+            or count > self.capacity
+        ):
+            if not fresh:
+                logger.warning("Verlaufsdatei %s inkompatibel, wird neu angelegt", path)
+            self._write_header()
+        else:
+            self.head = head
+            self.count = count
+            if count:
+                self._last_t = _TIME.unpack_from(self._buf, self._offset(count - 1))[0]
+            logger.info("Verlauf geladen: %d Eintraege aus %s", count, path)
+
+    def _write_header(self) -> None:
+        HEADER.pack_into(self._buf, 0, self.magic, self.record.size, 0, self.head, self.count)
+
+    # ------------------------------------------------------------------
+    def append_record(self, t: float, *values: object) -> bool:
+        """Store one record; return False if ``t`` is not newer than the last one."""
+        with self._lock:
+            last = self._last_t
+            accepted = t > last
+            was_rejecting = self._rejecting
+            self._rejecting = not accepted
+            if accepted:
+                self.record.pack_into(self._buf, HEADER.size + self.head * self.record.size, t, *values)
+                self.head = (self.head + 1) % self.capacity
+                if self.count < self.capacity:
+                    self.count += 1
+                self._write_header()
+                self._last_t = t
+            else:
+                self.rejected += 1
+        if not accepted and not was_rejecting:
+            logger.warning("Zeitstempel %.3f liegt vor dem letzten Eintrag %.3f, Samples werden verworfen", t, last)
+        elif accepted and was_rejecting:
+            logger.info("Zeit wieder fortlaufend, bisher %d Samples verworfen", self.rejected)
+        return accepted
+
+    def _offset(self, index: int) -> int:
+        """Byte offset of the ``index``-th oldest record (lock held)."""
+        return HEADER.size + ((self.head - self.count + index) % self.capacity) * self.record.size
+
+    def _slice(
+        self, first: int, last: Optional[int] = None, record: Optional[struct.Struct] = None
+    ) -> List[Tuple]:
+        """Return the records with logical index ``first <= i < last`` (lock held).
+
+        ``record`` may replace :attr:`record` with a layout of the same size,
+        e.g. one that skips unneeded columns as padding.
+        """
+        last = self.count if last is None else min(last, self.count)
+        n = last - first
+        if n <= 0:
+            return []
+        size = self.record.size
+        start = (self.head - self.count + first) % self.capacity
+        base = HEADER.size
+        if start + n <= self.capacity:
+            raw = self._buf[base + start * size : base + (start + n) * size]
+        else:
+            wrapped = start + n - self.capacity
+            raw = self._buf[base + start * size : base + self.capacity * size]
+            raw += self._buf[base : base + wrapped * size]
+        return list((record or self.record).iter_unpack(raw))
+
+    def _bisect(self, t: float) -> int:
+        """Index of the first record newer than ``t`` (lock held)."""
+        # append_record keeps the timestamps strictly increasing
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if _TIME.unpack_from(self._buf, self._offset(mid))[0] <= t:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def latest_records(self, n: int) -> List[Tuple]:
+        with self._lock:
+            return self._slice(self.count - min(max(n, 0), self.count))
+
+    def records_since(self, t: float) -> List[Tuple]:
+        with self._lock:
+            return self._slice(self._bisect(t))
+
+    def records_between(
+        self, start: float, end: float, record: Optional[struct.Struct] = None
+    ) -> List[Tuple]:
+        with self._lock:
+            first = self._bisect(math.nextafter(start, -math.inf))
+            return self._slice(first, self._bisect(end), record)
+
+    def first_time(self) -> Optional[float]:
+        with self._lock:
+            if not self.count:
+                return None
+            return _TIME.unpack_from(self._buf, self._offset(0))[0]
+
+    def last_time(self) -> Optional[float]:
+        with self._lock:
+            if not self.count:
+                return None
+            return _TIME.unpack_from(self._buf, self._offset(self.count - 1))[0]
+
+    def __len__(self) -> int:
+        return self.count
+
+    def flush(self) -> None:
+        if self._map is not None:
+            with self._lock:
+                self._map.flush()
+
+    def close(self) -> None:
+        if self._map is not None:
+            self.flush()
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class HistoryBuffer(MappedRing):
+    """Ring buffer of raw control-loop samples."""
+
+    def __init__(self, capacity: int = 172800, path: Optional[str] = None) -> None:
+        super().__init__(RECORD, capacity, path)
+
+    def append(
+        self,
+        t: float,
+        values: Tuple[float, ...],
+        alarm: bool = False,
+        postrun: bool = False,
+    ) -> bool:
+        """Store one sample; ``values`` follows :data:`FIELDS`, NaN marks a gap."""
+        flags = (FLAG_ALARM if alarm else 0) | (FLAG_POSTRUN if postrun else 0)
+        return self.append_record(t, *values, flags)
+
+    def latest(self, n: int) -> Dict[str, list]:
+        """Return the newest ``n`` samples as columns."""
+        return _columns(self.latest_records(n))
+
+    def since(self, t: float) -> Dict[str, list]:
+        """Return all samples newer than ``t`` as columns."""
+        return _columns(self.records_since(t))
+
+    def between(
+        self, start: float, end: float, fields: Optional[Sequence[str]] = None
+    ) -> Dict[str, list]:
+        """Return the samples with ``start <= t <= end`` as columns.
+
+        With ``fields`` only those value columns (plus ``t``, ``alarm`` and
+        ``postrun``) are unpacked and converted; the others are skipped.
+        """
+        if fields is None:
+            return _columns(self.records_between(start, end))
+        names = tuple(f for f in FIELDS if f in fields)
+        records = self.records_between(start, end, _projection(names))
+        data: Dict[str, list] = {"t": [r[0] for r in records]}
+        for idx, name in enumerate(names, start=1):
+            data[name] = [column_value(r[idx]) for r in records]
+        data["alarm"] = [bool(r[-1] & FLAG_ALARM) for r in records]
+        data["postrun"] = [bool(r[-1] & FLAG_POSTRUN) for r in records]
+        return data
+
+
+def column_value(v: float, digits: int = 3) -> Optional[float]:
+    """Round a stored value; NaN (lost sensor) becomes ``None``."""
+    return None if v != v else round(v, digits)
+
+
+@lru_cache(maxsize=32)
+def _projection(names: Tuple[str, ...]) -> struct.Struct:
+    """Layout of :data:`RECORD` that unpacks only ``names`` and the flags."""
+    fmt = "".join("f" if f in names else "4x" for f in FIELDS)
+    return struct.Struct("<d" + fmt + "B3x")
+
+
+def _columns(records: List[Tuple]) -> Dict[str, list]:
+    data: Dict[str, list] = {"t": [r[0] for r in records]}
+    for idx, name in enumerate(FIELDS, start=1):
+        data[name] = [column_value(r[idx]) for r in records]
+    flag_idx = len(FIELDS) + 1
+    data["alarm"] = [bool(r[flag_idx] & FLAG_ALARM) for r in records]
+    data["postrun"] = [bool(r[flag_idx] & FLAG_POSTRUN) for r in records]
+    return data
@@ -0,0 +1,282 @@
+"""Incremental rollup of raw history samples into coarser tiers."""
+
+from __future__ import annotations
+
+import math
+import os
+import struct
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from config.logging_config import logger
+from .ring_buffer import FIELDS, FLAG_ALARM, FLAG_POSTRUN, HistoryBuffer, MappedRing, column_value
+
+_N = len(FIELDS)
+# bucket start, per field min/max/mean/last, alarm and postrun fraction,
+# output integral (%*s), sample count
+TIER_RECORD = struct.Struct("<d" + "f" * (4 * _N) + "ffdI4x")
+TIER_MAGIC = b"FCROLL01"
+_OUTPUT_IDX = FIELDS.index("output_pct")
+_NAN = float("nan")
+
+
+class RollupTier(MappedRing):
+    """Fixed-width aggregate buckets kept for ``retention`` buckets."""
+
+    def __init__(self, name: str, width: float, retention: int, path: Optional[str] = None) -> None:
+        super().__init__(TIER_RECORD, retention, path, magic=TIER_MAGIC)
+        self.name = name
+        self.width = float(width)
+
+    def between(self, start: float, end: float) -> Dict[str, list]:
+        """Return the buckets starting in ``[start, end]`` as columns."""
+        return tier_columns(self.records_between(start, end))
+
+
+class _Bucket:
+    """Aggregate that is still open.
+
+    NaN values (lost sensor) are left out of min/max/mean; a field without
+    any value in the bucket is stored as NaN.
+    """
+
+    __slots__ = ("start", "count", "ns", "mins", "maxs", "sums", "lasts", "alarm", "postrun", "integral")
+
+    def __init__(self, start: float) -> None:
+        self.start = start
+        self.count = 0
+        self.ns = [0] * _N
+        self.mins = [math.inf] * _N
+        self.maxs = [-math.inf] * _N
+        self.sums = [0.0] * _N
+        self.lasts = [0.0] * _N
+        self.alarm = 0.0
+        self.postrun = 0.0
+        self.integral = 0.0
+
+    def add_sample(self, values: Sequence[float], flags: int, dt: float) -> None:
+        mins, maxs, sums, ns = self.mins, self.maxs, self.sums, self.ns
+        for i, v in enumerate(values):
+            if v != v:
+                continue
+            ns[i] += 1
+            if v < mins[i]:
+                mins[i] = v
+            if v > maxs[i]:
+                maxs[i] = v
+            sums[i] += v
+        self.lasts = list(values)
+        self.count += 1
+        if flags & FLAG_ALARM:
+            self.alarm += 1
+        if flags & FLAG_POSTRUN:
+            self.postrun += 1
+        self.integral += values[_OUTPUT_IDX] * dt
+
+    def merge(self, rec: Tuple) -> None:
+        """Fold a closed bucket of the next finer tier into this one."""
+        count = rec[-1]
+        if not count:
+            return
+        for i in range(_N):
+            base = 1 + 4 * i
+            self.lasts[i] = rec[base + 3]
+            mean = rec[base + 2]
+            if mean != mean:
+                continue
+            # weighted by the bucket's sample count; exact unless the finer
+            # bucket itself was partly missing
+            self.mins[i] = min(self.mins[i], rec[base])
+            self.maxs[i] = max(self.maxs[i], rec[base + 1])
+            self.sums[i] += mean * count
+            self.ns[i] += count
+        self.alarm += rec[1 + 4 * _N] * count
+        self.postrun += rec[2 + 4 * _N] * count
+        self.integral += rec[3 + 4 * _N]
+        self.count += count
+
+    def record(self) -> Tuple:
+        values: List[float] = []
+        for i in range(_N):
+            if self.ns[i]:
+                values.extend((self.mins[i], self.maxs[i], self.sums[i] / self.ns[i], self.lasts[i]))
+            else:
+                values.extend((_NAN, _NAN, _NAN, self.lasts[i]))
+        return (
+            self.start,
+            *values,
+            self.alarm / self.count,
+            self.postrun / self.count,
+            self.integral,
+            self.count,
+        )
+
+
+class RollupEngine:
+    """Turn raw samples into 1 s -> 1 min -> 1 h style aggregate tiers.
+
+    Only samples newer than the last processed one are read from the raw
+    buffer, and every closed bucket is folded into the open bucket of the
+    next coarser tier, so no tier is ever rescanned. Open buckets are rebuilt
+    on startup from the closed buckets of the finer tier.
+    """
+
+    def __init__(
+        self,
+        source: HistoryBuffer,
+        tiers: Sequence[RollupTier],
+        *,
+        interval: float = 1.0,
+        max_gap: float = 5.0,
+    ) -> None:
+        if not tiers:
+            raise ValueError("Mindestens eine Rollup-Stufe erforderlich")
+        widths = [t.width for t in tiers]
+        if any(b <= a or b % a for a, b in zip(widths, widths[1:])):
+            raise ValueError("Rollup-Stufen muessen aufsteigende Vielfache sein")
+        self.source = source
+        self.tiers = list(tiers)
+        self.interval = interval
+        self.max_gap = max_gap
+        self._open: List[Optional[_Bucket]] = [None] * len(self.tiers)
+        self._prev_t: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._resume()
+
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _bucket_start(t: float, width: float) -> float:
+        return math.floor(t / width) * width
+
+    def _last_end(self, level: int) -> float:
+        last = self.tiers[level].last_time()
+        return -math.inf if last is None else last + self.tiers[level].width
+
+    def _resume(self) -> None:
+        # coarse to fine: buckets closed while rebuilding a finer level are
+        # new in that tier and therefore not yet part of the coarser rebuild
+        for level in range(len(self.tiers) - 1, 0, -1):
+            for rec in self.tiers[level - 1].records_since(self._last_end(level) - 1e-6):
+                self._fold(level, rec)
+        self.processed_until = self._last_end(0) - 1e-6
+
+    def _close(self, level: int) -> None:
+        bucket = self._open[level]
+        self._open[level] = None
+        if bucket is None or not bucket.count:
+            return
+        rec = bucket.record()
+        self.tiers[level].append_record(*rec)
+        if level + 1 < len(self.tiers):
+            self._fold(level + 1, rec)
+
+    def _fold(self, level: int, rec: Tuple) -> None:
+        start = self._bucket_start(rec[0], self.tiers[level].width)
+        bucket = self._open[level]
+        if bucket is not None and bucket.start != start:
+            self._close(level)
+            bucket = None
+        if bucket is None:
+            bucket = self._open[level] = _Bucket(start)
+        bucket.merge(rec)
+
+    def add(self, t: float, values: Sequence[float], flags: int) -> None:
+        start = self._bucket_start(t, self.tiers[0].width)
+        bucket = self._open[0]
+        if bucket is not None and bucket.start != start:
+            self._close(0)
+            bucket = None
+        if bucket is None:
+            bucket = self._open[0] = _Bucket(start)
+        dt = 0.0 if self._prev_t is None else min(max(t - self._prev_t, 0.0), self.max_gap)
+        bucket.add_sample(values, flags, dt)
+        self._prev_t = t
+        self.processed_until = t
+
+    def process(self) -> int:
+        """Aggregate raw samples that arrived since the last call."""
+        records = self.source.records_since(self.processed_until)
+        for rec in records:
+            self.add(rec[0], rec[1 : 1 + _N], rec[1 + _N])
+        return len(records)
+
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="history-rollup", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.process()
+            except Exception as exc:  # pragma: no cover - defensive
+                logger.error("Rollup fehlgeschlagen: %s", exc)
+
+    def stop(self) -> None:
+        """Stop the thread, fold the remaining samples and flush all tiers."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        self.process()
+        for tier in self.tiers:
+            tier.flush()
+
+    def pick_tier(self, start: float, end: float, points: int) -> Optional[RollupTier]:
+        """Return the coarsest tier that still resolves ``points`` samples.
+
+        If that tier does not reach back to ``start`` the next coarser tier
+        that does is used, so a long range never falls back to the raw
+        samples. ``None`` means the raw samples are needed: the range is too
+        short for any tier or the tiers hold no data yet.
+        """
+        resolution = (end - start) / max(points, 1)
+        level = -1
+        for i, tier in enumerate(self.tiers):
+            if tier.width <= resolution:
+                level = i
+        if level < 0:
+            return None
+        best: Optional[RollupTier] = None
+        best_first = math.inf
+        for tier in self.tiers[level:]:
+            first = tier.first_time()
+            if first is not None and first <= start:
+                return tier
+            if first is not None and first < best_first:
+                best, best_first = tier, first
+        # no tier reaches back that far yet: the one holding the most data,
+        # or the raw samples while the tiers are still empty
+        return best
+
+
+def tier_columns(records: List[Tuple]) -> Dict[str, list]:
+    data: Dict[str, list] = {"t": [r[0] for r in records]}
+    for i, name in enumerate(FIELDS):
+        base = 1 + 4 * i
+        data[f"{name}_min"] = [column_value(r[base]) for r in records]
+        data[f"{name}_max"] = [column_value(r[base + 1]) for r in records]
+        data[name] = [column_value(r[base + 2]) for r in records]
+        data[f"{name}_last"] = [column_value(r[base + 3]) for r in records]
+    data["alarm"] = [round(r[1 + 4 * _N], 4) for r in records]
+    data["postrun"] = [round(r[2 + 4 * _N], 4) for r in records]
+    data["output_integral"] = [round(r[3 + 4 * _N], 1) for r in records]
+    data["count"] = [r[4 + 4 * _N] for r in records]
+    return data
+
+
+def build_tiers(specs: Sequence[Dict[str, object]], base_path: Optional[str]) -> List[RollupTier]:
+    """Create tiers from config entries ``{"name", "width", "retention"}``."""
+    tiers: List[RollupTier] = []
+    for spec in specs:
+        name = str(spec["name"])
+        path = None
+        if base_path:
+            root, ext = os.path.splitext(base_path)
+            path = f"{root}.{name}{ext or '.bin'}"
+        tiers.append(RollupTier(name, float(spec["width"]), int(spec["retention"]), path))
+    return tiers
@@ -1,7 +1,7 @@
 """Models for the fan control project."""
 
-from .system_state import Mode, SystemState
+from .system_state import Mode, StateChanges, SystemState
 from .sensor_info import SensorInfo
 
-__all__ = ["Mode", "SystemState", "SensorInfo"]
+__all__ = ["Mode", "StateChanges", "SystemState", "SensorInfo"]
 
@@ -1,9 +1,14 @@
 """Represent the current system state for the fan control application."""
 
-from dataclasses import dataclass, field, asdict
+import threading
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field, fields
 from datetime import datetime
 from enum import Enum
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+_UNSET = object()
 
 
 class Mode(Enum):
@@ -13,10 +18,69 @@ class Mode(Enum):
     MANUAL = "manual"
 
 
-@dataclass
+class StateChanges:
+    """Notification channel from state producers to the web layer.
+
+    Producers call :meth:`publish` after mutating the state; ``urgent`` marks
+    changes (alarm or postrun transitions) that must not wait for the next
+    coalesced push.
+    """
+
+    __slots__ = ("_cond", "_pending", "_urgent")
+
+    def __init__(self) -> None:
+        self._cond = threading.Condition()
+        self._pending = False
+        self._urgent = False
+
+    def publish(self, urgent: bool = False) -> None:
+        with self._cond:
+            self._pending = True
+            self._urgent = self._urgent or urgent
+            self._cond.notify_all()
+
+    @property
+    def urgent(self) -> bool:
+        return self._urgent
+
+    def wait(self, timeout: float, *, urgent_only: bool = False) -> bool:
+        """Block until a (urgent) change is pending or ``timeout`` expires."""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: self._urgent if urgent_only else self._pending, timeout=timeout
+            )
+
+    def clear(self) -> None:
+        with self._cond:
+            self._pending = False
+            self._urgent = False
+
+
+@dataclass(slots=True)
 class SystemState:
-    """Container object for the runtime state of the system."""
+    """Container object for the runtime state of the system.
+
+    Every assignment that changes a public field bumps :attr:`version`, which
+    lets :meth:`as_dict` serialize the state once per change instead of once
+    per client.
 
+    While a control loop drives the state (:meth:`set_tick_driven`) only the
+    control thread mutates it: other threads :meth:`submit` commands that are
+    applied at the next tick boundary, and readers get the snapshot published
+    by :meth:`commit` at the end of the previous tick.
+    """
+
+    # bookkeeping first so it exists before the public fields are assigned
+    _version: int = field(default=0, init=False, repr=False, compare=False)
+    _snapshot: Optional[Tuple[int, int, Dict[str, Any]]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _changes: StateChanges = field(default_factory=StateChanges, init=False, repr=False, compare=False)
+    _commands: Deque[Tuple[Callable[["SystemState"], None], Future]] = field(
+        default_factory=deque, init=False, repr=False, compare=False
+    )
+    _published: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
+    _tick_driven: bool = field(default=False, init=False, repr=False, compare=False)
     temperature1: float = 0.0
     temperature2: float = 0.0
     ambient1: float = 0.0
@@ -45,22 +109,113 @@ class SystemState:
     smoothing_enabled: bool = True
     smoothing_alpha: float = 0.3
 
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name[0] != "_":
+            old = getattr(self, name, _UNSET)
+            if old is not value and (old is _UNSET or type(old) is not type(value) or old != value):
+                object.__setattr__(self, "_version", self._version + 1)
+        object.__setattr__(self, name, value)
+
+    @property
+    def version(self) -> int:
+        """Counter that changes whenever a public field changes."""
+        return self._version
+
+    @property
+    def changes(self) -> StateChanges:
+        """Channel used to announce state changes to the web layer."""
+        return self._changes
+
     def __post_init__(self) -> None:
         if not isinstance(self.mode, Mode):
             self.mode = Mode(self.mode)
         self.thermocouple_type = str(self.thermocouple_type).upper()
 
+    # ------------------------------------------------------------------
+    def set_tick_driven(self, enabled: bool) -> None:
+        """Switch between tick-based publishing and direct access."""
+        self._tick_driven = enabled
+        if not enabled:
+            self.apply_commands()
+            self._published = None
+
+    def submit(self, command: Callable[["SystemState"], None]) -> Future:
+        """Run ``command(state)`` on the owning thread.
+
+        Without a control loop the command is applied immediately. The
+        returned future completes once the command has been applied.
+        """
+        done: Future = Future()
+        if self._tick_driven:
+            self._commands.append((command, done))
+            return done
+        try:
+            command(self)
+        except Exception as exc:
+            done.set_exception(exc)
+        else:
+            done.set_result(None)
+        return done
+
+    def apply_commands(self) -> int:
+        """Apply queued commands; called by the control loop at tick start."""
+        applied = 0
+        while True:
+            try:
+                command, done = self._commands.popleft()
+            except IndexError:
+                return applied
+            if not done.set_running_or_notify_cancel():
+                # withdrawn by the submitter after a timeout
+                continue
+            try:
+                command(self)
+            except Exception as exc:
+                done.set_exception(exc)
+            else:
+                done.set_result(None)
+            applied += 1
+
+    def commit(self) -> Dict[str, Any]:
+        """Publish a consistent snapshot; called by the control loop at tick end."""
+        snapshot = self._build_snapshot()
+        # a single reference assignment, readers never see a partial tick
+        self._published = snapshot
+        return snapshot
+
     def as_dict(self) -> Dict[str, Any]:
-        """Return a dictionary representation of the state."""
+        """Return a dictionary representation of the state.
 
-        data = asdict(self)
-        data["mode"] = self.mode.value
-        data["thermocouple_type"] = str(self.thermocouple_type).upper()
+        The dictionary is cached until the state changes and is shared by all
+        callers, so it must be treated as read-only. While a control loop
+        drives the state this is the snapshot of the last completed tick.
+        """
+
+        published = self._published
+        if published is not None and self._tick_driven:
+            return published
+        return self._build_snapshot()
+
+    def _build_snapshot(self) -> Dict[str, Any]:
         remaining = 0
         if self.postrun_until is not None:
             remaining = int((self.postrun_until - datetime.now()).total_seconds())
             if remaining < 0:
                 remaining = 0
+        version = self._version
+        cached = self._snapshot
+        if cached is not None and cached[0] == version and cached[1] == remaining:
+            return cached[2]
+        data = {name: getattr(self, name) for name in _SNAPSHOT_FIELDS}
+        data["mode"] = self.mode.value
+        data["thermocouple_type"] = str(self.thermocouple_type).upper()
         data["postrun_remaining"] = remaining
-        data.pop("postrun_until", None)
+        # a concurrent mutation changes _version, so a torn snapshot is
+        # never reused
+        self._snapshot = (version, remaining, data)
         return data
+
+
+_SNAPSHOT_FIELDS = tuple(
+    f.name for f in fields(SystemState) if not f.name.startswith("_") and f.name != "postrun_until"
+)
@@ -0,0 +1,58 @@
+"""Sweep the DS3502 and store a calibrated percent-to-wiper table."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+
+from controller.calibration import calibration_entry, sweep, sweep_positions
+from controller.ds3502_output import DS3502Config, FanDS3502Controller
+from config import load_config, save_calibration
+from config.logging_config import logger
+
+
+def _ask(wiper: int) -> float:
+    while True:
+        raw = input(f"Wiper {wiper}: gemessener Wert (z.B. Drehzahl/Luftstrom): ")
+        try:
+            return float(raw.replace(",", "."))
+        except ValueError:
+            print("Bitte eine Zahl eingeben")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="DS3502 fan calibration")
+    parser.add_argument("--points", type=int, default=12, help="number of sweep positions")
+    parser.add_argument("--settle", type=float, default=5.0, help="seconds to wait per position")
+    parser.add_argument("--dry-run", action="store_true", help="do not store the result")
+    args = parser.parse_args()
+
+    cfg = load_config()
+    ds_cfg = cfg.get("ds3502", {})
+    config = DS3502Config(
+        address=ds_cfg.get("address", "0x28"),
+        wiper_min=int(ds_cfg.get("wiper_min", 2)),
+        wiper_max=int(ds_cfg.get("wiper_max", 125)),
+        write_behind=False,
+    )
+    actuator = FanDS3502Controller(config)
+    if not actuator.available:
+        logger.error("DS3502 nicht erreichbar, Kalibrierung abgebrochen")
+        return 1
+
+    wipers = sweep_positions(config.wiper_min, config.wiper_max, args.points)
+    try:
+        points = sweep(actuator.set_wiper, _ask, wipers, settle_s=args.settle)
+    finally:
+        actuator.set_wiper(config.wiper_min)
+
+    entry = calibration_entry(points)
+    for pct in (0, 25, 50, 75, 100):
+        logger.info("%3d %% -> Wiper %d", pct, entry["lut"][pct * (len(entry["lut"]) - 1) // 100])
+    if not args.dry_run:
+        save_calibration(entry)
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI execution
+    sys.exit(main())
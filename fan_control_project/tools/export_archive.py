@@ -0,0 +1,58 @@
+"""Export the compressed sample archive as CSV."""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import os
+import sys
+from datetime import datetime
+
+from config import load_config
+from history import FIELDS, SampleArchive
+from history.ring_buffer import FLAG_ALARM, FLAG_POSTRUN
+
+
+def _time(value: str) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Export archived samples as CSV")
+    parser.add_argument("--path", help="archive file (default: from settings)")
+    parser.add_argument("--start", type=_time, help="epoch seconds or ISO time")
+    parser.add_argument("--end", type=_time, help="epoch seconds or ISO time")
+    parser.add_argument("--output", "-o", help="CSV file (default: stdout)")
+    args = parser.parse_args()
+
+    path = args.path or load_config().get("history", {}).get("archive_path", "")
+    if not path:
+        print("Kein Archiv konfiguriert", file=sys.stderr)
+        return 1
+    if not os.path.isabs(path):
+        path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), path)
+    if not os.path.exists(path):
+        print(f"Archiv {path} nicht gefunden", file=sys.stderr)
+        return 1
+
+    archive = SampleArchive(path, readonly=True)
+    out = open(args.output, "w", newline="") if args.output else sys.stdout
+    try:
+        writer = csv.writer(out)
+        writer.writerow(["t", *FIELDS, "alarm", "postrun"])
+        # samples are decoded block by block, the file is never loaded whole
+        for t, values, flags in archive.iter_samples(args.start, args.end):
+            writer.writerow(
+                [f"{t:.3f}", *(f"{v:.4g}" for v in values), int(bool(flags & FLAG_ALARM)), int(bool(flags & FLAG_POSTRUN))]
+            )
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI execution
+    sys.exit(main())
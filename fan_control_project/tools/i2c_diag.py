@@ -6,14 +6,73 @@ import argparse
 import sys
 import time
 
+from controller.control_loop import ControlLoop
 from controller.sensor_reader import SensorReader
+from controller.latency import PhaseTimings
+from controller.pid_controller import PIDController
 from config import load_config
 from config.logging_config import logger
+from models import SystemState
+from models.sensor_info import SensorInfo
+
+
+class _NullActuator:
+    """Actuator stand-in so that a benchmark never drives the fan."""
+
+    def set_output(self, value: float) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+
+def _benchmark(reader: SensorReader, cycles: int, cfg: dict) -> PhaseTimings:
+    """Run ``cycles`` control-loop iterations and return their phase timings.
+
+    Uses the real sensor reader and PID with the configured parameters; the
+    actuator is a no-op and the alarm is disabled.
+    """
+    addresses = [addr for addr, _address, _sensor in reader.sensors]
+    # the loop needs two sensors; with a single one it is used twice
+    sensors = [SensorInfo(rom_id=a, pin="I2C") for a in (addresses * 2)[:2]]
+    # no alarm threshold, so every iteration takes the PID path
+    state = SystemState(setpoint=float(cfg.get("setpoint", 0.0)), alarm_threshold=float("inf"))
+    pid = PIDController(
+        setpoint=state.setpoint,
+        kp=float(cfg.get("kp", 1.0)),
+        ki=float(cfg.get("ki", 0.1)),
+        kd=float(cfg.get("kd", 0.0)),
+        sample_time=None,
+    )
+    loop = ControlLoop(state, reader, pid, _NullActuator(), sensors)
+    for _ in range(cycles):
+        loop.update_once()
+    return loop.timings
+
+
+def _report(timings: PhaseTimings) -> None:
+    for phase, stats in timings.summary().items():
+        logger.info(
+            "%s: n=%d p50=%.2fms p95=%.2fms p99=%.2fms max=%.2fms",
+            phase,
+            stats["count"],
+            stats["p50_ms"],
+            stats["p95_ms"],
+            stats["p99_ms"],
+            stats["max_ms"],
+        )
 
 
 def main() -> int:
     parser = argparse.ArgumentParser(description="I2C diagnostic tool")
     parser.add_argument("addresses", nargs="*", help="sensor addresses in hex")
+    parser.add_argument(
+        "--bench",
+        type=int,
+        default=0,
+        metavar="N",
+        help="time N control-loop iterations and report latency percentiles per phase",
+    )
     args = parser.parse_args()
 
     cfg = load_config()
@@ -38,6 +97,9 @@ def main() -> int:
             entry.get("delta"),
         )
 
+    if args.bench > 0:
+        _report(_benchmark(reader, args.bench, cfg))
+
     missing = [a for a in addresses if a not in found]
     return 1 if missing else 0
 
@@ -0,0 +1,203 @@
+"""Prometheus text exposition of the controller's in-process counters.
+
+Nothing here runs on the control thread: the components bump plain
+integer attributes, :class:`~controller.latency.LatencyHistogram` buckets
+and :class:`~controller.latency.ErrorCounts`. A scrape copies histograms
+and error counts with their ``snapshot`` methods, whose locks are only
+held for the copy or a single update.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from config.logging_config import log_stats
+from controller.circuit_breaker import CLOSED, HALF_OPEN, OPEN
+from controller.latency import LatencyHistogram, PhaseTimings
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+PREFIX = "fan_control_"
+_BREAKER_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+def _escape(value: object) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format(value: float) -> str:
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int):
+        return str(value)
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class Exposition:
+    """Collect samples per metric family and render them in text format."""
+
+    def __init__(self, prefix: str = PREFIX) -> None:
+        self.prefix = prefix
+        self._families: Dict[str, Tuple[str, str, List[str]]] = {}
+
+    def _family(self, name: str, kind: str, help_text: str) -> List[str]:
+        family = self._families.get(name)
+        if family is None:
+            family = self._families[name] = (kind, help_text, [])
+        return family[2]
+
+    @staticmethod
+    def _labels(labels: Optional[Mapping[str, object]]) -> str:
+        if not labels:
+            return ""
+        return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+    def sample(
+        self,
+        kind: str,
+        name: str,
+        help_text: str,
+        value: Optional[float],
+        labels: Optional[Mapping[str, object]] = None,
+    ) -> None:
+        if value is None:
+            return
+        full = self.prefix + name
+        self._family(full, kind, help_text).append(f"{full}{self._labels(labels)} {_format(value)}")
+
+    def counter(self, name: str, help_text: str, value: Optional[float], labels: Optional[Mapping[str, object]] = None) -> None:
+        self.sample("counter", name, help_text, value, labels)
+
+    def gauge(self, name: str, help_text: str, value: Optional[float], labels: Optional[Mapping[str, object]] = None) -> None:
+        self.sample("gauge", name, help_text, value, labels)
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        hist: LatencyHistogram,
+        labels: Optional[Mapping[str, object]] = None,
+    ) -> None:
+        full = self.prefix + name
+        lines = self._family(full, "histogram", help_text)
+        base = dict(labels or {})
+        # buckets and sum are copied together while the loop may observe
+        counts, total, _peak = hist.snapshot()
+        cumulative = 0
+        for bound, n in zip(hist.bounds, counts):
+            cumulative += n
+            lines.append(f"{full}_bucket{self._labels({**base, 'le': _format(bound)})} {cumulative}")
+        cumulative += counts[-1]
+        lines.append(f"{full}_bucket{self._labels({**base, 'le': '+Inf'})} {cumulative}")
+        lines.append(f"{full}_sum{self._labels(base)} {_format(total)}")
+        lines.append(f"{full}_count{self._labels(base)} {cumulative}")
+
+    def render(self) -> str:
+        out: List[str] = []
+        for name, (kind, help_text, lines) in self._families.items():
+            out.append(f"# HELP {name} {help_text}")
+            out.append(f"# TYPE {name} {kind}")
+            out.extend(lines)
+        return "\n".join(out) + "\n"
+
+
+def _phases(exp: Exposition, timings: Any, component: str) -> None:
+    if not isinstance(timings, PhaseTimings):
+        return
+    for phase, hist in timings.items():
+        exp.histogram(
+            "phase_duration_seconds",
+            "Duration of control-loop and output phases.",
+            hist,
+            {"component": component, "phase": phase},
+        )
+
+
+def _error_counts(owner: Any, name: str) -> Dict[int, int]:
+    counts = getattr(owner, name, None)
+    if counts is None:
+        return {}
+    snapshot = getattr(counts, "snapshot", None)
+    return snapshot() if callable(snapshot) else dict(counts)
+
+
+def _deadline(exp: Exposition, runner: Any, bus: str) -> None:
+    if not callable(getattr(runner, "stats", None)):
+        return
+    stats = runner.stats()
+    exp.counter("i2c_timeouts_total", "I2C transactions abandoned after their deadline.", stats["timeouts"], {"device": bus})
+    exp.counter("i2c_bus_recoveries_total", "Bus recoveries after a timeout.", stats["recoveries"], {"device": bus})
+    exp.gauge("i2c_hung_transactions", "Abandoned transactions still pending.", stats["pending_hung"], {"device": bus})
+
+
+def render_metrics(
+    state: Any,
+    control_loop: Any = None,
+    actuator: Any = None,
+    sensor_reader: Any = None,
+) -> str:
+    """Return all metrics of the given components in Prometheus text format."""
+    exp = Exposition()
+
+    snapshot = state.as_dict()
+    for name in ("temperature1", "temperature2", "ambient1", "ambient2", "delta1", "delta2"):
+        exp.gauge("temperature_celsius", "Last smoothed sensor values.", snapshot.get(name), {"channel": name})
+    exp.gauge("setpoint_celsius", "Control setpoint.", snapshot.get("setpoint"))
+    exp.gauge("output_percent", "Output commanded by the control loop.", snapshot.get("output_pct"))
+    exp.gauge("alarm_active", "1 while the alarm temperature is exceeded.", bool(snapshot.get("alarm_active")))
+    exp.gauge("postrun_active", "1 while the post-alarm run is active.", bool(snapshot.get("postrun_remaining")))
+
+    if control_loop is not None:
+        sched = control_loop.scheduler
+        exp.counter("loop_ticks_total", "Control-loop iterations.", sched.ticks)
+        exp.counter("loop_overruns_total", "Iterations that overran their deadline.", sched.overruns)
+        exp.counter("loop_skipped_ticks_total", "Ticks skipped after an overrun.", sched.skipped)
+        exp.counter("alarm_transitions_total", "Changes of the alarm state.", control_loop.alarm_transitions)
+        _phases(exp, control_loop.timings, "loop")
+
+    status = getattr(actuator, "status", None)
+    if callable(status):
+        out = status()
+        exp.gauge("actuator_available", "1 if the DS3502 answered at startup.", bool(getattr(actuator, "available", False)))
+        exp.gauge("wiper_applied", "Wiper code last written to the DS3502.", out.get("applied_wiper"))
+        exp.gauge("wiper_target", "Wiper code for the current target.", out.get("target_wiper"))
+        exp.counter("wiper_write_failures_total", "Wiper writes that failed after all retries.", out.get("write_failures"))
+        exp.counter(
+            "wiper_writes_skipped_total", "Writes skipped because the wiper already matched.", out.get("skipped_writes")
+        )
+        exp.counter("failsafe_activations_total", "Wiper driven low after a failed write.", out.get("failsafe_writes"))
+        for err, n in sorted(_error_counts(actuator, "write_retries").items()):
+            exp.counter("wiper_write_retries_total", "Retried wiper writes by errno.", n, {"errno": err})
+        _phases(exp, getattr(actuator, "timings", None), "ds3502")
+        _deadline(exp, getattr(actuator, "deadline", None), "ds3502")
+
+    if sensor_reader is not None:
+        exp.counter("i2c_reads_total", "Sensor read transactions.", getattr(sensor_reader, "i2c_reads", None))
+        for err, n in sorted(_error_counts(sensor_reader, "read_retries").items()):
+            exp.counter("i2c_read_retries_total", "Retried sensor reads by errno.", n, {"errno": err})
+        for err, n in sorted(_error_counts(sensor_reader, "read_errors").items()):
+            exp.counter("i2c_read_errors_total", "Failed sensor reads by errno (0 = unknown).", n, {"errno": err})
+        arbiter = getattr(sensor_reader, "arbiter", None)
+        if arbiter is not None:
+            exp.counter("i2c_coalesced_total", "Bus operations served from a shared result.", arbiter.coalesced)
+        _deadline(exp, getattr(sensor_reader, "deadline", None), "mcp9600")
+        health = getattr(sensor_reader, "health", None)
+        if callable(health):
+            for addr, info in health().items():
+                exp.gauge(
+                    "sensor_breaker_state",
+                    "Circuit breaker per sensor (0 closed, 1 half-open, 2 open).",
+                    _BREAKER_VALUES.get(info.get("breaker"), 0),
+                    {"sensor_addr": addr},
+                )
+                exp.gauge("sensor_ok", "1 if the sensor delivered a fresh value.", info.get("status") == "ok", {"sensor_addr": addr})
+
+    logs = log_stats()
+    exp.counter("log_dropped_total", "Log entries not forwarded to web clients.", logs["dropped"])
+    exp.counter("log_batches_total", "Log batches sent to web clients.", logs["batches"])
+    exp.gauge("log_queue_length", "Log records waiting for the listener.", logs["queued"])
+    return exp.render()
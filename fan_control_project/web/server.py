@@ -2,21 +2,27 @@ from __future__ import annotations
 
 """Simple Flask server exposing live fan data via Socket.IO."""
 
-from threading import Event
-from typing import Any, Callable, Dict
+from concurrent.futures import TimeoutError as FutureTimeout
+from threading import Event, Lock
+from typing import Any, Callable, Dict, Optional
 import os
 import time
 
-from flask import Flask, render_template, request
+from flask import Flask, Response, jsonify, render_template, request
 from flask_socketio import SocketIO, emit
 
 from config.logging_config import logger, log_buffer, set_log_callback
+from config.log_store import LogStore, parse_log_query
 
 from models.system_state import SystemState, Mode
 from config import save_config
 from controller.pid_controller import PIDController
 from controller.sensor_reader import SensorReader
 from controller.ds3502_output import FanDS3502Controller
+from controller.control_loop import ControlLoop
+from controller.zone_engine import ZoneEngine
+from web.metrics import CONTENT_TYPE, render_metrics
+from history import HistoryBuffer, RollupEngine, parse_query, query_history
 
 app = Flask(
     __name__,
@@ -29,12 +35,12 @@ app.config["SECRET_KEY"] = "secret"
 socketio = SocketIO(app, cors_allowed_origins="*", async_mode="threading")
 
 
-def _emit_log(entry: Dict[str, Any]) -> None:
-    """Forward log entries to connected web clients."""
-    socketio.emit("log_entry", entry)
+def _emit_logs(entries: list[Dict[str, Any]], dropped: int) -> None:
+    """Forward a batch of log entries to connected web clients."""
+    socketio.emit("log_batch", {"entries": entries, "dropped": dropped})
 
 
-set_log_callback(_emit_log)
+set_log_callback(_emit_logs)
 
 # Global state object that would normally be updated by a control loop
 state = SystemState()
@@ -43,10 +49,53 @@ state = SystemState()
 pid_controller: PIDController | None = None
 sensor_reader: SensorReader | None = None
 actuator: FanDS3502Controller | None = None
+control_loop: ControlLoop | None = None
+zone_engine: ZoneEngine | None = None
+history: HistoryBuffer | None = None
+rollup: RollupEngine | None = None
+history_initial_points = 600
+log_store: LogStore | None = None
 
 # Event used to stop the background thread when the app shuts down
 _stop_event = Event()
 
+# Routine state pushes are coalesced to this rate (set by app.py); alarm and
+# postrun transitions are pushed immediately
+push_max_hz = 5.0
+# Push at least this often so that e.g. the postrun countdown advances
+_HEARTBEAT_S = 1.0
+# Wait at most this long for the control loop to apply a settings change
+_COMMAND_TIMEOUT_S = 2.0
+
+
+def _run_command(command: Callable[[SystemState], None]) -> bool:
+    """Apply ``command`` at the next control tick and announce the change.
+
+    Returns False if the control loop did not pick the command up in time;
+    the command is then withdrawn and nothing must be persisted.
+    """
+    future = state.submit(command)
+    try:
+        future.result(timeout=_COMMAND_TIMEOUT_S)
+    except FutureTimeout:
+        if future.cancel():
+            logger.warning("Einstellung nicht rechtzeitig uebernommen, verworfen")
+            return False
+        # already being applied by the control loop
+        future.result()
+    state.changes.publish()
+    return True
+
+
+def _update_state(**values: Any) -> bool:
+    """Set state attributes through the command path."""
+
+    def _command(s: SystemState) -> None:
+        for name, value in values.items():
+            setattr(s, name, value)
+
+    return _run_command(_command)
+
 
 def register_state_handler(
     event_name: str, state_attr: str, cast_func: Callable[[Any], Any] = float
@@ -58,22 +107,88 @@ def register_state_handler(
     @socketio.on(event_name)
     def _handler(data: Dict[str, Any]) -> None:
         value = cast_func(data.get("value", default))
-        setattr(state, state_attr, value)
+        if not _update_state(**{state_attr: value}):
+            return
         save_config(state)
         logger.info("%s geaendert auf %s", state_attr, value)
 
+
+class _StateStream:
+    """Sequence state broadcasts as one full snapshot plus numbered deltas.
+
+    Clients receive the last broadcast snapshot with its sequence number on
+    connect and afterwards only the fields that changed. A client that sees a
+    gap in the sequence asks for a resync.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self.seq = 0
+        self.last: Optional[Dict[str, Any]] = None
+
+    def full(self) -> Dict[str, Any]:
+        with self._lock:
+            if self.last is None:
+                self.last = state.as_dict()
+            return {**self.last, "seq": self.seq}
+
+    def delta(self) -> Optional[Dict[str, Any]]:
+        """Return the changes since the last broadcast or None."""
+        snapshot = state.as_dict()
+        with self._lock:
+            previous = self.last
+            if snapshot is previous or previous is None:
+                return None
+            self.last = snapshot
+            changes = {k: v for k, v in snapshot.items() if k not in previous or previous[k] != v}
+            if not changes:
+                return None
+            self.seq += 1
+            return {"seq": self.seq, "changes": changes}
+
+
+_stream = _StateStream()
+
+
+def _push_state() -> None:
+    if _stream.last is None:
+        # nobody connected so far: establish the baseline
+        socketio.emit("state_update", _stream.full())
+        return
+    delta = _stream.delta()
+    if delta is not None:
+        socketio.emit("state_delta", delta)
+
+
 def _broadcast_state() -> None:
-    """Send the current system state to all connected clients periodically."""
+    """Push state changes to all connected clients as they are published."""
+    last_push = 0.0
     while not _stop_event.is_set():
-        socketio.emit("state_update", state.as_dict())
-        socketio.sleep(1)
+        changes = state.changes
+        changes.wait(_HEARTBEAT_S)
+        if not changes.urgent and push_max_hz > 0:
+            remaining = last_push + 1.0 / push_max_hz - time.monotonic()
+            if remaining > 0:
+                changes.wait(remaining, urgent_only=True)
+        changes.clear()
+        _push_state()
+        last_push = time.monotonic()
 
 
 @socketio.on("connect")
 def handle_connect() -> None:
     """Send initial state when a client connects."""
     logger.info("Client verbunden")
-    emit("state_update", state.as_dict())
+    emit("state_update", _stream.full())
+    if history is not None:
+        emit("history", history.latest(history_initial_points))
+
+
+@socketio.on("request_state_resync")
+def handle_request_state_resync() -> None:
+    """Send a full snapshot to a client that missed a delta."""
+    logger.debug("State-Resync angefordert")
+    emit("state_update", _stream.full())
 
 
 # Simple state update handlers
@@ -90,7 +205,8 @@ register_state_handler("set_smoothing_enabled", "smoothing_enabled", bool)
 def handle_set_smoothing_alpha(data: Dict[str, Any]) -> None:
     value = float(data.get("value", state.smoothing_alpha))
     value = max(0.01, min(1.0, value))
-    state.smoothing_alpha = value
+    if not _update_state(smoothing_alpha=value):
+        return
     save_config(state)
     logger.info("smoothing_alpha geaendert auf %s", value)
 
@@ -98,11 +214,16 @@ def handle_set_smoothing_alpha(data: Dict[str, Any]) -> None:
 @socketio.on("set_wiper_min")
 def handle_set_wiper_min(data: Dict[str, Any]) -> None:
     value = int(data.get("value", state.wiper_min))
-    state.wiper_min = value
+
+    def _command(s: SystemState) -> None:
+        s.wiper_min = value
+        if actuator is not None:
+            actuator.cfg.wiper_min = value
+            actuator.set_output(actuator.last_percent)
+
+    if not _run_command(_command):
+        return
     save_config(state)
-    if actuator is not None:
-        actuator.cfg.wiper_min = value
-        actuator.set_output(actuator.last_percent)
     logger.info("wiper_min geaendert auf %s", value)
 
 
@@ -115,9 +236,14 @@ def handle_set_thermocouple_type(data: Dict[str, Any]) -> None:
     if state.thermocouple_type == value:
         logger.debug("Thermoelement-Typ unveraendert: %s", value)
         return
-    state.thermocouple_type = value
-    if sensor_reader is not None:
-        sensor_reader.set_thermocouple_type(value)
+
+    def _command(s: SystemState) -> None:
+        s.thermocouple_type = value
+        if sensor_reader is not None:
+            sensor_reader.set_thermocouple_type(value)
+
+    if not _run_command(_command):
+        return
     save_config(state)
     logger.info("Thermoelement-Typ geaendert auf %s", value)
 
@@ -125,8 +251,7 @@ def handle_set_thermocouple_type(data: Dict[str, Any]) -> None:
 @socketio.on("set_mode")
 def handle_set_mode(data: Dict[str, Any]) -> None:
     mode = data.get("mode")
-    if mode in ("auto", "manual"):
-        state.mode = Mode(mode)
+    if mode in ("auto", "manual") and _update_state(mode=Mode(mode)):
         logger.info("Modus geaendert auf %s", mode)
 
 
@@ -136,11 +261,16 @@ def handle_set_pid_params(data: Dict[str, Any]) -> None:
     kp = float(data.get("kp", state.kp))
     ki = float(data.get("ki", state.ki))
     kd = float(data.get("kd", state.kd))
-    state.kp = kp
-    state.ki = ki
-    state.kd = kd
-    if pid_controller is not None:
-        pid_controller.pid.tunings = (kp, ki, kd)
+
+    def _command(s: SystemState) -> None:
+        s.kp = kp
+        s.ki = ki
+        s.kd = kd
+        if pid_controller is not None:
+            pid_controller.pid.tunings = (kp, ki, kd)
+
+    if not _run_command(_command):
+        return
     save_config(state)
     logger.info(
         "PID-Parameter geaendert: kp=%s ki=%s kd=%s",
@@ -153,7 +283,58 @@ def handle_set_pid_params(data: Dict[str, Any]) -> None:
 @socketio.on("request_logs")
 def handle_request_logs() -> None:
     """Send the current log buffer to the requesting client."""
-    emit("logs_update", list(log_buffer))
+    # copy in C first; the listener thread extends the deque concurrently
+    entries = list(log_buffer)
+    emit("logs_update", [entry.as_dict() for entry in entries])
+
+
+@socketio.on("request_loop_stats")
+def handle_request_loop_stats() -> None:
+    """Send control loop timing statistics to the requesting client."""
+    if control_loop is None:
+        emit("loop_stats", {})
+        return
+    emit("loop_stats", control_loop.timing_stats())
+
+
+@socketio.on("request_zones")
+def handle_request_zones() -> None:
+    """Send the state of all additional zones to the requesting client."""
+    emit("zones_update", zone_engine.snapshot() if zone_engine is not None else [])
+
+
+def _history_result(params: Dict[str, Any]) -> tuple[Dict[str, Any], int]:
+    if history is None:
+        return {"error": "Kein Verlauf verfuegbar"}, 503
+    try:
+        query = parse_query(params)
+    except (TypeError, ValueError) as exc:
+        return {"error": str(exc)}, 400
+    return query_history(history, rollup=rollup, **query), 200
+
+
+@socketio.on("request_history")
+def handle_request_history(data: Dict[str, Any] | None = None) -> None:
+    """Send a downsampled history range to the requesting client."""
+    result, _status = _history_result(data or {})
+    emit("history_result", result)
+
+
+def _log_query_result(params: Dict[str, Any]) -> tuple[Dict[str, Any], int]:
+    if log_store is None:
+        return {"error": "Kein Log-Speicher verfuegbar"}, 503
+    try:
+        query = parse_log_query(params)
+    except (TypeError, ValueError) as exc:
+        return {"error": str(exc)}, 400
+    return log_store.query(**query), 200
+
+
+@socketio.on("request_log_query")
+def handle_request_log_query(data: Dict[str, Any] | None = None) -> None:
+    """Send one page of stored log entries matching the filters."""
+    result, _status = _log_query_result(data or {})
+    emit("log_query_result", result)
 
 
 @socketio.on("scan_i2c")
@@ -177,7 +358,7 @@ def handle_test_measure() -> None:
         emit("test_measure_result", {})
         return
     logger.info("Starte Testmessung")
-    data = sensor_reader.read_all()
+    data = sensor_reader.read_all(diagnostic=True)
     logger.info("Testmessung Ergebnis: %s", data)
     emit("test_measure_result", data)
 
@@ -206,6 +387,27 @@ def index() -> str:
     return render_template("index.html")
 
 
+@app.route("/api/history")
+def api_history():
+    """Return a downsampled history range, see :func:`history.parse_query`."""
+    result, status = _history_result(request.args.to_dict())
+    return jsonify(result), status
+
+
+@app.route("/api/logs")
+def api_logs():
+    """Return one page of stored log entries, see :func:`config.log_store.parse_log_query`."""
+    result, status = _log_query_result(request.args.to_dict())
+    return jsonify(result), status
+
+
+@app.route("/metrics")
+def metrics():
+    """Expose counters, gauges and loop histograms in Prometheus text format."""
+    text = render_metrics(state, control_loop, actuator, sensor_reader)
+    return Response(text, content_type=CONTENT_TYPE)
+
+
 def main() -> None:
     """Entry point for running the server."""
     logger.info("Starte Webserver")
@@ -37,8 +37,13 @@ const kpInput = document.getElementById('kpInput');
 const kiInput = document.getElementById('kiInput');
 const kdInput = document.getElementById('kdInput');
 const tempChartCtx = document.getElementById('tempChart').getContext('2d');
+const chartRangeSelect = document.getElementById('chartRangeSelect');
 const logContainer = document.getElementById('logContainer');
 const logWrapper = document.getElementById('logWrapper');
+const olderLogsBtn = document.getElementById('olderLogsBtn');
+// grows when older pages are loaded from the server-side log store
+let logRowLimit = 200;
+let logCursor = null;
 const scanBtn = document.getElementById('scanBtn');
 const testBtn = document.getElementById('testBtn');
 const smoothingToggle = document.getElementById('smoothingToggle');
@@ -48,7 +53,14 @@ const smoothingAlphaValue = document.getElementById('smoothingAlphaValue');
 let postrunRemaining = 0;
 let postrunTimer = null;
 
+// merged state from the last snapshot and all deltas since
+const currentState = {};
+let lastSeq = null;
+let resyncPending = false;
+
 const maxPoints = 200;
+const rangePoints = 400;
+let chartLive = true;
 const labels = [];
 const temp1Data = [];
 const temp2Data = [];
@@ -183,6 +195,71 @@ function updatePostrunCountdown(seconds) {
 }
 
 socket.on('state_update', data => {
+    Object.assign(currentState, data);
+    lastSeq = data.seq !== undefined ? data.seq : null;
+    resyncPending = false;
+    renderState(data);
+});
+
+function fillChart(data, limit, withDate) {
+    // replace the chart contents with server-side history columns
+    labels.length = 0;
+    temp1Data.length = 0;
+    temp2Data.length = 0;
+    outputData.length = 0;
+    const start = Math.max(0, data.t.length - limit);
+    for (let i = start; i < data.t.length; i++) {
+        const ts = new Date(data.t[i] * 1000);
+        labels.push(withDate ? ts.toLocaleString() : ts.toLocaleTimeString());
+        temp1Data.push(data.temperature1[i]);
+        temp2Data.push(data.temperature2[i]);
+        outputData.push(data.output_pct[i]);
+    }
+    tempChart.update();
+}
+
+socket.on('history', data => {
+    if (chartLive) {
+        fillChart(data, maxPoints, false);
+    }
+});
+
+socket.on('history_result', data => {
+    if (data.error) {
+        return;
+    }
+    fillChart(data.series, chartLive ? maxPoints : rangePoints, !chartLive);
+});
+
+if (chartRangeSelect) {
+    chartRangeSelect.addEventListener('change', () => {
+        const value = chartRangeSelect.value;
+        chartLive = value === 'live';
+        if (chartLive) {
+            socket.emit('request_history', { start: -maxPoints, points: maxPoints });
+            return;
+        }
+        socket.emit('request_history', { start: -Number(value), points: rangePoints });
+    });
+}
+
+socket.on('state_delta', msg => {
+    if (lastSeq !== null && msg.seq <= lastSeq) {
+        return;
+    }
+    if (lastSeq === null || msg.seq !== lastSeq + 1) {
+        if (!resyncPending) {
+            resyncPending = true;
+            socket.emit('request_state_resync');
+        }
+        return;
+    }
+    lastSeq = msg.seq;
+    Object.assign(currentState, msg.changes);
+    renderState(msg.changes);
+});
+
+function renderState(data) {
     if (data.temperature1 !== undefined) {
         if (data.temperature1 === null) {
             temp1El.textContent = '--';
@@ -273,11 +350,12 @@ socket.on('state_update', data => {
         updatePostrunCountdown(Math.max(0, Math.round(data.postrun_remaining)));
     }
     if (
-        data.temperature2 !== undefined &&
-        data.alarm_threshold !== undefined
+        (data.temperature2 !== undefined || data.alarm_threshold !== undefined) &&
+        currentState.temperature2 !== undefined &&
+        currentState.alarm_threshold !== undefined
     ) {
-        const t2 = parseFloat(data.temperature2);
-        const threshold = parseFloat(data.alarm_threshold);
+        const t2 = parseFloat(currentState.temperature2);
+        const threshold = parseFloat(currentState.alarm_threshold);
         const alarmAktiv = t2 > threshold;
         if (alarmIndicatorEl) {
             if (alarmAktiv) {
@@ -303,14 +381,15 @@ socket.on('state_update', data => {
     }
 
     if (
-        data.temperature1 !== undefined &&
-        data.temperature2 !== undefined &&
-        data.output_pct !== undefined
+        chartLive &&
+        currentState.temperature1 !== undefined &&
+        currentState.temperature2 !== undefined &&
+        currentState.output_pct !== undefined
     ) {
         labels.push(new Date().toLocaleTimeString());
-        temp1Data.push(data.temperature1 === null ? null : parseFloat(data.temperature1));
-        temp2Data.push(data.temperature2 === null ? null : parseFloat(data.temperature2));
-        outputData.push(parseFloat(data.output_pct));
+        temp1Data.push(currentState.temperature1 === null ? null : parseFloat(currentState.temperature1));
+        temp2Data.push(currentState.temperature2 === null ? null : parseFloat(currentState.temperature2));
+        outputData.push(parseFloat(currentState.output_pct));
         if (labels.length > maxPoints) {
             labels.shift();
             temp1Data.shift();
@@ -319,7 +398,7 @@ socket.on('state_update', data => {
         }
         tempChart.update();
     }
-});
+}
 
 setpointForm.addEventListener('submit', e => {
     e.preventDefault();
@@ -488,7 +567,7 @@ function addLogRow(entry, prepend = false) {
         logContainer.appendChild(tr);
     }
 
-    while (logContainer.children.length > 200) {
+    while (logContainer.children.length > logRowLimit) {
         logContainer.removeChild(logContainer.lastChild);
     }
 
@@ -505,8 +584,38 @@ socket.on('logs_update', logs => {
         .forEach(entry => addLogRow(entry));
 });
 
-socket.on('log_entry', entry => {
-    addLogRow(entry, true);
+socket.on('log_batch', batch => {
+    batch.entries.forEach(entry => addLogRow(entry, true));
+    if (batch.dropped) {
+        addLogRow({
+            time: new Date().toLocaleString(),
+            level: 'warning',
+            message: `${batch.dropped} Log-Eintraege nicht uebertragen`
+        }, true);
+    }
+});
+
+if (olderLogsBtn) {
+    olderLogsBtn.addEventListener('click', () => {
+        if (logCursor === null) {
+            // the first page from the store replaces the in-memory buffer
+            logContainer.innerHTML = '';
+            socket.emit('request_log_query', { limit: 100 });
+        } else {
+            socket.emit('request_log_query', { before: logCursor, limit: 100 });
+        }
+    });
+}
+
+socket.on('log_query_result', result => {
+    if (result.error) {
+        console.warn('log query', result.error);
+        return;
+    }
+    logRowLimit += result.entries.length;
+    result.entries.forEach(entry => addLogRow(entry));
+    logCursor = result.next;
+    if (olderLogsBtn) olderLogsBtn.disabled = result.next === null;
 });
 
 if (scanBtn) {
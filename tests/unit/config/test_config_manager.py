@@ -42,3 +42,10 @@ def test_mcp_block_migration(tmp_config):
     assert mcp["type"] == "K"
     assert mcp["retries"] == 3
     assert "backoff_ms" in mcp
+
+
+def test_save_calibration(tmp_config):
+    config_manager.save_calibration({"points": [[2, 0.0], [125, 1.0]], "lut": [2, 125], "lut_inverse": []})
+    cfg = config_manager.load_config()
+    assert cfg["ds3502"]["calibration"]["lut"] == [2, 125]
+    assert cfg["ds3502"]["wiper_min"] == 2
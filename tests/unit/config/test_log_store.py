@@ -0,0 +1,113 @@
+"""Tests for the persistent log store."""
+
+import pytest
+
+from config.log_store import LogStore, parse_log_query
+from config.logging_config import LogEntry
+
+
+def _entries(n, start=0):
+    for i in range(start, start + n):
+        extra = (("sensor_addr", "0x60" if i % 3 else "0x61"), ("status", "ok" if i % 5 else "i2c_error"))
+        level = "error" if i % 10 == 0 else "info"
+        yield LogEntry(1000.0 + i, level, "fan_control", f"m{i}", extra)
+
+
+def _messages(result):
+    return [e["message"] for e in result["entries"]]
+
+
+def test_pagination_returns_every_entry_newest_first(tmp_path):
+    store = LogStore(str(tmp_path), segment_bytes=2000)
+    assert store.append(_entries(100)) == 100
+    seen = []
+    cursor = None
+    while True:
+        page = store.query(before=cursor, limit=7)
+        seen += _messages(page)
+        cursor = page["next"]
+        if cursor is None:
+            break
+    assert seen == [f"m{i}" for i in range(99, -1, -1)]
+    store.close()
+
+
+def test_filters_level_and_time_use_indexes(tmp_path):
+    store = LogStore(str(tmp_path), segment_bytes=2000)
+    store.append(_entries(100))
+    assert _messages(store.query(level="error", limit=3)) == ["m90", "m80", "m70"]
+    result = store.query(filters={"sensor_addr": "0x61", "status": "i2c_error"}, limit=100)
+    assert _messages(result) == [f"m{i}" for i in range(90, -1, -15)]
+    assert result["entries"][0]["sensor_addr"] == "0x61"
+    assert _messages(store.query(start=1010.0, end=1012.0)) == ["m12", "m11", "m10"]
+    assert _messages(store.query(start=1010.0, end=1030.0, level="error")) == ["m30", "m20", "m10"]
+    assert store.query(filters={"actuator": "0x28"})["entries"] == []
+    store.close()
+
+
+def test_rotation_limits_segments_and_survives_restart(tmp_path):
+    store = LogStore(str(tmp_path), segment_bytes=2000, max_segments=3)
+    store.append(_entries(200))
+    store.close()
+    files = sorted(p.name for p in tmp_path.iterdir())
+    assert len(files) == 3
+    # a line cut off by a crash is ignored and overwritten
+    with open(tmp_path / files[-1], "ab") as fh:
+        fh.write(b'{"message": "halb')
+
+    reopened = LogStore(str(tmp_path), segment_bytes=2000, max_segments=3)
+    kept = len(reopened)
+    assert 0 < kept < 200
+    reopened.append(_entries(1, start=200))
+    assert _messages(reopened.query(limit=2)) == ["m200", "m199"]
+    assert len(reopened) == kept + 1
+    reopened.close()
+
+
+def test_ids_and_cursors_survive_trim_and_restart(tmp_path):
+    store = LogStore(str(tmp_path), segment_bytes=2000, max_segments=3)
+    store.append(_entries(200))
+    page = store.query(limit=5)
+    ids = {e["message"]: e["id"] for e in page["entries"]}
+    assert ids["m199"] == 199
+    store.close()
+
+    reopened = LogStore(str(tmp_path), segment_bytes=2000, max_segments=3)
+    assert reopened.query(before=page["next"], limit=1)["entries"][0]["message"] == "m194"
+    reopened.append(_entries(100, start=200))
+    assert reopened.query(limit=1)["entries"][0]["id"] == 299
+    reopened.close()
+
+
+def test_legacy_segment_names_are_loaded(tmp_path):
+    store = LogStore(str(tmp_path), segment_bytes=2000)
+    store.append(_entries(30))
+    store.close()
+    for path in tmp_path.iterdir():
+        seq = path.name.split("-")[1].split(".")[0]
+        path.rename(tmp_path / f"log-{seq}.jsonl")
+    reopened = LogStore(str(tmp_path), segment_bytes=2000)
+    assert [e["id"] for e in reopened.query(limit=2)["entries"]] == [29, 28]
+    reopened.close()
+
+
+def test_time_range_with_out_of_order_entries(tmp_path):
+    store = LogStore(str(tmp_path))
+    # a wall-clock step back between the second and third entry
+    times = [1000.0, 1005.0, 990.0, 1001.0, 1010.0]
+    store.append(LogEntry(t, "info", "fan_control", f"t{int(t)}") for t in times)
+    assert _messages(store.query(start=989.0, end=1002.0)) == ["t1001", "t990", "t1000"]
+    assert _messages(store.query(start=1004.0)) == ["t1010", "t1005"]
+    store.close()
+    reopened = LogStore(str(tmp_path))
+    assert _messages(reopened.query(end=995.0)) == ["t990"]
+    reopened.close()
+
+
+def test_parse_log_query_validation():
+    query = parse_log_query({"limit": "20", "level": "warning", "status": "ok", "before": "5", "start": ""})
+    assert query == {"limit": 20, "level": "warning", "filters": {"status": "ok"}, "before": 5}
+    with pytest.raises(ValueError):
+        parse_log_query({"limit": 0})
+    with pytest.raises(ValueError):
+        parse_log_query({"level": "loud"})
@@ -0,0 +1,113 @@
+"""Tests for the web log fan-out."""
+
+import logging
+import threading
+import time
+
+import pytest
+
+from config import logging_config
+import json
+
+from config.logging_config import JsonFormatter, LogEntry, LogListener, WebLogHandler, log_buffer
+
+
+@pytest.fixture
+def web_logger(monkeypatch):
+    """Return a logger with its own handler/listener and a batch recorder."""
+    batches = []
+    monkeypatch.setattr(logging_config, "_log_callback", lambda entries, dropped: batches.append((entries, dropped)))
+    handler = WebLogHandler(maxsize=10)
+    log = logging.getLogger("fan_control.test_web")
+    log.propagate = False
+    log.setLevel(logging.INFO)
+    log.addHandler(handler)
+    log_buffer.clear()
+    yield log, handler, LogListener(handler, interval=0.01, batch_max=5), batches
+    log.removeHandler(handler)
+
+
+def test_records_are_batched_by_listener(web_logger):
+    log, handler, listener, batches = web_logger
+    log.info("eins", extra={"wiper": 3})
+    log.warning("zwei")
+    # nothing is sent on the calling thread
+    assert batches == []
+    assert len(handler.queue) == 2
+    assert listener.flush() == 2
+    entries, dropped = batches[0]
+    assert [e["message"] for e in entries] == ["eins", "zwei"]
+    assert entries[0]["wiper"] == 3
+    assert dropped == 0
+    assert [e.as_dict() for e in log_buffer] == entries
+    assert all(isinstance(e, LogEntry) for e in log_buffer)
+    assert listener.flush() == 0
+    assert len(batches) == 1
+
+
+def test_message_is_formatted_when_logged(web_logger):
+    log, handler, listener, batches = web_logger
+    values = [1]
+    log.info("werte %s", values)
+    values.append(2)
+    listener.flush()
+    assert batches[0][0][0]["message"] == "werte [1]"
+
+
+def test_drop_counter_is_exact_under_threads(web_logger):
+    log, handler, _listener, _batches = web_logger
+
+    def spam():
+        for i in range(1000):
+            log.info("msg %d", i)
+
+    threads = [threading.Thread(target=spam) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert handler.dropped + len(handler.queue) == 4000
+
+
+def test_overload_drops_and_counts(web_logger):
+    log, handler, listener, batches = web_logger
+    for i in range(15):
+        log.info("msg %d", i)
+    assert handler.dropped == 5
+    listener.flush()
+    entries, dropped = batches[0]
+    # 10 queued, the newest 5 forwarded; 5 dropped in the queue + 5 skipped
+    assert [e["message"] for e in entries] == [f"msg {i}" for i in range(5, 10)]
+    assert dropped == 10
+    assert len(log_buffer) == 10
+    assert listener.dropped == 10
+
+
+def test_slow_callback_does_not_block_producer(web_logger, monkeypatch):
+    log, handler, listener, _ = web_logger
+    release = threading.Event()
+    monkeypatch.setattr(logging_config, "_log_callback", lambda entries, dropped: release.wait(2.0))
+    listener.start()
+    try:
+        log.info("erster")
+        time.sleep(0.05)
+        begin = time.perf_counter()
+        for i in range(100):
+            log.info("weiter %d", i)
+        assert time.perf_counter() - begin < 0.5
+    finally:
+        release.set()
+        listener.stop()
+    assert handler.dropped == 90
+
+
+def test_json_formatter_matches_entry():
+    record = logging.LogRecord("fan_control", logging.INFO, __file__, 1, "Wert %s", ("x",), None)
+    record.addr = "0x28"
+    record.created = 0.25
+    data = json.loads(JsonFormatter().format(record))
+    entry = LogEntry.from_record(record)
+    assert data == entry.as_dict()
+    assert data["message"] == "Wert x"
+    assert data["addr"] == "0x28"
+    assert data["time"].endswith(",250")
@@ -0,0 +1,140 @@
+"""Tests for the asyncio control loop and async sensor reads."""
+
+import asyncio
+import threading
+import time
+
+from controller.async_control_loop import AsyncControlLoop
+from controller.sensor_reader import SensorReader
+from models import SystemState
+from models.sensor_info import SensorInfo
+
+
+class SlowMCP:
+    delay = 0.05
+
+    def __init__(self, _i2c, *, address, tctype="K", tcfilter=0):
+        self.address = address
+
+    @property
+    def temperature(self):
+        time.sleep(self.delay)
+        return float(self.address)
+
+    @property
+    def ambient_temperature(self):
+        return 20.0
+
+
+def test_read_all_async_matches_sync():
+    reader = SensorReader(["0x66", "0x67"], i2c=object(), mcp_cls=SlowMCP)
+    data = asyncio.run(reader.read_all_async())
+    assert data["0x66"]["temperature"] == 102.0
+    assert data["0x67"]["delta"] == 103.0 - 20.0
+    assert data["0x67"]["status"] == "ok"
+
+
+def test_retry_backoff_does_not_block_other_sensors(monkeypatch):
+    class FlakyMCP:
+        def __init__(self, _i2c, *, address, tctype="K", tcfilter=0):
+            self.address = address
+            self.calls = 0
+
+        @property
+        def temperature(self):
+            self.calls += 1
+            if self.address == 0x66 and self.calls == 1:
+                raise OSError(121, "Remote IO")
+            return 25.0
+
+        @property
+        def ambient_temperature(self):
+            return 20.0
+
+    order = []
+    original = SensorReader._record_reading
+
+    def record(self, addr, *args, **kwargs):
+        order.append(addr)
+        return original(self, addr, *args, **kwargs)
+
+    monkeypatch.setattr(SensorReader, "_record_reading", record)
+    reader = SensorReader(
+        ["0x66", "0x67"], i2c=object(), mcp_cls=FlakyMCP, mcp_params={"retries": 2, "backoff_ms": 50}
+    )
+    data = asyncio.run(reader.read_all_async())
+    assert data["0x66"]["temperature"] == 25.0
+    assert order == ["0x67", "0x66"]
+
+
+def test_buses_are_read_concurrently(dummy_pid, dummy_actuator):
+    bus1 = SensorReader(["0x66"], i2c=object(), mcp_cls=SlowMCP)
+    bus2 = SensorReader(["0x67"], i2c=object(), mcp_cls=SlowMCP)
+    state = SystemState(alarm_threshold=500.0)
+    loop = AsyncControlLoop(
+        state,
+        bus1,
+        dummy_pid(),
+        dummy_actuator(),
+        [SensorInfo("0x66", "I2C"), SensorInfo("0x67", "I2C")],
+        extra_readers=[bus2],
+    )
+    start = time.perf_counter()
+    asyncio.run(loop.update_once_async())
+    elapsed = time.perf_counter() - start
+    loop.stop()
+    assert state.temperature1 == 102.0 and state.temperature2 == 103.0
+    assert elapsed < 2 * SlowMCP.delay
+
+
+def test_sync_reader_falls_back_to_executor(dummy_sensor_reader, dummy_pid, dummy_actuator):
+    reader = dummy_sensor_reader(
+        {"id1": {"temperature": 21.0, "status": "ok"}, "id2": {"temperature": 22.0, "status": "ok"}}
+    )
+    act = dummy_actuator()
+    loop = AsyncControlLoop(
+        SystemState(alarm_threshold=50.0), reader, dummy_pid(value=40.0), act, [SensorInfo("id1", "p1"), SensorInfo("id2", "p2")]
+    )
+    asyncio.run(loop.update_once_async())
+    loop.stop()
+    assert act.last_value == 60.0
+
+
+def test_set_output_runs_off_the_event_loop(dummy_sensor_reader, dummy_pid, dummy_actuator):
+    reader = dummy_sensor_reader(
+        {"id1": {"temperature": 21.0, "status": "ok"}, "id2": {"temperature": 22.0, "status": "ok"}}
+    )
+    act = dummy_actuator()
+    threads = []
+    original = act.set_output
+
+    def set_output(value):
+        threads.append(threading.current_thread())
+        original(value)
+
+    act.set_output = set_output
+    loop = AsyncControlLoop(
+        SystemState(alarm_threshold=50.0), reader, dummy_pid(value=40.0), act, [SensorInfo("id1", "p1"), SensorInfo("id2", "p2")]
+    )
+    asyncio.run(loop.update_once_async())
+    loop.stop()
+    assert threads and threads[0] is not threading.main_thread()
+    assert threads[0].name.startswith("i2c")
+
+
+def test_diagnostic_read_reuses_async_tick(dummy_pid, dummy_actuator):
+    reader = SensorReader(["0x66", "0x67"], i2c=object(), mcp_cls=SlowMCP)
+    loop = AsyncControlLoop(
+        SystemState(alarm_threshold=500.0),
+        reader,
+        dummy_pid(),
+        dummy_actuator(),
+        [SensorInfo("0x66", "I2C"), SensorInfo("0x67", "I2C")],
+    )
+    asyncio.run(loop.update_once_async())
+    loop.stop()
+    reads = reader.i2c_reads
+    data = reader.read_all(diagnostic=True)
+    assert data["0x66"]["temperature"] == 102.0
+    assert reader.i2c_reads == reads
+    assert reader.arbiter.coalesced == 1
@@ -0,0 +1,118 @@
+"""Tests for the I2C bus arbiter."""
+
+import threading
+import time
+
+import pytest
+
+from controller.bus_arbiter import BusArbiter, PRIORITY_CONTROL, PRIORITY_DIAGNOSTIC
+from controller.sensor_reader import SensorReader
+
+
+def test_fresh_result_is_shared():
+    clock = [0.0]
+    arbiter = BusArbiter(clock=lambda: clock[0])
+    calls = []
+
+    def op():
+        calls.append(1)
+        return len(calls)
+
+    assert arbiter.run(op, key="read") == 1
+    clock[0] = 0.1
+    assert arbiter.run(op, key="read", max_age_ms=200) == 1
+    clock[0] = 0.5
+    assert arbiter.run(op, key="read", max_age_ms=200) == 2
+    assert arbiter.coalesced == 1
+
+
+def test_concurrent_identical_reads_coalesce():
+    arbiter = BusArbiter()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(1)
+        return "data"
+
+    results = []
+    t1 = threading.Thread(target=lambda: results.append(arbiter.run(slow, key="k")))
+    t1.start()
+    started.wait(1)
+    t2 = threading.Thread(target=lambda: results.append(arbiter.run(slow, key="k")))
+    t2.start()
+    time.sleep(0.02)
+    release.set()
+    t1.join(1)
+    t2.join(1)
+    assert results == ["data", "data"]
+    assert calls == [1]
+
+
+def test_control_priority_wins_over_diagnostic():
+    arbiter = BusArbiter()
+    hold = threading.Event()
+    started = threading.Event()
+    order = []
+
+    def blocker():
+        started.set()
+        hold.wait(1)
+
+    threads = [threading.Thread(target=lambda: arbiter.run(blocker))]
+    threads[0].start()
+    started.wait(1)
+    threads.append(
+        threading.Thread(target=lambda: arbiter.run(lambda: order.append("diag"), priority=PRIORITY_DIAGNOSTIC))
+    )
+    threads[-1].start()
+    time.sleep(0.02)
+    threads.append(
+        threading.Thread(target=lambda: arbiter.run(lambda: order.append("ctrl"), priority=PRIORITY_CONTROL))
+    )
+    threads[-1].start()
+    time.sleep(0.02)
+    hold.set()
+    for t in threads:
+        t.join(1)
+    assert order == ["ctrl", "diag"]
+
+
+def test_errors_propagate_to_waiters():
+    arbiter = BusArbiter()
+
+    def boom():
+        raise OSError(121, "Remote I/O")
+
+    with pytest.raises(OSError):
+        arbiter.run(boom, key="k")
+    # the failed call is not cached
+    assert arbiter.run(lambda: 5, key="k", max_age_ms=1000) == 5
+
+
+def test_diagnostic_read_reuses_control_result():
+    reads = []
+
+    class CountingMCP:
+        def __init__(self, _i2c, *, address, tctype="K", tcfilter=0):
+            pass
+
+        @property
+        def temperature(self):
+            reads.append(1)
+            return 21.0
+
+        @property
+        def ambient_temperature(self):
+            return 20.0
+
+    reader = SensorReader(["0x66"], i2c=object(), mcp_cls=CountingMCP, mcp_params={"coalesce_ms": 1000})
+    control = reader.read_all()
+    diag = reader.read_all(diagnostic=True)
+    assert diag == control
+    assert len(reads) == 1
+    reader.read_all()
+    assert len(reads) == 2
@@ -0,0 +1,65 @@
+"""Tests for the DS3502 calibration tables."""
+
+import pytest
+
+from controller.calibration import build_lut, calibration_entry, lut_from_config, sweep, sweep_positions
+from controller.ds3502_output import DS3502Config, FanDS3502Controller
+
+
+def _quadratic_points():
+    # airflow grows with the square of the wiper position
+    return [(w, float((w - 2) ** 2)) for w in range(2, 126, 8)] + [(125, float(123 ** 2))]
+
+
+def test_lut_linearizes_nonlinear_response():
+    forward, inverse = build_lut(_quadratic_points())
+    assert len(forward) == 1001
+    assert len(inverse) == 128
+    assert forward[0] == 2
+    assert forward[-1] == 125
+    # half of the airflow needs ~71 % of the wiper travel
+    assert abs(forward[500] - (2 + 123 * 0.5 ** 0.5)) <= 2
+    assert forward == sorted(forward)
+
+
+def test_inverse_round_trip():
+    forward, inverse = build_lut(_quadratic_points())
+    for i in range(0, 1001, 50):
+        assert abs(inverse[forward[i]] - i / 10.0) < 2.0
+
+
+def test_falling_response_is_handled():
+    points = [(2, 100.0), (64, 40.0), (125, 0.0)]
+    forward, inverse = build_lut(points)
+    assert forward[0] == 125
+    assert forward[-1] == 2
+    assert inverse[125] == 0.0
+    assert inverse[2] == 100.0
+
+
+def test_invalid_points_rejected():
+    with pytest.raises(ValueError):
+        build_lut([(10, 1.0)])
+    with pytest.raises(ValueError):
+        build_lut([(10, 1.0), (20, 1.0)])
+
+
+def test_sweep_records_response():
+    written = []
+    waits = []
+    points = sweep(written.append, lambda w: w * 2.0, sweep_positions(2, 125, 4), settle_s=1.5, sleep=waits.append)
+    assert written == [2, 43, 84, 125]
+    assert points == [(2, 4.0), (43, 86.0), (84, 168.0), (125, 250.0)]
+    assert waits == [1.5] * 4
+
+
+def test_controller_uses_calibration():
+    entry = calibration_entry(_quadratic_points())
+    lut, inverse = lut_from_config({"points": entry["points"]})
+    ctrl = FanDS3502Controller(DS3502Config(lut=lut, lut_inverse=inverse))
+    assert ctrl._percent_to_wiper(50.0) == entry["lut"][500]
+    assert ctrl._percent_to_wiper(100.0) == 125
+    assert ctrl.status()["calibrated"] is True
+    assert abs(ctrl.wiper_to_percent(ctrl._percent_to_wiper(25.0)) - 25.0) < 2.0
+    ctrl.load_calibration(None)
+    assert ctrl._percent_to_wiper(50.0) == 64
@@ -0,0 +1,81 @@
+"""Tests for the circuit breaker and its use in SensorReader."""
+
+from controller.circuit_breaker import CircuitBreaker, CLOSED, HALF_OPEN, OPEN
+from controller.sensor_reader import SensorReader
+
+
+def test_breaker_opens_and_backs_off():
+    clock = [0.0]
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=1.0, max_reset_timeout=3.0, clock=lambda: clock[0])
+    breaker.record_failure()
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == OPEN and not breaker.allow_request()
+    assert not breaker.probe_due()
+
+    clock[0] = 1.0
+    assert breaker.probe_due()
+    breaker.begin_probe()
+    assert breaker.state == HALF_OPEN
+    breaker.record_failure()
+    assert breaker.state == OPEN and breaker.timeout == 2.0
+
+    clock[0] = 3.0
+    breaker.begin_probe()
+    breaker.record_failure()
+    assert breaker.timeout == 3.0
+
+    breaker.record_success()
+    assert breaker.state == CLOSED and breaker.timeout == 1.0
+
+
+def test_dead_sensor_skipped_and_recovered(monkeypatch):
+    present = {0x66}
+    reads = []
+
+    class HotplugMCP:
+        def __init__(self, _i2c, *, address, tctype="K", tcfilter=0):
+            if address not in present:
+                raise OSError(121, "No device")
+            self.address = address
+
+        @property
+        def temperature(self):
+            reads.append(self.address)
+            if self.address not in present:
+                raise OSError(121, "No device")
+            return 20.0
+
+        @property
+        def ambient_temperature(self):
+            return 18.0
+
+    sleeps = []
+    monkeypatch.setattr("time.sleep", lambda s: sleeps.append(s))
+    reader = SensorReader(
+        ["0x66", "0x67"],
+        i2c=object(),
+        mcp_cls=HotplugMCP,
+        mcp_params={"breaker_failures": 2, "breaker_reset_s": 0.0},
+    )
+    # sensor missing at startup: breaker open, never touched by read_all
+    assert reader.health()["0x67"]["breaker"] == OPEN
+    reader.read_all()
+    assert 0x67 not in reads
+
+    # sensor 0x66 fails twice -> skipped without retries or sleeps
+    present.discard(0x66)
+    reader.read_all()
+    reader.read_all()
+    assert reader.health()["0x66"]["breaker"] == OPEN
+    reads.clear()
+    sleeps.clear()
+    assert reader.read_all()["0x66"]["status"] == "not_found"
+    assert reads == [] and sleeps == []
+
+    # both sensors come back and are reinstated by the probe
+    present.update({0x66, 0x67})
+    assert sorted(reader.probe_failed_sensors()) == ["0x66", "0x67"]
+    data = reader.read_all()
+    assert data["0x66"]["temperature"] == 20.0
+    assert data["0x67"]["status"] == "ok"
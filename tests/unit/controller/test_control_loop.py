@@ -137,3 +137,113 @@ def test_run_loop_calls_update_once(loop_factory, monkeypatch):
     loop._running = True
     loop._run_loop()
     assert calls == [1]
+
+
+def test_run_loop_sleeps_until_deadline(loop_factory, monkeypatch):
+    loop = loop_factory()
+    sleeps = []
+
+    def fake_update():
+        loop._running = False
+
+    monkeypatch.setattr(loop, "update_once", fake_update)
+    monkeypatch.setattr(loop.scheduler, "end_tick", lambda: 0.25)
+    monkeypatch.setattr(control_loop, "time", types.SimpleNamespace(sleep=lambda s: sleeps.append(s)))
+    loop._running = True
+    loop._run_loop()
+    assert sleeps == [0.25]
+    assert loop.timing_stats()["ticks"] == 1
+
+
+def test_update_once_records_phase_timings(loop_factory):
+    sensor_data = {
+        "id1": {"temperature": 21.0, "status": "ok"},
+        "id2": {"temperature": 22.0, "status": "ok"},
+    }
+    loop = loop_factory(sensor_data=sensor_data, state=SystemState(alarm_threshold=50.0))
+    loop.update_once()
+    phases = loop.timing_stats()["phases"]
+    assert {"read", "smoothing", "alarm", "pid", "set_output", "total"} <= set(phases)
+    assert phases["total"]["count"] == 1
+
+
+def test_update_once_publishes_alarm_transition_as_urgent(loop_factory):
+    sensor_data = {
+        "id1": {"temperature": 21.0, "status": "ok"},
+        "id2": {"temperature": 60.0, "status": "ok"},
+    }
+    state = SystemState(alarm_threshold=50.0, smoothing_enabled=False)
+    loop = loop_factory(sensor_data=sensor_data, state=state)
+    loop.update_once()
+    assert state.changes.urgent
+    state.changes.clear()
+    loop.update_once()
+    assert state.changes.wait(0.0)
+    assert not state.changes.urgent
+
+
+def test_update_once_applies_commands_before_tick(loop_factory):
+    sensor_data = {
+        "id1": {"temperature": 21.0, "status": "ok"},
+        "id2": {"temperature": 22.0, "status": "ok"},
+    }
+    state = SystemState(mode=Mode.MANUAL)
+    loop = loop_factory(sensor_data=sensor_data, state=state)
+    state.set_tick_driven(True)
+    state.submit(lambda s: setattr(s, "manual_percent", 55.0))
+    loop.update_once()
+    assert state.as_dict()["output_pct"] == 55.0
+    assert state.as_dict()["temperature1"] == 21.0
+    state.set_tick_driven(False)
+
+
+def test_update_once_records_history(loop_factory, dummy_sensor_reader, dummy_pid, dummy_actuator):
+    from history import HistoryBuffer
+
+    sensor_data = {
+        "id1": {"temperature": 21.0, "status": "ok"},
+        "id2": {"temperature": 60.0, "status": "ok"},
+    }
+    history = HistoryBuffer(capacity=10)
+    loop = ControlLoop(
+        SystemState(alarm_threshold=50.0, smoothing_enabled=False),
+        dummy_sensor_reader(sensor_data),
+        dummy_pid(),
+        dummy_actuator(),
+        [SensorInfo("id1", "pin1"), SensorInfo("id2", "pin2")],
+        history=history,
+    )
+    loop.update_once()
+    data = history.latest(1)
+    assert data["temperature1"] == [21.0]
+    assert data["temperature2"] == [60.0]
+    assert data["alarm"] == [True]
+
+
+def test_history_records_gap_for_lost_sensor(loop_factory, dummy_sensor_reader, dummy_pid, dummy_actuator):
+    from history import HistoryBuffer
+
+    sensor_data = {
+        "id1": {"temperature": 21.0, "ambient": 20.0, "status": "ok"},
+        "id2": {"temperature": 30.0, "status": "ok"},
+    }
+    history = HistoryBuffer(capacity=10)
+    state = SystemState(alarm_threshold=50.0, smoothing_enabled=False)
+    loop = ControlLoop(
+        state,
+        dummy_sensor_reader(sensor_data),
+        dummy_pid(),
+        dummy_actuator(),
+        [SensorInfo("id1", "pin1"), SensorInfo("id2", "pin2")],
+        history=history,
+    )
+    loop.update_once()
+    sensor_data["id1"] = {"status": "not_found"}
+    loop.update_once()
+    # a thermally steady sensor is reported stale but its value is valid
+    sensor_data["id2"] = {"temperature": 30.0, "status": "stale"}
+    loop.update_once()
+    data = history.latest(3)
+    assert data["temperature1"] == [21.0, None, None]
+    assert data["ambient1"] == [20.0, None, None]
+    assert data["temperature2"] == [30.0, 30.0, 30.0]
@@ -1,6 +1,16 @@
 """Tests for DS3502 output mapping."""
 
-from controller.ds3502_output import FanDS3502Controller, DS3502Config
+import errno
+import threading
+import time
+
+from controller.ds3502_output import (
+    DS3502Bus,
+    DS3502Config,
+    FanDS3502Controller,
+    SigmaDelta,
+    build_ramp_schedule,
+)
 
 
 def test_percent_to_wiper_mapping():
@@ -22,3 +32,217 @@ def test_hex_address_conversion():
     cfg = DS3502Config(address="0x2A")
     ctrl = FanDS3502Controller(cfg)
     assert ctrl.cfg.address == 0x2A
+
+
+class FakeBus:
+    def __init__(self, delay: float = 0.0, fail: bool = False) -> None:
+        self.delay = delay
+        self.fail = fail
+        self.writes: list[tuple[int, int, int]] = []
+
+    def write_byte_data(self, addr: int, reg: int, value: int) -> None:
+        time.sleep(self.delay)
+        if self.fail:
+            raise OSError(errno.ENODEV, "gone")
+        self.writes.append((addr, reg, value))
+
+
+def _attach(ctrl: FanDS3502Controller, bus: FakeBus) -> FanDS3502Controller:
+    ctrl.bus = bus
+    ctrl.available = True
+    return ctrl
+
+
+def test_set_output_returns_before_slow_write():
+    bus = FakeBus(delay=0.05)
+    ctrl = _attach(FanDS3502Controller(DS3502Config(timeout_ms=0)), bus)
+    start = time.perf_counter()
+    ctrl.set_output(50.0)
+    assert time.perf_counter() - start < 0.02
+    assert ctrl.flush()
+    assert bus.writes == [(0x28, 0x00, 64)]
+    status = ctrl.status()
+    assert status["applied_wiper"] == 64
+    assert status["last_write_latency_ms"] >= 50.0
+    ctrl.stop()
+
+
+def test_latest_target_wins():
+    bus = FakeBus(delay=0.03)
+    ctrl = _attach(FanDS3502Controller(DS3502Config(timeout_ms=0)), bus)
+    ctrl.set_output(10.0)
+    time.sleep(0.01)  # first write in progress
+    for pct in (20.0, 30.0, 100.0):
+        ctrl.set_output(pct)
+    ctrl.flush()
+    assert [w[2] for w in bus.writes] == [14, 125]
+    ctrl.stop()
+
+
+def test_write_failures_reported():
+    bus = FakeBus(fail=True)
+    ctrl = _attach(FanDS3502Controller(DS3502Config(timeout_ms=0, safe_low_on_fault=False)), bus)
+    ctrl.set_output(40.0)
+    ctrl.flush()
+    assert ctrl.status()["write_failures"] == 1
+    assert ctrl.applied_wiper is None
+    ctrl.stop()
+
+
+def test_synchronous_mode_without_write_behind():
+    bus = FakeBus()
+    ctrl = _attach(FanDS3502Controller(DS3502Config(write_behind=False, timeout_ms=0)), bus)
+    ctrl.set_output(100.0)
+    assert bus.writes == [(0x28, 0x00, 125)]
+    assert ctrl._writer_state is None
+
+
+def test_ramp_schedule_keeps_only_wiper_changes():
+    ctrl = FanDS3502Controller()
+    steps = build_ramp_schedule(0.0, 10.0, 50.0, 0.02, ctrl._percent_to_wiper)
+    wipers = [ctrl._percent_to_wiper(pct) for _, pct in steps]
+    assert steps[-1] == (0.2, 10.0)
+    assert len(wipers) == len(set(wipers))
+    assert wipers == sorted(wipers)
+    offsets = [t for t, _ in steps]
+    assert offsets == sorted(offsets)
+
+
+def test_ramp_schedule_without_rate_limit_jumps():
+    ctrl = FanDS3502Controller()
+    assert build_ramp_schedule(20.0, 80.0, 0.0, 0.02, ctrl._percent_to_wiper) == [(0.0, 80.0)]
+
+
+def test_ramp_interpolates_between_targets():
+    bus = FakeBus()
+    cfg = DS3502Config(timeout_ms=0, write_behind=False, slew_rate_pct_per_s=100.0, ramp_hz=50.0)
+    ctrl = _attach(FanDS3502Controller(cfg), bus)
+    start = time.perf_counter()
+    ctrl.set_output(20.0)
+    assert time.perf_counter() - start < 0.01
+    deadline = time.monotonic() + 1.0
+    while ctrl.status()["applied_wiper"] != 27 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    wipers = [w[2] for w in bus.writes]
+    assert wipers[-1] == 27
+    assert len(wipers) > 3
+    assert wipers == sorted(wipers)
+    assert len(wipers) == len(set(wipers))
+    ctrl.stop()
+
+
+def test_sigma_delta_average_matches_fractional_code():
+    mod = SigmaDelta()
+    codes = [mod.step(40.3) for _ in range(100)]
+    assert set(codes) == {40, 41}
+    assert abs(sum(codes) / len(codes) - 40.3) < 0.01
+
+
+def _simulate_ripple(monkeypatch, dither: bool) -> tuple[float, float]:
+    """Drive the controller in a closed loop with a first-order thermal plant.
+
+    The shared bus's 10 Hz dither tick is called from the simulation
+    instead of from its timer thread. Returns the steady-state ripple and
+    the average wiper code seen by the fan.
+    """
+    monkeypatch.setattr(DS3502Bus, "_run_periodic", lambda self, group: None)
+    bus = FakeBus()
+    cfg = DS3502Config(
+        timeout_ms=0, write_behind=False, slew_rate_pct_per_s=0.0, dither=dither, dither_max_writes_per_s=10.0
+    )
+    ctrl = _attach(FanDS3502Controller(cfg), bus)
+    temp, out, setpoint = 60.0, 55.0, 50.0
+    dt, tau = 0.1, 8.0
+    prev_err = None
+    temps, codes = [], []
+    for k in range(6000):
+        if k % 5 == 0:  # controller at 2 Hz, dither at 10 Hz
+            err = temp - setpoint
+            out += 0.2 * err + (0.0 if prev_err is None else 1.6 * (err - prev_err))
+            out = max(0.0, min(100.0, out))
+            prev_err = err
+            ctrl.set_output(out)
+        if dither:
+            ctrl.shared.tick(10.0, k * dt)
+        code = bus.writes[-1][2]
+        # more airflow (higher code) lowers the equilibrium temperature
+        temp += dt / tau * (80.0 - 0.37 * code - temp)
+        temps.append(temp)
+        codes.append(code)
+    ctrl.stop()
+    tail = temps[len(temps) // 2 :]
+    tail_codes = codes[len(codes) // 2 :]
+    return max(tail) - min(tail), sum(tail_codes) / len(tail_codes)
+
+
+def test_dithering_reduces_steady_state_ripple(monkeypatch):
+    ripple, mean_code = _simulate_ripple(monkeypatch, True)
+    plain_ripple, _ = _simulate_ripple(monkeypatch, False)
+    assert ripple < plain_ripple / 2
+    # the fan sees the fractional code that holds the setpoint (80 - 0.37 c = 50)
+    assert abs(mean_code - 30.0 / 0.37) < 0.05
+
+
+def test_dither_alternates_codes_with_bounded_rate():
+    bus = FakeBus()
+    cfg = DS3502Config(timeout_ms=0, write_behind=False, dither=True, dither_max_writes_per_s=50.0)
+    ctrl = _attach(FanDS3502Controller(cfg), bus)
+    assert abs(ctrl._percent_to_wiper_exact(50.2) - (2 + 0.502 * 123)) < 1e-9
+    bus.writes.clear()
+    ctrl.set_output(50.2)
+    time.sleep(0.3)
+    ctrl.stop()
+    codes = [w[2] for w in bus.writes[:-1]]
+    assert set(codes) == {63, 64}
+    assert len(codes) <= 0.3 * 50 + 2
+
+
+def test_write_counters_for_skips_retries_and_failsafe(monkeypatch):
+    monkeypatch.setattr(time, "sleep", lambda s: None)
+
+    class FlakyBus(FakeBus):
+        def __init__(self, errors):
+            super().__init__()
+            self.errors = list(errors)
+
+        def write_byte_data(self, addr, reg, value):
+            if self.errors:
+                raise OSError(self.errors.pop(0), "nack")
+            super().write_byte_data(addr, reg, value)
+
+    bus = FlakyBus([errno.EREMOTEIO])
+    ctrl = _attach(FanDS3502Controller(DS3502Config(timeout_ms=0, safe_low_on_fault=True)), bus)
+    assert ctrl._write_wiper(50.0, False, 0)
+    assert ctrl._write_wiper(50.0, False, 0)
+    assert ctrl.write_retries == {errno.EREMOTEIO: 1}
+    assert ctrl.skipped_writes == 1
+
+    bus.errors = [errno.ENODEV]
+    assert not ctrl._write_wiper(80.0, False, 0)
+    assert ctrl.failsafe_writes == 1
+    assert bus.writes[-1][2] == ctrl._percent_to_wiper(0.0)
+    assert ctrl.status()["skipped_writes"] == 1
+
+
+def test_actuators_share_bus_threads():
+    bus = FakeBus()
+    shared = DS3502Bus(timeout_ms=50, bus=bus)
+    before = threading.active_count()
+    ctrls = [
+        _attach(FanDS3502Controller(DS3502Config(address=0x28 + i, timeout_ms=50, dither=i == 0), shared), bus)
+        for i in range(4)
+    ]
+    assert all(c.bus is bus and c.deadline is shared.deadline for c in ctrls)
+    for i, ctrl in enumerate(ctrls):
+        ctrl.set_output(10.0 * (i + 1))
+    for ctrl in ctrls[1:]:
+        assert ctrl.flush()
+    # one writer, one dither rate and one deadline worker for all actuators
+    assert threading.active_count() - before == 3
+    written = {addr: value for addr, _reg, value in bus.writes}
+    assert written[0x29] == ctrls[1]._percent_to_wiper(20.0)
+    assert written[0x2B] == ctrls[3]._percent_to_wiper(40.0)
+    for ctrl in ctrls:
+        ctrl.stop()
+    time.sleep(0.05)
+    assert threading.active_count() - before <= 1
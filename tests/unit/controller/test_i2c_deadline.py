@@ -0,0 +1,127 @@
+"""Tests for deadline-bounded I2C transactions."""
+
+import errno
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from controller.i2c_deadline import DeadlineRunner, I2CTimeoutError
+from controller.sensor_reader import SensorReader
+
+PROJECT_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "..", "fan_control_project")
+
+
+def test_call_returns_result():
+    runner = DeadlineRunner(0.5)
+    assert runner.call(lambda a, b=0: a + b, 1, b=2) == 3
+    with pytest.raises(ValueError):
+        runner.call(lambda: (_ for _ in ()).throw(ValueError("x")))
+
+
+def test_hung_call_is_abandoned_and_recovered_after_it_returns():
+    release = threading.Event()
+    recoveries = []
+    runner = DeadlineRunner(0.05, recovery=lambda: recoveries.append(1))
+
+    start = time.perf_counter()
+    with pytest.raises(I2CTimeoutError) as info:
+        runner.call(release.wait, 5)
+    assert time.perf_counter() - start < 1.0
+    assert info.value.errno == errno.ETIMEDOUT
+    assert runner.timeouts == 1
+    assert runner.stats()["pending_hung"] == 1
+
+    # bus considered wedged and left alone while the transaction is pending
+    called = []
+    with pytest.raises(I2CTimeoutError):
+        runner.call(called.append, 1)
+    assert called == [] and recoveries == []
+
+    release.set()
+    for _ in range(100):
+        if runner.stats()["pending_hung"] == 0:
+            break
+        time.sleep(0.01)
+    assert recoveries == [1]
+    assert runner.call(lambda: 42) == 42
+
+
+def test_calls_share_one_daemon_worker():
+    runner = DeadlineRunner(0.5)
+    first = runner.call(threading.current_thread)
+    assert runner.call(threading.current_thread) is first
+    assert first.daemon and first is not threading.current_thread()
+
+
+def test_hung_call_does_not_block_interpreter_exit():
+    code = (
+        "import threading\n"
+        "from controller.i2c_deadline import DeadlineRunner, I2CTimeoutError\n"
+        "runner = DeadlineRunner(0.05)\n"
+        "try:\n"
+        "    runner.call(threading.Event().wait)\n"
+        "except I2CTimeoutError:\n"
+        "    print('timeout')\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=PROJECT_DIR,
+        capture_output=True,
+        text=True,
+        timeout=10,
+    )
+    assert result.returncode == 0
+    assert "timeout" in result.stdout
+
+
+def test_zero_timeout_calls_directly():
+    runner = DeadlineRunner(0)
+    assert runner.call(threading.current_thread) is threading.current_thread()
+
+
+def test_sensor_reader_leaves_wedged_bus_alone_until_it_returns():
+    release = threading.Event()
+    hang = [True]
+
+    class HangingMCP:
+        def __init__(self, _i2c, *, address, tctype="K", tcfilter=0):
+            self.address = address
+
+        @property
+        def temperature(self):
+            if self.address == 0x66 and hang[0]:
+                hang[0] = False
+                release.wait(5)
+            return 30.0
+
+        @property
+        def ambient_temperature(self):
+            return 20.0
+
+    reader = SensorReader(
+        ["0x66", "0x67"],
+        i2c=object(),
+        mcp_cls=HangingMCP,
+        mcp_params={"timeout_ms": 50, "retries": 0, "data_ready_polling": False},
+    )
+    start = time.perf_counter()
+    data = reader.read_all()
+    elapsed = time.perf_counter() - start
+    assert elapsed < 1.0
+    assert data["0x66"]["status"] == "not_found"
+    # the second sensor shares the wedged bus and is not touched
+    assert data["0x67"]["status"] == "not_found"
+    assert reader.deadline.timeouts == 1
+
+    release.set()
+    for _ in range(100):
+        if reader.deadline.stats()["pending_hung"] == 0:
+            break
+        time.sleep(0.01)
+    data = reader.read_all()
+    assert data["0x66"]["temperature"] == 30.0
+    assert data["0x67"]["temperature"] == 30.0
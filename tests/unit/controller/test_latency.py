@@ -0,0 +1,57 @@
+"""Tests for latency histograms."""
+
+import pytest
+
+from controller.latency import LatencyHistogram, PhaseTimings
+
+
+def test_histogram_percentiles():
+    hist = LatencyHistogram()
+    for _ in range(90):
+        hist.observe(0.0008)
+    for _ in range(10):
+        hist.observe(0.02)
+    assert hist.count == 100
+    assert hist.percentile(50) == pytest.approx(0.001)
+    assert hist.percentile(95) == pytest.approx(0.02)
+    assert hist.max == pytest.approx(0.02)
+    summary = hist.summary()
+    assert summary["p99_ms"] == pytest.approx(20.0)
+    assert summary["mean_ms"] == pytest.approx(2.72)
+
+
+def test_histogram_overflow_bucket_uses_max():
+    hist = LatencyHistogram(bounds=(0.1,))
+    hist.observe(3.0)
+    assert hist.percentile(50) == 3.0
+    hist.reset()
+    assert hist.count == 0 and hist.percentile(99) == 0.0
+
+
+def test_phase_timings_summary():
+    timings = PhaseTimings()
+    timings.observe("read", 0.004)
+    timings.observe("pid", 0.00001)
+    summary = timings.summary()
+    assert set(summary) == {"read", "pid"}
+    assert summary["read"]["count"] == 1
+
+
+def test_summary_while_phases_are_added():
+    import threading
+
+    timings = PhaseTimings()
+    done = threading.Event()
+
+    def add_phases():
+        for i in range(5000):
+            timings.observe(f"phase{i}", 0.001)
+        done.set()
+
+    thread = threading.Thread(target=add_phases)
+    thread.start()
+    while not done.is_set():
+        timings.summary()
+        timings.items()
+    thread.join()
+    assert len(timings.summary()) == 5000
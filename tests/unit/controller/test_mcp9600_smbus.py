@@ -0,0 +1,159 @@
+"""Tests for the smbus2 MCP9600 driver against a fake bus."""
+
+import errno
+
+import pytest
+
+from controller import mcp9600_smbus
+from controller.mcp9600_smbus import MCP9600
+from controller.sensor_reader import SensorReader
+
+
+def _encode(celsius: float) -> list[int]:
+    raw = int(round(celsius / 0.0625)) & 0xFFFF
+    return [raw >> 8, raw & 0xFF]
+
+
+class FakeBus:
+    """Simulate MCP9600 register access for ``i2c_rdwr`` and byte I/O."""
+
+    def __init__(self, devices: dict[int, dict[int, list[int]]]) -> None:
+        self.devices = devices
+        self.rdwr_calls = 0
+
+    def _regs(self, addr: int) -> dict[int, list[int]]:
+        if addr not in self.devices:
+            raise OSError(121, "Remote I/O error")
+        return self.devices[addr]
+
+    def read_byte(self, addr: int) -> int:
+        self._regs(addr)
+        return 0
+
+    def read_byte_data(self, addr: int, reg: int) -> int:
+        return self._regs(addr).get(reg, [0])[0]
+
+    def write_byte_data(self, addr: int, reg: int, value: int) -> None:
+        self._regs(addr)[reg] = [value]
+
+    def i2c_rdwr(self, *msgs) -> None:
+        self.rdwr_calls += 1
+        reads = [i for i, msg in enumerate(msgs) if msg.flags & mcp9600_smbus.I2C_M_RD]
+        # i2c-bcm2835: at most one read message per transfer, and it must be last
+        if len(reads) > 1 or (reads and reads[0] != len(msgs) - 1):
+            raise OSError(errno.EOPNOTSUPP, "Operation not supported")
+        pointer = 0
+        for msg in msgs:
+            regs = self._regs(msg.addr)
+            if msg.flags & mcp9600_smbus.I2C_M_RD:
+                data = regs.get(pointer, [0] * msg.len)
+                for i in range(msg.len):
+                    msg.buf[i] = bytes([data[i]])
+            else:
+                data = list(msg)
+                pointer = data[0]
+                if len(data) > 1:
+                    regs[pointer] = data[1:]
+
+
+def make_device(hot: float, cold: float, status: int = 0x40) -> dict[int, list[int]]:
+    return {
+        0x00: _encode(hot),
+        0x01: _encode(hot - cold),
+        0x02: _encode(cold),
+        0x04: [status],
+        0x05: [0],
+        0x06: [0],
+        0x20: [0x40],
+    }
+
+
+def test_read_registers_one_read_per_transfer():
+    bus = FakeBus({0x66: make_device(123.5, 21.25)})
+    sensor = MCP9600(bus, address=0x66, tctype="S", tcfilter=3)
+    hot, delta, cold, status = sensor.read_registers()
+    assert bus.rdwr_calls == 4
+    assert hot == 123.5 and cold == 21.25 and delta == pytest.approx(102.25)
+    assert status == 0x40
+    # type S (4) in bits 6..4, filter 3
+    assert bus.devices[0x66][0x05] == [0x43]
+
+
+def test_negative_temperatures_and_properties():
+    bus = FakeBus({0x67: make_device(-12.5, -3.0)})
+    sensor = MCP9600(bus, address=0x67)
+    assert sensor.temperature == -12.5
+    assert sensor.ambient_temperature == -3.0
+    assert sensor.delta_temperature == -9.5
+
+
+def test_wrong_device_id_rejected():
+    device = make_device(20.0, 20.0)
+    device[0x20] = [0x41]
+    with pytest.raises(OSError):
+        MCP9600(FakeBus({0x66: device}), address=0x66)
+
+
+def test_fake_bus_rejects_combined_reads():
+    bus = FakeBus({0x66: make_device(20.0, 20.0)})
+    sensor = MCP9600(bus, address=0x66)
+    with pytest.raises(OSError) as info:
+        bus.i2c_rdwr(sensor._hot.write, sensor._hot.read, sensor._cold.write, sensor._cold.read)
+    assert info.value.errno == errno.EOPNOTSUPP
+
+
+def test_sensor_reader_smbus2_backend(caplog):
+    bus = FakeBus({0x66: make_device(30.0, 22.0)})
+    reader = SensorReader(["0x66", "0x67"], i2c=bus, mcp_params={"backend": "smbus2"})
+    assert "data_rate=8 wird vom smbus2-Backend nicht unterstuetzt" in caplog.text
+    data = reader.read_all()
+    assert data["0x66"]["temperature"] == 30.0
+    assert data["0x66"]["delta"] == 8.0
+    assert data["0x67"]["status"] == "not_found"
+    assert reader.scan_bus() == ["0x66"]
+
+
+def test_read_if_ready_polls_status_only_without_new_conversion():
+    bus = FakeBus({0x66: make_device(40.0, 20.0, status=0x00)})
+    sensor = MCP9600(bus, address=0x66)
+    assert sensor.read_if_ready() is None
+    assert bus.rdwr_calls == 1
+
+    bus.devices[0x66][0x04] = [0x41]
+    hot, _delta, cold, status = sensor.read_if_ready()
+    assert (hot, cold, status) == (40.0, 20.0, 0x41)
+    # update flag cleared, alert bit kept
+    assert bus.devices[0x66][0x04] == [0x01]
+    # status, clear and three temperature registers
+    assert bus.rdwr_calls == 6
+
+
+def test_data_ready_replaces_stale_heuristic(monkeypatch):
+    bus = FakeBus({0x66: make_device(25.0, 20.0)})
+    reader = SensorReader(
+        ["0x66"],
+        i2c=bus,
+        mcp_params={
+            "backend": "smbus2",
+            "data_ready_polling": True,
+            "stale_threshold_count": 2,
+            "stale_timeout_s": 1.0,
+        },
+    )
+    clock = [100.0]
+    monkeypatch.setattr("controller.sensor_reader.time.monotonic", lambda: clock[0])
+    # no conversion yet: no value and a distinct status
+    bus.devices[0x66][0x04] = [0x00]
+    entry = reader.read_all()["0x66"]
+    assert entry["status"] == "pending" and entry["temperature"] is None
+    for _ in range(3):
+        bus.devices[0x66][0x04] = [0x40]
+        assert reader.read_all()["0x66"]["status"] == "ok"
+
+    # no new conversion: value and status kept, age grows until timeout
+    clock[0] += 0.5
+    entry = reader.read_all()["0x66"]
+    assert entry["temperature"] == 25.0 and entry["status"] == "ok"
+    assert entry["age"] == 0.5
+    clock[0] += 1.0
+    assert reader.read_all()["0x66"]["status"] == "stale"
@@ -10,3 +10,10 @@ def test_pid_compute_and_setpoint():
     pid.update_setpoint(30.0)
     # Now error is 10 -> output 20
     assert pid.compute(20.0) == 20.0
+
+
+def test_pid_without_sample_time_computes_every_call():
+    pid = PIDController(setpoint=25.0, kp=2.0, ki=0.0, kd=0.0, sample_time=None)
+    assert pid.compute(20.0) == 10.0
+    # called again right away, e.g. a scheduler tick with slight jitter
+    assert pid.compute(22.0) == 6.0
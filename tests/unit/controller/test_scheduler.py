@@ -0,0 +1,60 @@
+"""Tests for the fixed-rate scheduler."""
+
+import pytest
+
+from controller.scheduler import FixedRateScheduler
+
+
+class FakeClock:
+    def __init__(self, now: float = 100.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_deadlines_do_not_drift():
+    clock = FakeClock()
+    sched = FixedRateScheduler(0.5, clock=clock)
+    sched.start()
+    for _ in range(4):
+        sched.begin_tick()
+        clock.now += 0.1  # work time
+        delay = sched.end_tick()
+        assert delay == pytest.approx(0.4)
+        clock.now += delay
+    assert clock.now == pytest.approx(102.0)
+    stats = sched.stats()
+    assert stats["ticks"] == 4
+    assert stats["overruns"] == 0
+    assert stats["period_p50_ms"] == pytest.approx(500.0)
+
+
+def test_overrun_skips_missed_ticks():
+    clock = FakeClock()
+    sched = FixedRateScheduler(0.5, clock=clock)
+    sched.start()
+    sched.begin_tick()
+    clock.now += 1.2
+    delay = sched.end_tick()
+    # deadline snaps to the next grid point at +1.5 s
+    assert delay == pytest.approx(0.3)
+    assert sched.overruns == 1
+    assert sched.skipped == 2
+
+
+def test_overrun_catches_up_without_skipping():
+    clock = FakeClock()
+    sched = FixedRateScheduler(0.5, skip_missed=False, clock=clock)
+    sched.start()
+    sched.begin_tick()
+    clock.now += 0.7
+    assert sched.end_tick() == 0.0
+    sched.begin_tick()
+    assert sched.stats()["jitter_max_ms"] == pytest.approx(200.0)
+    assert sched.skipped == 0
+
+
+def test_invalid_interval():
+    with pytest.raises(ValueError):
+        FixedRateScheduler(0)
@@ -0,0 +1,130 @@
+"""Tests for the multi-zone control engine."""
+
+import pytest
+
+from controller.zone_engine import ZoneConfig, ZoneEngine
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def engine_factory(dummy_sensor_reader, dummy_actuator):
+    def _create(zones, data):
+        reader = dummy_sensor_reader(data)
+        acts = [dummy_actuator() for _ in zones]
+        clock = FakeClock()
+        return ZoneEngine(zones, reader, acts, clock=clock), clock
+
+    return _create
+
+
+def test_zones_updated_in_one_tick(engine_factory):
+    zones = [
+        ZoneConfig("A", "a1", "a2", setpoint=30.0, alarm_threshold=80.0, kp=2.0, ki=0.0),
+        ZoneConfig("B", "b1", "b2", setpoint=30.0, alarm_threshold=80.0, kp=1.0, ki=0.0),
+    ]
+    data = {
+        "a1": {"temperature": 20.0, "status": "ok"},
+        "a2": {"temperature": 25.0, "status": "ok"},
+        "b1": {"temperature": 25.0, "status": "ok"},
+        "b2": {"temperature": 25.0, "status": "ok"},
+    }
+    engine, _ = engine_factory(zones, data)
+    engine.update_once()
+    # error 10 * kp 2 -> 20 -> inverted output 80
+    assert engine.actuators[0].last_value == pytest.approx(80.0)
+    assert engine.actuators[1].last_value == pytest.approx(95.0)
+    snap = engine.snapshot()
+    assert snap[0]["temperature1"] == 20.0 and snap[1]["status2"] == "ok"
+
+
+def test_alarm_and_postrun(engine_factory):
+    zones = [ZoneConfig("A", "a1", "a2", alarm_threshold=50.0, alarm_percent=90.0, postrun_seconds=10.0)]
+    data = {"a1": {"temperature": 20.0, "status": "ok"}, "a2": {"temperature": 60.0, "status": "ok"}}
+    engine, clock = engine_factory(zones, data)
+    engine.update_once()
+    assert engine.actuators[0].last_value == 90.0
+    assert engine.snapshot()[0]["alarm_active"] is True
+
+    data["a2"]["temperature"] = 40.0
+    clock.now = 1.0
+    engine.update_once()
+    assert engine.actuators[0].last_value == 90.0
+    assert engine.snapshot()[0]["postrun_remaining"] == 10
+
+    clock.now = 12.0
+    engine.update_once()
+    assert engine.actuators[0].last_value != 90.0
+
+
+def test_missing_sensor_holds_output_and_manual_mode(engine_factory):
+    zones = [
+        ZoneConfig("A", "a1", "a2", alarm_threshold=80.0),
+        ZoneConfig("B", "b1", "b2", manual=True, manual_percent=40.0),
+    ]
+    engine, _ = engine_factory(zones, {})
+    engine.update_once()
+    assert engine.actuators[0].last_value == 0.0
+    assert engine.actuators[1].last_value == 40.0
+    assert engine.snapshot()[0]["temperature1"] is None
+
+
+def test_lost_sensor_clears_temperature_and_freezes_pid(engine_factory):
+    zones = [ZoneConfig("A", "a1", "a2", setpoint=30.0, alarm_threshold=50.0, kp=1.0, ki=1.0)]
+    data = {"a1": {"temperature": 25.0, "status": "ok"}, "a2": {"temperature": 60.0, "status": "ok"}}
+    engine, clock = engine_factory(zones, data)
+    engine.update_once()
+    assert engine.snapshot()[0]["alarm_active"] is True
+
+    # both sensors vanish: no stale temperatures, alarm released
+    data.clear()
+    clock.now = 1.0
+    engine.update_once()
+    snap = engine.snapshot()[0]
+    assert snap["temperature1"] is None and snap["temperature2"] is None
+    assert snap["status1"] == "error" and snap["alarm_active"] is False
+
+    # once the post-run ends the output is held and the integral frozen
+    clock.now = 40.0
+    engine.update_once()
+    held = engine.actuators[0].last_value
+    integral = engine.integral[0]
+    for step in range(3):
+        clock.now = 41.0 + step
+        engine.update_once()
+    assert engine.actuators[0].last_value == held
+    assert engine.integral[0] == integral
+
+    data["a1"] = {"temperature": 99.0, "status": "not_found"}
+    engine.update_once()
+    assert engine.snapshot()[0]["temperature1"] is None
+
+    data["a1"] = {"temperature": 20.0, "status": "ok"}
+    engine.update_once()
+    assert engine.snapshot()[0]["temperature1"] == 20.0
+
+
+def test_stale_alarm_sensor_keeps_alarm(engine_factory):
+    zones = [ZoneConfig("A", "a1", "a2", setpoint=30.0, alarm_threshold=50.0, alarm_percent=90.0)]
+    data = {"a1": {"temperature": 25.0, "status": "ok"}, "a2": {"temperature": 60.0, "status": "ok"}}
+    engine, clock = engine_factory(zones, data)
+    engine.update_once()
+    # a hot but steady sensor is reported stale; its value is still valid
+    data["a2"]["status"] = "stale"
+    clock.now = 1.0
+    engine.update_once()
+    snap = engine.snapshot()[0]
+    assert snap["alarm_active"] is True and snap["postrun_remaining"] == 0
+    assert snap["temperature2"] == 60.0
+    assert engine.actuators[0].last_value == 90.0
+
+
+def test_actuator_count_must_match(dummy_sensor_reader):
+    with pytest.raises(ValueError):
+        ZoneEngine([ZoneConfig("A", "a1", "a2")], dummy_sensor_reader({}), [])
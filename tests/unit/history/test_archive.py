@@ -0,0 +1,132 @@
+"""Tests for the compressed sample archive."""
+
+import json
+import logging
+import random
+import struct
+
+import pytest
+
+from history import FIELDS, HistoryBuffer, SampleArchive
+from history.ring_buffer import FLAG_ALARM
+
+
+def _f32(v: float) -> float:
+    return struct.unpack("<f", struct.pack("<f", v))[0]
+
+
+def _samples(n: int, seed: int = 1) -> list:
+    rng = random.Random(seed)
+    t = 1_700_000_000.0
+    temps = [60.0, 62.0, 22.0, 22.5]
+    out = 40.0
+    samples = []
+    for i in range(n):
+        t += 0.5 + rng.choice((0.0, 0.0, 0.001, -0.001))
+        temps = [x + rng.gauss(0, 0.03) for x in temps]
+        q = [round(x / 0.0625) * 0.0625 for x in temps]
+        out = min(100.0, max(0.0, out + rng.gauss(0, 0.2)))
+        values = (q[0], q[1], q[2], q[3], q[0] - q[2], q[1] - q[3], round(out, 2), 60.0)
+        samples.append((round(t, 3), values, FLAG_ALARM if 100 <= i < 120 else 0))
+    return samples
+
+
+def test_roundtrip_across_blocks(tmp_path):
+    path = str(tmp_path / "a.fca")
+    archive = SampleArchive(path, block_size=512)
+    samples = _samples(2000)
+    for t, values, flags in samples:
+        archive.append(t, values, flags)
+    assert len(archive) > 1
+    # the open block is readable before it is written
+    decoded = list(archive.iter_samples())
+    archive.close()
+    assert decoded == list(SampleArchive(path, readonly=True).iter_samples())
+    assert len(decoded) == len(samples)
+    for (t, values, flags), (dt, dvalues, dflags) in zip(samples, decoded):
+        assert dt == pytest.approx(t, abs=1e-6)
+        assert dvalues == tuple(_f32(v) for v in values)
+        assert dflags == flags
+
+
+def test_compresses_ten_times_better_than_json_lines(tmp_path):
+    path = tmp_path / "a.fca"
+    archive = SampleArchive(str(path))
+    json_size = 0
+    for t, values, flags in _samples(5000):
+        archive.append(t, values, flags)
+        record = {"t": t, **dict(zip(FIELDS, values)), "alarm": bool(flags), "postrun": False}
+        json_size += len(json.dumps(record)) + 1
+    archive.close()
+    assert json_size / path.stat().st_size >= 10
+
+
+def test_seek_by_time_and_rebuilt_index(tmp_path):
+    path = str(tmp_path / "a.fca")
+    archive = SampleArchive(path, block_size=512)
+    samples = _samples(1000)
+    for t, values, flags in samples:
+        archive.append(t, values, flags)
+    archive.close()
+    (tmp_path / "a.fca.idx").unlink()
+
+    reopened = SampleArchive(path, block_size=512)
+    start, end = samples[500][0], samples[509][0]
+    assert [s[0] for s in reopened.iter_samples(start, end)] == pytest.approx([s[0] for s in samples[500:510]])
+    assert (tmp_path / "a.fca.idx").stat().st_size == len(reopened) * 16
+    reopened.close()
+
+
+def test_process_resumes_after_last_written_block(tmp_path):
+    raw = HistoryBuffer(capacity=5000)
+    samples = _samples(3000)
+    for t, values, flags in samples[:1500]:
+        raw.append(t, values, alarm=bool(flags))
+    path = str(tmp_path / "a.fca")
+    archive = SampleArchive(path, block_size=512)
+    assert archive.process(raw) == 1500
+    written = len(archive)
+    # simulate a crash: the open block is lost
+    archive._file.close()
+
+    for t, values, flags in samples[1500:]:
+        raw.append(t, values, alarm=bool(flags))
+    resumed = SampleArchive(path, block_size=512)
+    assert len(resumed) == written
+    resumed.process(raw)
+    times = [s[0] for s in resumed.iter_samples()]
+    assert times == pytest.approx([s[0] for s in samples])
+    resumed.close()
+
+
+def test_readonly_rejects_append(tmp_path):
+    path = str(tmp_path / "a.fca")
+    SampleArchive(path).close()
+    with pytest.raises(RuntimeError):
+        SampleArchive(path, readonly=True).append(1.0, (0.0,) * len(FIELDS))
+
+
+def test_older_samples_counted_and_logged(tmp_path, caplog):
+    caplog.set_level(logging.INFO)
+    archive = SampleArchive(str(tmp_path / "a.fca"))
+    values = (20.0,) * len(FIELDS)
+    assert archive.append(100.0, values)
+    assert not archive.append(50.0, values)
+    assert not archive.append(100.0, values)
+    assert archive.dropped == 2
+    assert caplog.text.count("verworfen") == 1
+    assert archive.append(101.0, values)
+    assert "bisher 2 Samples verworfen" in caplog.text
+    assert [s[0] for s in archive.iter_samples()] == [100.0, 101.0]
+    archive.close()
+
+
+def test_close_archives_remaining_samples(tmp_path):
+    raw = HistoryBuffer(capacity=100)
+    path = str(tmp_path / "a.fca")
+    archive = SampleArchive(path)
+    archive.start(raw, interval=60.0)
+    for t, values, flags in _samples(10):
+        raw.append(t, values, alarm=bool(flags))
+    archive.close()
+    assert len(list(SampleArchive(path, readonly=True).iter_samples())) == 10
@@ -0,0 +1,100 @@
+"""Tests for history downsampling and range queries."""
+
+import math
+
+import pytest
+
+from history import FIELDS, HistoryBuffer, parse_query, query_history
+from history.downsample import downsample, lttb_indices, minmax_indices
+
+
+def test_lttb_keeps_endpoints_and_spike():
+    t = [float(i) for i in range(1000)]
+    y = [math.sin(i / 50.0) for i in range(1000)]
+    y[500] = 10.0
+    idx = lttb_indices(t, y, 50)
+    assert len(idx) == 50
+    assert idx[0] == 0 and idx[-1] == 999
+    assert 500 in idx
+    assert idx == sorted(idx)
+
+
+def test_gaps_are_kept_and_skipped_by_selection():
+    t = [float(i) for i in range(1000)]
+    y = [math.sin(i / 50.0) for i in range(1000)]
+    for i in range(300, 400):
+        y[i] = None
+    for method in ("lttb", "minmax"):
+        out = downsample({"t": t, "v": y}, ["v"], 50, method)
+        assert 300.0 in out["t"]
+        assert out["v"][out["t"].index(300.0)] is None
+        assert sum(v is None for v in out["v"]) == 1
+
+
+def test_minmax_preserves_extremes():
+    y = [0.0] * 100
+    y[13] = -5.0
+    y[77] = 7.0
+    idx = minmax_indices(y, 10)
+    assert 13 in idx and 77 in idx
+    assert len(idx) <= 10
+
+
+def test_downsample_shares_time_column():
+    cols = {"t": [float(i) for i in range(100)], "a": [float(i % 7) for i in range(100)], "b": [0.0] * 100}
+    out = downsample(cols, ["a", "b"], 20, "minmax")
+    assert set(out) == {"t", "a", "b"}
+    assert len(out["t"]) == len(out["a"]) == len(out["b"]) <= 20
+    small = downsample(cols, ["a"], 500)
+    assert small["a"] == cols["a"]
+
+
+def test_point_limit_holds_for_several_fields():
+    n = 20000
+    cols = {
+        "t": [float(i) for i in range(n)],
+        "a": [math.sin(i / 37.0) for i in range(n)],
+        "b": [math.cos(i / 91.0) + (i % 13) * 0.01 for i in range(n)],
+        "c": [None if 5000 <= i < 5100 else float(i % 101) for i in range(n)],
+    }
+    cols["a"][12345] = 9.0
+    cols["b"][777] = -9.0
+    for method in ("lttb", "minmax"):
+        out = downsample(cols, ["a", "b", "c"], 500, method)
+        assert len(out["t"]) <= 500
+        # each series still keeps its own peak
+        assert 12345.0 in out["t"] and 777.0 in out["t"]
+
+
+def test_query_history_range_and_limit():
+    history = HistoryBuffer(capacity=2000)
+    for i in range(2000):
+        history.append(1000.0 + i, tuple(float(i) for _ in FIELDS))
+    result = query_history(history, 1500.0, 2499.0, points=100, fields=["temperature1"])
+    assert result["source_points"] == 1000
+    series = result["series"]
+    assert series["t"][0] == 1500.0 and series["t"][-1] == 2499.0
+    assert len(series["t"]) == 100
+    assert set(series) == {"t", "temperature1"}
+
+
+def test_parse_query_relative_start_and_validation():
+    q = parse_query({"start": "-3600", "points": "300", "fields": "temperature1,alarm"}, now=10000.0)
+    assert q == {
+        "start": 6400.0,
+        "end": 10000.0,
+        "points": 300,
+        "method": "lttb",
+        "fields": ["temperature1", "alarm"],
+    }
+    with pytest.raises(ValueError):
+        parse_query({"method": "avg"})
+    with pytest.raises(ValueError):
+        parse_query({"fields": "bogus"})
+    with pytest.raises(ValueError):
+        parse_query({"points": 1})
+    for bad in ("nan", "inf", "-inf"):
+        with pytest.raises(ValueError):
+            parse_query({"start": bad})
+        with pytest.raises(ValueError):
+            parse_query({"end": bad})
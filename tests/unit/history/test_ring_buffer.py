@@ -0,0 +1,99 @@
+"""Tests for the history ring buffer."""
+
+from history import FIELDS, HistoryBuffer
+
+
+def _values(i: float) -> tuple:
+    return tuple(float(i + k) for k in range(len(FIELDS)))
+
+
+def test_append_and_latest_in_order():
+    buf = HistoryBuffer(capacity=5)
+    for i in range(3):
+        buf.append(100.0 + i, _values(i), alarm=i == 2)
+    data = buf.latest(10)
+    assert data["t"] == [100.0, 101.0, 102.0]
+    assert data["temperature1"] == [0.0, 1.0, 2.0]
+    assert data["setpoint"] == [7.0, 8.0, 9.0]
+    assert data["alarm"] == [False, False, True]
+    assert data["postrun"] == [False] * 3
+
+
+def test_wraps_around_keeping_newest():
+    buf = HistoryBuffer(capacity=4)
+    for i in range(10):
+        buf.append(float(i), _values(i))
+    assert len(buf) == 4
+    assert buf.latest(4)["t"] == [6.0, 7.0, 8.0, 9.0]
+    assert buf.latest(2)["t"] == [8.0, 9.0]
+    assert buf.since(7.0)["t"] == [8.0, 9.0]
+    assert buf.since(0.0)["t"] == [6.0, 7.0, 8.0, 9.0]
+    assert buf.between(7.0, 8.0)["t"] == [7.0, 8.0]
+
+
+def test_persists_across_reopen(tmp_path):
+    path = str(tmp_path / "hist.bin")
+    buf = HistoryBuffer(capacity=8, path=path)
+    for i in range(11):
+        buf.append(float(i), _values(i), postrun=True)
+    buf.close()
+
+    reopened = HistoryBuffer(capacity=8, path=path)
+    data = reopened.latest(8)
+    assert data["t"] == [float(i) for i in range(3, 11)]
+    assert all(data["postrun"])
+    reopened.append(11.0, _values(11))
+    assert reopened.latest(1)["t"] == [11.0]
+    reopened.close()
+
+
+def test_capacity_change_reinitializes(tmp_path):
+    path = str(tmp_path / "hist.bin")
+    buf = HistoryBuffer(capacity=8, path=path)
+    buf.append(1.0, _values(1))
+    buf.close()
+    other = HistoryBuffer(capacity=16, path=path)
+    assert len(other) == 0
+    other.close()
+
+
+def test_backward_clock_step_is_rejected(tmp_path):
+    path = str(tmp_path / "hist.bin")
+    buf = HistoryBuffer(capacity=8, path=path)
+    for t in (1000.0, 1001.0, 1002.0):
+        assert buf.append(t, _values(0))
+    # wall clock stepped back: dropped until it passes the last stored time
+    assert not buf.append(500.0, _values(0))
+    assert not buf.append(1002.0, _values(0))
+    assert buf.rejected == 2
+    assert buf.since(1000.5)["t"] == [1001.0, 1002.0]
+    buf.close()
+
+    reopened = HistoryBuffer(capacity=8, path=path)
+    assert not reopened.append(501.0, _values(0))
+    assert reopened.append(1003.0, _values(0))
+    assert reopened.between(0.0, 2000.0)["t"] == [1000.0, 1001.0, 1002.0, 1003.0]
+    reopened.close()
+
+
+def test_nan_values_become_none():
+    buf = HistoryBuffer(capacity=4)
+    values = list(_values(0))
+    values[0] = float("nan")
+    buf.append(1.0, tuple(values))
+    data = buf.latest(1)
+    assert data["temperature1"] == [None]
+    assert data["temperature2"] == [1.0]
+
+
+def test_between_unpacks_only_requested_fields():
+    buf = HistoryBuffer(capacity=10)
+    buf.append(1.0, tuple(float(i) for i in range(len(FIELDS))), alarm=True)
+    buf.append(2.0, (float("nan"),) * len(FIELDS))
+    data = buf.between(0.0, 5.0, ["delta2", "temperature1"])
+    assert set(data) == {"t", "temperature1", "delta2", "alarm", "postrun"}
+    assert data["temperature1"] == [0.0, None]
+    assert data["delta2"] == [5.0, None]
+    assert data["alarm"] == [True, False]
+    full = buf.between(0.0, 5.0)
+    assert all(data[k] == full[k] for k in data)
@@ -0,0 +1,170 @@
+"""Tests for the tiered history rollups."""
+
+import pytest
+
+from history import FIELDS, HistoryBuffer, RollupEngine, RollupTier, build_tiers, query_history
+
+OUT = FIELDS.index("output_pct")
+
+
+def _values(temp: float, output: float = 50.0) -> tuple:
+    values = [temp] * len(FIELDS)
+    values[OUT] = output
+    return tuple(values)
+
+
+def _tiers(tmp_path=None):
+    base = str(tmp_path / "hist.bin") if tmp_path else None
+    return build_tiers(
+        [
+            {"name": "1s", "width": 1, "retention": 100},
+            {"name": "10s", "width": 10, "retention": 100},
+            {"name": "100s", "width": 100, "retention": 10},
+        ],
+        base,
+    )
+
+
+def test_aggregates_min_max_mean_last_and_fractions():
+    raw = HistoryBuffer(capacity=100)
+    engine = RollupEngine(raw, _tiers())
+    # four samples per second, alarm in one of them
+    for i, temp in enumerate((10.0, 30.0, 20.0, 40.0, 50.0)):
+        raw.append(100.0 + i * 0.25, _values(temp, 40.0), alarm=i == 1)
+    assert engine.process() == 5
+    data = engine.tiers[0].between(0, 1000)
+    assert data["t"] == [100.0]
+    assert data["temperature1_min"] == [10.0]
+    assert data["temperature1_max"] == [40.0]
+    assert data["temperature1"] == [25.0]
+    assert data["temperature1_last"] == [40.0]
+    assert data["alarm"] == [0.25]
+    assert data["count"] == [4]
+    # 40 % for 0.75 s within the first bucket
+    assert data["output_integral"] == [30.0]
+
+
+def test_missing_values_are_left_out_of_aggregates():
+    raw = HistoryBuffer(capacity=100)
+    engine = RollupEngine(raw, _tiers())
+    nan = float("nan")
+    for i, temp in enumerate((10.0, nan, 30.0, nan, nan, nan, nan)):
+        raw.append(100.0 + i * 0.5, _values(temp))
+    # the sample at 103.0 opens a fourth bucket and closes the third
+    engine.process()
+    data = engine.tiers[0].between(0, 1000)
+    assert data["temperature1_min"] == [10.0, 30.0, None]
+    assert data["temperature1"] == [10.0, 30.0, None]
+    assert data["temperature1_last"] == [None, None, None]
+    assert data["count"] == [2, 2, 2]
+
+
+def test_closed_buckets_cascade_to_coarser_tiers():
+    raw = HistoryBuffer(capacity=1000)
+    engine = RollupEngine(raw, _tiers())
+    for i in range(25):
+        raw.append(float(i), _values(float(i)))
+        engine.process()
+    ten = engine.tiers[1].between(0, 100)
+    assert ten["t"] == [0.0, 10.0]
+    assert ten["temperature1_min"] == [0.0, 10.0]
+    assert ten["temperature1_max"] == [9.0, 19.0]
+    assert ten["temperature1"] == [4.5, 14.5]
+    assert ten["count"] == [10, 10]
+    assert len(engine.tiers[2]) == 0
+
+
+def test_resume_does_not_double_count(tmp_path):
+    raw = HistoryBuffer(capacity=1000, path=str(tmp_path / "hist.bin"))
+    tiers = _tiers(tmp_path)
+    engine = RollupEngine(raw, tiers)
+    for i in range(15):
+        raw.append(float(i), _values(1.0))
+    engine.process()
+    engine.stop()
+    for tier in tiers:
+        tier.close()
+
+    tiers = _tiers(tmp_path)
+    engine = RollupEngine(raw, tiers)
+    for i in range(15, 30):
+        raw.append(float(i), _values(1.0))
+    engine.process()
+    assert tiers[0].between(0, 100)["count"] == [1] * 29
+    assert tiers[1].between(0, 100)["count"] == [10, 10]
+    for tier in tiers:
+        tier.close()
+    raw.close()
+
+
+def test_retention_limits_each_tier():
+    raw = HistoryBuffer(capacity=1000)
+    tiers = [RollupTier("1s", 1, 5), RollupTier("5s", 5, 100)]
+    engine = RollupEngine(raw, tiers)
+    for i in range(20):
+        raw.append(float(i), _values(float(i)))
+    engine.process()
+    assert tiers[0].between(0, 100)["t"] == [14.0, 15.0, 16.0, 17.0, 18.0]
+    assert tiers[1].between(0, 100)["t"] == [0.0, 5.0, 10.0]
+
+
+def test_rejects_incompatible_widths():
+    with pytest.raises(ValueError):
+        RollupEngine(HistoryBuffer(capacity=10), [RollupTier("a", 10, 5), RollupTier("b", 15, 5)])
+
+
+def test_query_picks_coarsest_sufficient_tier():
+    raw = HistoryBuffer(capacity=100)
+    engine = RollupEngine(raw, _tiers())
+    for i in range(1000):
+        engine.add(float(i), _values(float(i)), 0)
+    raw.append(999.0, _values(999.0))
+
+    assert engine.pick_tier(0, 1000, 100).name == "10s"
+    assert engine.pick_tier(0, 1000, 5).name == "100s"
+    # the raw buffer only reaches back to t=999
+    assert engine.pick_tier(998.5, 999.5, 500) is None
+
+    result = query_history(raw, 0, 1000, points=100, fields=["temperature1"], rollup=engine)
+    assert result["tier"] == "10s"
+    assert result["source_points"] == 99
+    assert result["series"]["temperature1_min"][0] == 0.0
+    assert result["series"]["temperature1_max"][0] == 9.0
+    assert query_history(raw, 0, 1000, points=100)["tier"] == "raw"
+
+
+def test_query_prefers_coarser_tier_over_raw_for_old_ranges():
+    raw = HistoryBuffer(capacity=100)
+    tiers = [RollupTier("1s", 1, 100), RollupTier("10s", 10, 100), RollupTier("100s", 100, 100)]
+    engine = RollupEngine(raw, tiers)
+    for i in range(3000):
+        engine.add(float(i), _values(float(i)), 0)
+    raw.append(2999.5, _values(0.0))
+    # 10s only reaches back to about t=1990, the coarser 100s tier to t=0
+    assert engine.pick_tier(500, 2900, 150).name == "100s"
+    assert engine.pick_tier(2000, 2900, 50).name == "10s"
+
+
+def test_empty_tiers_fall_back_to_raw():
+    raw = HistoryBuffer(capacity=100)
+    engine = RollupEngine(raw, _tiers())
+    raw.append(0.0, _values(1.0))
+    assert engine.pick_tier(0, 1000, 10) is None
+
+
+def test_backward_clock_step_does_not_stall_rollup():
+    raw = HistoryBuffer(capacity=100)
+    engine = RollupEngine(raw, _tiers())
+    for t in range(1000, 1011):
+        raw.append(float(t), _values(1.0))
+    engine.process()
+    # clock stepped back: the ring rejects the samples instead of storing
+    # them behind the rollup cursor
+    assert not raw.append(500.0, _values(1.0))
+    assert not raw.append(501.0, _values(1.0))
+    assert engine.process() == 0
+    raw.append(1011.0, _values(1.0))
+    raw.append(1012.0, _values(1.0))
+    assert engine.process() == 2
+    engine.stop()
+    assert engine.tiers[0].between(0, 2000)["t"] == [float(t) for t in range(1000, 1012)]
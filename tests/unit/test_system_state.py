@@ -21,3 +21,62 @@ def test_mode_conversion_and_negative_remaining():
     state.postrun_until = datetime.now() - timedelta(seconds=5)
     data = state.as_dict()
     assert data["postrun_remaining"] == 0
+
+
+def test_version_bumps_only_on_change():
+    state = SystemState()
+    version = state.version
+    state.setpoint = 0.0
+    assert state.version == version
+    state.setpoint = 42.0
+    assert state.version == version + 1
+    state.swap_sensors = 0
+    assert state.version == version + 2
+    assert not hasattr(state, "__dict__")
+
+
+def test_as_dict_cached_per_version():
+    state = SystemState()
+    first = state.as_dict()
+    assert state.as_dict() is first
+    state.temperature1 = 21.5
+    second = state.as_dict()
+    assert second is not first
+    assert second["temperature1"] == 21.5
+    assert "postrun_until" not in second
+    assert second["mode"] == "auto"
+
+
+def test_commands_deferred_while_tick_driven():
+    state = SystemState()
+    state.commit()
+    state.set_tick_driven(True)
+    done = state.submit(lambda s: setattr(s, "setpoint", 40.0))
+    assert state.setpoint == 0.0 and not done.done()
+    assert state.apply_commands() == 1
+    assert state.setpoint == 40.0 and done.done()
+    state.set_tick_driven(False)
+
+
+def test_readers_see_last_committed_snapshot():
+    state = SystemState()
+    state.set_tick_driven(True)
+    state.temperature1 = 20.0
+    state.status1 = "ok"
+    committed = state.commit()
+    # mid-tick mutation is invisible until the next commit
+    state.temperature1 = 25.0
+    state.status1 = "error"
+    assert state.as_dict() is committed
+    assert state.as_dict()["status1"] == "ok"
+    state.commit()
+    assert state.as_dict()["temperature1"] == 25.0
+    state.set_tick_driven(False)
+    state.temperature1 = 30.0
+    assert state.as_dict()["temperature1"] == 30.0
+
+
+def test_submit_applies_immediately_without_loop():
+    state = SystemState()
+    state.submit(lambda s: setattr(s, "kp", 2.0)).result(timeout=0)
+    assert state.kp == 2.0
@@ -0,0 +1,81 @@
+"""Tests for the Prometheus metrics endpoint."""
+
+import threading
+
+from controller.control_loop import ControlLoop
+from controller.ds3502_output import DS3502Config, FanDS3502Controller
+from controller.latency import ErrorCounts, LatencyHistogram
+from models import SystemState
+from models.sensor_info import SensorInfo
+from web import server
+from web.metrics import Exposition, render_metrics
+
+
+def test_histogram_is_cumulative():
+    hist = LatencyHistogram(bounds=(0.001, 0.01))
+    for value in (0.0005, 0.005, 0.005, 0.5):
+        hist.observe(value)
+    exp = Exposition(prefix="x_")
+    exp.histogram("dur_seconds", "Durations.", hist, {"phase": "pid"})
+    lines = exp.render().splitlines()
+    assert lines[:2] == ["# HELP x_dur_seconds Durations.", "# TYPE x_dur_seconds histogram"]
+    assert 'x_dur_seconds_bucket{phase="pid",le="0.001"} 1' in lines
+    assert 'x_dur_seconds_bucket{phase="pid",le="0.01"} 3' in lines
+    assert 'x_dur_seconds_bucket{phase="pid",le="+Inf"} 4' in lines
+    assert 'x_dur_seconds_count{phase="pid"} 4' in lines
+
+
+def test_render_metrics_from_components(dummy_sensor_reader, dummy_pid):
+    state = SystemState(alarm_threshold=50.0, smoothing_enabled=False)
+    reader = dummy_sensor_reader(
+        {"id1": {"temperature": 21.0, "status": "ok"}, "id2": {"temperature": 60.0, "status": "ok"}}
+    )
+    actuator = FanDS3502Controller(DS3502Config(timeout_ms=0))
+    loop = ControlLoop(state, reader, dummy_pid(), actuator, [SensorInfo("id1", "p1"), SensorInfo("id2", "p2")])
+    loop.update_once()
+
+    text = render_metrics(state, loop, actuator, reader)
+    lines = text.splitlines()
+    assert "fan_control_alarm_transitions_total 1" in lines
+    assert "fan_control_alarm_active 1" in lines
+    assert 'fan_control_temperature_celsius{channel="temperature2"} 60.0' in lines
+    assert "fan_control_output_percent 100.0" in lines
+    assert "fan_control_wiper_write_failures_total 0" in lines
+    assert any(line.startswith('fan_control_phase_duration_seconds_count{component="loop",phase="total"}') for line in lines)
+    assert text.count("# TYPE fan_control_phase_duration_seconds histogram") == 1
+    # the dummy reader has no I2C counters; those families are left out
+    assert "fan_control_i2c_reads_total" not in text
+
+
+def test_scrape_while_threads_count(dummy_sensor_reader):
+    state = SystemState()
+    reader = dummy_sensor_reader({})
+    reader.read_retries = ErrorCounts()
+    reader.read_errors = ErrorCounts()
+    hist = LatencyHistogram()
+    done = threading.Event()
+
+    def count():
+        for code in range(3000):
+            reader.read_errors.add(code)
+            hist.observe(0.001)
+        done.set()
+
+    thread = threading.Thread(target=count)
+    thread.start()
+    while not done.is_set():
+        render_metrics(state, sensor_reader=reader)
+        counts, total, _peak = hist.snapshot()
+        assert abs(total - sum(counts) * 0.001) < 1e-6
+    thread.join()
+    assert render_metrics(state, sensor_reader=reader).count("fan_control_i2c_read_errors_total{") == 3000
+
+
+def test_metrics_route(app_client, monkeypatch):
+    monkeypatch.setattr(server, "state", SystemState(output_pct=42.0))
+    resp = app_client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.content_type.startswith("text/plain; version=0.0.4")
+    body = resp.get_data(as_text=True)
+    assert "fan_control_output_percent 42.0" in body
+    assert "# TYPE fan_control_log_dropped_total counter" in body
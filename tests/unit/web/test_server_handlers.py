@@ -1,8 +1,11 @@
 """Tests for web server handlers and routes."""
 
+import threading
+import time
+
 from web import server
 from models.system_state import Mode
-from config.logging_config import log_buffer
+from config.logging_config import LogEntry, log_buffer
 
 
 def test_set_setpoint_updates_state(socketio_client, state, no_save_config):
@@ -55,12 +58,70 @@ def test_set_wiper_min_handler(socketio_client, state, no_save_config):
     server.actuator = None
 
 
+def test_wiper_min_applied_on_control_thread(state, no_save_config):
+    calls = []
+
+    class DummyActuator:
+        def __init__(self):
+            self.cfg = type("Cfg", (), {"wiper_min": 0})()
+            self.last_percent = 40.0
+
+        def set_output(self, pct: float) -> None:
+            calls.append((threading.current_thread(), self.cfg.wiper_min))
+
+    server.actuator = DummyActuator()
+    state.set_tick_driven(True)
+    handler = threading.Thread(target=server.handle_set_wiper_min, args=({"value": 7},))
+    handler.start()
+    deadline = time.monotonic() + 1.0
+    while not state.apply_commands() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    handler.join()
+    state.set_tick_driven(False)
+    server.actuator = None
+    assert calls == [(threading.current_thread(), 7)]
+    assert state.wiper_min == 7
+
+
+def test_command_timeout_skips_save(state, monkeypatch):
+    saved = []
+    monkeypatch.setattr(server, "save_config", lambda s: saved.append(s))
+    monkeypatch.setattr(server, "_COMMAND_TIMEOUT_S", 0.01)
+    state.set_tick_driven(True)
+    server.handle_set_smoothing_alpha({"value": 0.5})
+    # the withdrawn command is not applied by a late tick
+    assert state.apply_commands() == 0
+    state.set_tick_driven(False)
+    assert saved == []
+    assert state.smoothing_alpha != 0.5
+
+
 def test_request_logs_handler(socketio_client):
     log_buffer.clear()
-    log_buffer.append({"message": "entry", "level": "info"})
+    entry = LogEntry(0.0, "info", "fan_control", "entry", (("wiper", 3),))
+    log_buffer.append(entry)
     socketio_client.emit("request_logs")
     received = socketio_client.get_received()
-    assert any(p["name"] == "logs_update" and p["args"][0] == [{"message": "entry", "level": "info"}] for p in received)
+    assert any(p["name"] == "logs_update" and p["args"][0] == [entry.as_dict()] for p in received)
+
+
+def test_request_logs_tolerates_concurrent_append(monkeypatch):
+    log_buffer.clear()
+
+    class GrowingEntry(LogEntry):
+        __slots__ = ()
+
+        def as_dict(self):
+            # the listener thread appending while the handler converts
+            log_buffer.append(LogEntry(1.0, "info", "fan_control", "late", ()))
+            return super().as_dict()
+
+    log_buffer.append(GrowingEntry(0.0, "info", "fan_control", "first", ()))
+    emitted = {}
+    monkeypatch.setattr(server, "emit", lambda event, data: emitted.update({event: data}))
+    server.handle_request_logs()
+    assert [e["message"] for e in emitted["logs_update"]] == ["first"]
+    log_buffer.clear()
 
 
 def test_request_reboot_denied(monkeypatch):
@@ -84,14 +145,41 @@ def test_request_reboot_allowed(monkeypatch):
     assert cmd == ["sudo reboot"]
 
 
+def _run_broadcast_ticks(monkeypatch, count):
+    ticks = iter([False] * count + [True])
+    monkeypatch.setattr(server, "_stop_event", type("E", (), {"is_set": lambda self: next(ticks)})())
+    server._broadcast_state()
+
+
 def test_broadcast_state_emits_once(monkeypatch, state):
     emitted = []
-    ev = server.Event()
-    monkeypatch.setattr(server, "_stop_event", ev)
     monkeypatch.setattr(server.socketio, "emit", lambda e, d: emitted.append((e, d)))
-    monkeypatch.setattr(server.socketio, "sleep", lambda s: ev.set())
-    server._broadcast_state()
+    monkeypatch.setattr(server, "_stream", server._StateStream())
+    state.changes.publish(urgent=True)
+    _run_broadcast_ticks(monkeypatch, 1)
     assert emitted and emitted[0][0] == "state_update"
+    assert emitted[0][1]["seq"] == 0
+
+
+def test_broadcast_state_sends_only_changes(monkeypatch, state):
+    emitted = []
+    monkeypatch.setattr(server, "_stream", server._StateStream())
+    monkeypatch.setattr(server.socketio, "emit", lambda e, d: emitted.append((e, d)))
+
+    full = server._stream.full()
+    state.temperature1 = 48.5
+    state.changes.publish(urgent=True)
+    _run_broadcast_ticks(monkeypatch, 1)
+    assert emitted == [("state_delta", {"seq": full["seq"] + 1, "changes": {"temperature1": 48.5}})]
+    assert server._stream.delta() is None
+
+
+def test_request_state_resync_sends_snapshot(socketio_client, state):
+    socketio_client.get_received()
+    socketio_client.emit("request_state_resync")
+    received = socketio_client.get_received()
+    assert received[0]["name"] == "state_update"
+    assert "seq" in received[0]["args"][0]
 
 
 def test_main_runs_and_stops(monkeypatch, state):
@@ -101,3 +189,113 @@ def test_main_runs_and_stops(monkeypatch, state):
     monkeypatch.setattr(server.socketio, "run", lambda *a, **k: None)
     server.main()
     assert ev.is_set()
+
+
+def test_request_loop_stats_handler(socketio_client):
+    class DummyLoop:
+        def timing_stats(self):
+            return {"ticks": 3, "overruns": 1}
+
+    server.control_loop = DummyLoop()
+    socketio_client.emit("request_loop_stats")
+    received = socketio_client.get_received()
+    server.control_loop = None
+    assert any(p["name"] == "loop_stats" and p["args"][0]["ticks"] == 3 for p in received)
+
+
+def test_alarm_transition_pushed_without_coalescing_delay(monkeypatch, state):
+    emitted = []
+    monkeypatch.setattr(server.socketio, "emit", lambda e, d: emitted.append((e, d)))
+    monkeypatch.setattr(server, "_stream", server._StateStream())
+    monkeypatch.setattr(server, "push_max_hz", 0.5)
+    server._stream.full()
+    state.temperature1 = 30.0
+    state.changes.publish()
+
+    def routine():
+        state.temperature2 = 31.0
+        state.changes.publish()
+
+    def alarm():
+        state.alarm_active = True
+        state.changes.publish(urgent=True)
+
+    # the second routine update is held back (up to 2 s) until the alarm
+    threading.Timer(0.02, routine).start()
+    threading.Timer(0.1, alarm).start()
+    start = time.monotonic()
+    _run_broadcast_ticks(monkeypatch, 2)
+    assert time.monotonic() - start < 1.0
+    assert [d["changes"] for _, d in emitted] == [
+        {"temperature1": 30.0},
+        {"temperature2": 31.0, "alarm_active": True},
+    ]
+
+
+def test_settings_handler_publishes_change(socketio_client, state, no_save_config):
+    state.changes.clear()
+    socketio_client.emit("set_setpoint", {"value": 33})
+    assert state.changes.wait(0.0)
+
+
+def test_history_sent_on_connect(monkeypatch, state):
+    from history import FIELDS, HistoryBuffer
+
+    history = HistoryBuffer(capacity=10)
+    for i in range(3):
+        history.append(float(i), tuple(float(i) for _ in FIELDS))
+    monkeypatch.setattr(server, "history", history)
+    monkeypatch.setattr(server, "history_initial_points", 2)
+    client = server.socketio.test_client(server.app)
+    try:
+        received = {p["name"]: p["args"][0] for p in client.get_received()}
+    finally:
+        client.disconnect()
+    assert received["history"]["t"] == [1.0, 2.0]
+
+
+def test_history_http_and_socket(monkeypatch, app_client, socketio_client):
+    from history import FIELDS, HistoryBuffer
+
+    history = HistoryBuffer(capacity=100)
+    now = time.time()
+    for i in range(50):
+        history.append(now - 50 + i, tuple(float(i) for _ in FIELDS))
+    monkeypatch.setattr(server, "history", history)
+
+    resp = app_client.get("/api/history?start=-3600&points=10&method=minmax")
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert body["source_points"] == 50
+    assert len(body["series"]["t"]) <= 30
+
+    assert app_client.get("/api/history?method=bogus").status_code == 400
+
+    socketio_client.get_received()
+    socketio_client.emit("request_history", {"start": -3600, "points": 5})
+    received = socketio_client.get_received()
+    assert received[0]["name"] == "history_result"
+    assert received[0]["args"][0]["series"]["t"][-1] == history.latest(1)["t"][0]
+
+
+def test_log_query_http_and_socket(app_client, socketio_client, monkeypatch, tmp_path):
+    from config.log_store import LogStore
+
+    assert app_client.get("/api/logs").status_code == 503
+    store = LogStore(str(tmp_path / "logs"))
+    store.append(LogEntry(float(i), "warning" if i % 2 else "info", "fan_control", f"m{i}") for i in range(10))
+    monkeypatch.setattr(server, "log_store", store)
+
+    resp = app_client.get("/api/logs?level=warning&limit=3")
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert [e["message"] for e in body["entries"]] == ["m9", "m7", "m5"]
+    assert app_client.get("/api/logs?level=bogus").status_code == 400
+
+    socketio_client.get_received()
+    socketio_client.emit("request_log_query", {"level": "warning", "limit": 3, "before": body["next"]})
+    received = socketio_client.get_received()
+    assert received[0]["name"] == "log_query_result"
+    assert [e["message"] for e in received[0]["args"][0]["entries"]] == ["m3", "m1"]
+    assert received[0]["args"][0]["next"] is None
+    store.close()